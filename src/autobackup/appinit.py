@@ -29,5 +29,10 @@ def init_app(app_cnf: dict) -> None:
             os.stat(db_file_path).st_mtime
         ).strftime(".%Y-%m-%d_%H-%M-%S_%f")
 
-        if os.path.exists(db_file_path):
-            shutil.copy(db_file_path, db_file_path + ts_suffix)
+        # The write-ahead log is left beside the DB file if the last run was
+        # interrupted, and holds the changes not yet written to the DB file.
+        for log_suffix in ("", "-wal"):
+            if os.path.exists(db_file_path + log_suffix):
+                shutil.copy(
+                    db_file_path + log_suffix, db_file_path + ts_suffix + log_suffix
+                )
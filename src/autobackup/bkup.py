@@ -1,14 +1,21 @@
 """Module of BackupFacade"""
+import collections
 import datetime
 import math
-from collections.abc import Generator
+import os
+from collections.abc import Generator, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from logging import getLogger
 from typing import Any
 
-from . import dstrepo, metarepo, scanner, srcrepo
-from .fsutil import FoundFile
+from . import dstrepo, filetable, metarepo, scanner, srcrepo
+from .fsutil import FoundFile, get_content_digest, get_physical_offset
 
 _MTIME_ALLOW_ERR = 0.0000005
+# Number of the keys looked up in the metadata with a single query
+_DIFF_CHUNK_SIZE = 500
+
+COPY_ORDERS = ("scan", "inode", "extent")
 
 
 class BackupFacade:
@@ -20,6 +27,10 @@ class BackupFacade:
         d_repo: dstrepo.DestinationRepository,
         m_repo: metarepo.MetadataRepository,
         scnr: scanner.AllFileScanner,
+        metadata_batch_size: int = 1,
+        metadata_batch_sec: float = 0.0,
+        hash_targets: list[str] = None,
+        hash_workers: int = 1,
     ) -> None:
         """Initializer
 
@@ -28,11 +39,29 @@ class BackupFacade:
             d_repo (dstrepo.DestinationRepository): DestinationRepository object
             m_repo (metarepo.MetadataRepository): MetadataRepository object
             scnr (scanner.AllFileScanner): AllFileScanner object
+            metadata_batch_size (int, optional):\
+                Number of the metadata of backed up files committed at once.\
+                Defaults to 1.
+            metadata_batch_sec (float, optional):\
+                Seconds after which the metadata are committed even if\
+                metadata_batch_size is not reached (0 means no limit).\
+                Defaults to 0.0.
+            hash_targets (list[str], optional):\
+                Paths of the target directories whose files are backed up only when\
+                the digests of their contents are changed. Defaults to None.
+            hash_workers (int, optional):\
+                Number of threads that compute the digests. Defaults to 1.
         """
         self._s_repo = s_repo
         self._d_repo = d_repo
         self._m_repo = m_repo
         self._scnr = scnr
+        self._metadata_batch_size = metadata_batch_size
+        self._metadata_batch_sec = metadata_batch_sec
+        self._hash_dirs = tuple(
+            _get_dir_prefix(target_path) for target_path in (hash_targets or [])
+        )
+        self._hash_workers = hash_workers
         self._logger = getLogger(__name__)
 
     def execute(
@@ -40,6 +69,10 @@ class BackupFacade:
         discard_old_backups: bool = True,
         phase1_weeks: int = 2,
         phase2_months: int = 2,
+        streaming: bool = False,
+        columnar: bool = False,
+        copy_order: str = "scan",
+        bulk_diff: bool = False,
     ) -> None:
         """Execute backup.
 
@@ -52,47 +85,401 @@ class BackupFacade:
             phase2_months (int, optional):
                 The number of months that make up Phase 2, counting backwards from\
                 this month. Defaults to 2.
+            streaming (bool, optional):\
+                Whether to copy files while scanning, instead of after the whole\
+                scan is finished. Defaults to False.
+            columnar (bool, optional):\
+                Whether to hold the scan result in a columnar table, instead of a\
+                dict of FoundFile. Defaults to False.
+            copy_order (str, optional):\
+                Order of copying the modified files. "scan" keeps the order of the\
+                scan, "inode" sorts them by inode number, and "extent" sorts them by\
+                the physical location of the data on the disk. Not applied when\
+                streaming. Defaults to "scan".
+            bulk_diff (bool, optional):\
+                Whether to compare the whole scan with the metadata in a few SQL\
+                statements, instead of a query per file. Not applied when streaming.\
+                Defaults to False.
         """
+        if streaming:
+            self._execute_streaming(discard_old_backups, phase1_weeks, phase2_months)
+            return
+
+        if columnar:
+            self._execute_columnar(
+                discard_old_backups, phase1_weeks, phase2_months, copy_order, bulk_diff
+            )
+            return
+
         # Get All Files
-        all_files = self._scnr.get_all_files()
+        all_src_files, backup_files = self._scnr.get_src_and_backup_files()
 
         # Get Source Files Generator
-        src_files = dict(self._s_repo.get_files_matching_criteria(all_files))
+        src_files = dict(self._s_repo.get_files_matching_criteria(all_src_files))
+
+        if bulk_diff:
+            # Cleanup Metadata and detect changes in SQL
+            modified_keys = self._diff_in_bulk(
+                _get_metadata(key, file) for key, file in src_files.items()
+            )
+            modified_files = (
+                file for key, file in src_files.items() if key in modified_keys
+            )
+        else:
+            # Cleanup Metadata
+            remove_list = self._get_uncontained_keys(src_files.keys())
+            for _ in self._m_repo.remove_metadatas(remove_list):
+                pass
+
+            modified_files = self._get_modified_files(src_files)
+
+        # Create backups and Update Metadata
+        self._create_backups(_order_files(modified_files, copy_order))
+
+        # Discard old backups
+        if discard_old_backups:
+            files_to_be_discarded = self._get_files_to_be_discarded(
+                backup_files, phase1_weeks=phase1_weeks, phase2_months=phase2_months
+            )
+            for _ in self._d_repo.remove_backups(files_to_be_discarded):
+                pass
+        else:
+            pass
+
+    def _execute_streaming(
+        self,
+        discard_old_backups: bool,
+        phase1_weeks: int,
+        phase2_months: int,
+    ) -> None:
+        """Execute backup as a pipeline from scanning to copying.
+
+        Each file is matched, checked for changes and copied as soon as it is\
+        found. Only the keys of the source files, and the paths and mtimes of the\
+        backups older than Phase 1, are kept for the final pass (cleanup of\
+        metadata and discarding old backups). Newer backups are never discarded.
+        """
+        src_keys = set()
+        old_backups: list[tuple[str, float]] = []
+        phase1_timestamp = (
+            _get_phase1_timestamp(datetime.date.today(), phase1_weeks)
+            if discard_old_backups
+            else None
+        )
+
+        def _split_backups(all_files: Iterable[tuple[str, FoundFile]]):
+            for key, file in all_files:
+                if not file.in_dst_dir:
+                    yield (key, file)
+                elif not phase1_timestamp is None:
+                    try:
+                        mtime = file.mtime
+                    except OSError:
+                        # Not discarded, as in the other modes
+                        continue
+                    if mtime < phase1_timestamp:
+                        old_backups.append((str(file), mtime))
+
+        def _record_src_keys(src_files: Iterable[tuple[str, FoundFile]]):
+            for key, file in src_files:
+                src_keys.add(key)
+                yield (key, file)
+
+        # Scan, match, detect changes and copy in one pass
+        src_files = self._s_repo.get_files_matching_criteria(
+            _split_backups(self._scnr.iter_all_files())
+        )
+        modified_files = self._get_modified_files(_record_src_keys(src_files))
+        self._create_backups(modified_files)
 
         # Cleanup Metadata
-        remove_list = self._get_uncontained_keys(src_files.keys())
+        remove_list = self._get_uncontained_keys(src_keys)
         for _ in self._m_repo.remove_metadatas(remove_list):
             pass
 
-        # Create backups and Update Metadata
-        modified_files = self._get_modified_files(src_files)
-        processed_files = self._d_repo.create_backups(modified_files)
+        # Discard old backups
+        if discard_old_backups:
+            paths_to_be_discarded = _select_discarded(
+                (
+                    (path, mtime, self._d_repo.get_base_path(os.path.normcase(path)))
+                    for path, mtime in old_backups
+                ),
+                datetime.date.today(),
+                phase1_weeks,
+                phase2_months,
+            )
+            for _ in self._d_repo.remove_backups(
+                _build_backup_files(paths_to_be_discarded)
+            ):
+                pass
 
-        total_size = 0
-        for src_file, dst_file in processed_files:
-            total_size += src_file.size
-            self._m_repo.update_metadata(
-                metarepo.Metadata(src_file.normpath_str, src_file.mtime)
+    def _execute_columnar(
+        self,
+        discard_old_backups: bool,
+        phase1_weeks: int,
+        phase2_months: int,
+        copy_order: str = "scan",
+        bulk_diff: bool = False,
+    ) -> None:
+        """Execute backup on a columnar table of the scan result.
+
+        Change detection and the retention of backups are done with passes over\
+        the columns of the table. FoundFile objects are only created for the\
+        files to be copied or discarded.
+        """
+        # Get All Files
+        table = self._scnr.get_file_table()
+
+        # Get Source Files
+        src_rows = self._s_repo.get_rows_matching_criteria(table)
+        src_keys = table.keys(src_rows)
+
+        if bulk_diff:
+            # Cleanup Metadata and detect changes in SQL
+            modified_keys = self._diff_in_bulk(
+                _get_row_metadata(table, row, key)
+                for row, key in zip(src_rows, src_keys)
             )
+            modified_rows = [
+                row for row, key in zip(src_rows, src_keys) if key in modified_keys
+            ]
+        else:
+            modified_rows = self._get_modified_rows(table, src_rows, src_keys)
 
-        self._logger.info(
-            "TOTAL_SIZE: %i MB", round(total_size / 1024.0 / 1024.0 + 0.0005)
+        # Create backups and Update Metadata
+        self._create_backups(
+            _order_files((table.file(row) for row in modified_rows), copy_order)
         )
 
         # Discard old backups
         if discard_old_backups:
-            files_to_be_discarded = self._get_files_to_be_discarded(
-                all_files, phase1_weeks=phase1_weeks, phase2_months=phase2_months
+            rows_to_be_discarded = self._get_rows_to_be_discarded(
+                table, phase1_weeks=phase1_weeks, phase2_months=phase2_months
             )
-            for _ in self._d_repo.remove_backups(files_to_be_discarded):
+            for _ in self._d_repo.remove_backups(
+                table.file(row) for row in rows_to_be_discarded
+            ):
                 pass
-        else:
+
+    def _get_modified_rows(
+        self, table: filetable.FileTable, src_rows: list[int], src_keys: list[str]
+    ) -> list[int]:
+        """Remove the metadata of the files not found and get the modified rows.
+
+        The stored metadata are looked up for a chunk of rows at a time, so that\
+        they are not all loaded into memory on large targets.
+
+        Args:
+            table (filetable.FileTable): Files found by the scan
+            src_rows (list[int]): Rows of the source files
+            src_keys (list[str]): Keys of the source files in the order of src_rows
+
+        Returns:
+            list[int]: Rows of the files that need to be backed up
+        """
+        # Cleanup Metadata
+        remove_list = self._get_uncontained_keys(set(src_keys))
+        for _ in self._m_repo.remove_metadatas(remove_list):
             pass
 
+        # Detect changes
+        modified_rows = []
+        with metarepo.MetadataBatchWriter(
+            self._m_repo, self._metadata_batch_size, self._metadata_batch_sec
+        ) as m_writer:
+            for start in range(0, len(src_rows), _DIFF_CHUNK_SIZE):
+                end = start + _DIFF_CHUNK_SIZE
+                stored_mdatas = {
+                    mdata.key: mdata
+                    for mdata in self._m_repo.get_metadatas(src_keys[start:end])
+                }
+                for row, key in zip(src_rows[start:end], src_keys[start:end]):
+                    stored_mdata = stored_mdatas.get(key)
+                    if stored_mdata is None:
+                        modified_rows.append(row)
+                        continue
+
+                    mdata = _get_row_metadata(table, row, key)
+                    if stored_mdata.is_modified(mdata, _MTIME_ALLOW_ERR):
+                        modified_rows.append(row)
+                    elif stored_mdata.has_unknown(mdata):
+                        m_writer.add(mdata._replace(digest=stored_mdata.digest))
+        return modified_rows
+
+    def _diff_in_bulk(self, items: Iterable[metarepo.Metadata]) -> set[str]:
+        """Remove the metadata of the files not found and get the modified keys.
+
+        The metadata of the source files are loaded into a temporary table, and\
+        compared with the stored metadata by a join and an anti-join. Unknown\
+        fields of the stored metadata are filled from the scan.
+
+        Args:
+            items (Iterable[metarepo.Metadata]): Metadata of the source files
+
+        Returns:
+            set[str]: Keys of the files that need to be backed up
+        """
+        self._m_repo.load_scanned(items)
+        try:
+            self._m_repo.remove_unscanned(self._get_skipped_dirs())
+            result = set(self._m_repo.get_modified_keys(_MTIME_ALLOW_ERR))
+            self._m_repo.fill_unknown()
+            return result
+        finally:
+            self._m_repo.clear_scanned()
+
+    def backup_files(self, files: Iterable[FoundFile]) -> None:
+        """Back up only the given files.
+
+        Files that do not match the search criteria or that are not modified are\
+        ignored. Metadata of other files and old backups are left as they are.
+
+        Args:
+            files (Iterable[FoundFile]): Files that may need to be backed up
+        """
+        src_files = self._s_repo.get_files_matching_criteria(
+            {file.normpath_str: file for file in files}
+        )
+        modified_files = self._get_modified_files(src_files)
+        self._create_backups(modified_files)
+
+    def _create_backups(self, modified_files: Iterable[FoundFile]) -> None:
+        """Create backups of the files and update metadata of them.
+
+        Args:
+            modified_files (Iterable[FoundFile]): Files that need to be backed up.
+        """
+        total_size = 0
+        with metarepo.MetadataBatchWriter(
+            self._m_repo, self._metadata_batch_size, self._metadata_batch_sec
+        ) as m_writer:
+            digests = {}
+            processed_files = self._d_repo.create_backups(
+                self._skip_same_contents(modified_files, digests, m_writer),
+                self._is_changed_in_place,
+            )
+
+            # Each file is yielded after its copy is completed.
+            for src_file, dst_file in processed_files:
+                total_size += src_file.size
+                key = src_file.normpath_str
+                m_writer.add(
+                    _get_metadata(key, src_file)._replace(digest=digests.pop(key, None))
+                )
+
+        self._logger.info(
+            "TOTAL_SIZE: %i MB", round(total_size / 1024.0 / 1024.0 + 0.0005)
+        )
+
+    def _is_changed_in_place(self, file: FoundFile) -> bool:
+        """Whether the file was changed keeping the mtime and size of its last backup.
+
+        Such a file is detected by its ctime, inode, device or digest. Its backup\
+        must not be skipped for a backup with the same mtime and size, which is of\
+        the old content.
+        """
+        stored_mdata = self._m_repo.get_metadata(file.normpath_str)
+        if stored_mdata is None or stored_mdata.size != file.size:
+            return False
+        return (
+            file.mtime - _MTIME_ALLOW_ERR
+            < stored_mdata.mtime
+            <= file.mtime + _MTIME_ALLOW_ERR
+        )
+
+    def _skip_same_contents(
+        self,
+        files: Iterable[FoundFile],
+        digests: dict[str, bytes],
+        m_writer: metarepo.MetadataBatchWriter,
+    ) -> Iterable[FoundFile]:
+        """Drop the files under the hash targets whose contents are not changed.
+
+        The digests of the files under the hash targets are computed in a thread\
+        pool, or taken from the cache if the files are not changed since they were\
+        hashed. Files with the same digest as their last backups are not backed up\
+        again, and only their metadata are updated.
+
+        Args:
+            files (Iterable[FoundFile]): Files modified according to their status
+            digests (dict[str, bytes]):\
+                Dict to which the digests of the returned files are added by key
+            m_writer (metarepo.MetadataBatchWriter):\
+                Writer of the metadata of the dropped files
+
+        Returns:
+            Iterable[FoundFile]: Files that need to be backed up
+        """
+        if not self._hash_dirs:
+            return files
+        return self._iter_changed_contents(files, digests, m_writer)
+
+    def _iter_changed_contents(
+        self,
+        files: Iterable[FoundFile],
+        digests: dict[str, bytes],
+        m_writer: metarepo.MetadataBatchWriter,
+    ) -> Generator[FoundFile]:
+        # The DB is accessed only from this thread. A few files per worker are
+        # hashed ahead, keeping the order of the files.
+        pending: collections.deque[tuple[FoundFile, metarepo.Metadata, Future]] = (
+            collections.deque()
+        )
+        with ThreadPoolExecutor(self._hash_workers) as executor:
+            for file in files:
+                key = file.normpath_str
+                if not key.startswith(self._hash_dirs):
+                    yield file
+                    continue
+
+                mdata = _get_metadata(key, file)
+                digest = self._m_repo.get_cached_digest(mdata)
+                if digest is None:
+                    future = executor.submit(get_content_digest, str(file))
+                else:
+                    future = Future()
+                    future.set_result(digest)
+                pending.append((file, mdata, future))
+
+                while len(pending) > self._hash_workers * 2:
+                    file, mdata, future = pending.popleft()
+                    if self._is_content_changed(mdata, future, digests, m_writer):
+                        yield file
+            while pending:
+                file, mdata, future = pending.popleft()
+                if self._is_content_changed(mdata, future, digests, m_writer):
+                    yield file
+
+    def _is_content_changed(
+        self,
+        mdata: metarepo.Metadata,
+        future: Future,
+        digests: dict[str, bytes],
+        m_writer: metarepo.MetadataBatchWriter,
+    ) -> bool:
+        try:
+            digest = future.result()
+        except OSError as os_error:
+            # Left to the backup, which reports the error.
+            self._logger.debug("NOT_HASHED: %s", str(os_error))
+            return True
+        self._m_repo.cache_digest(mdata, digest)
+
+        stored_mdata = self._m_repo.get_metadata(mdata.key)
+        if not stored_mdata is None and stored_mdata.digest == digest:
+            self._logger.debug("SKIP(SameContent): %s", mdata.key)
+            m_writer.add(mdata._replace(digest=digest))
+            return False
+
+        digests[mdata.key] = digest
+        return True
+
     def _get_uncontained_keys(self, keys: list[str]) -> Generator[str]:
         """Extracts keys that are present in MetadataRepository but not in the given list.
 
-        Keys that are only contained in the given list will be ignored.
+        Keys that are only contained in the given list will be ignored. Keys under\
+        the target directories skipped by the scanner are kept, since their files\
+        were not listed in this run.
 
         Args:
             keys (list[str]): List of keys to compare against
@@ -100,32 +487,53 @@ class BackupFacade:
         Yields:
             str: Key that are present in this repository but not in the given list
         """
+        skipped_dirs = self._get_skipped_dirs()
         current_list = self._m_repo.get_all_metadatas()
         for mdata in current_list:
-            if not mdata.key in keys:
+            if not mdata.key in keys and not mdata.key.startswith(skipped_dirs):
                 yield mdata.key
 
+    def _get_skipped_dirs(self) -> tuple[str, ...]:
+        """Get normalized paths (with trailing separator) of the skipped targets."""
+        if self._scnr is None:
+            return ()
+
+        result = []
+        for target_path in self._scnr.skipped_targets:
+            self._logger.warning("KEEP_METADATA(ScanTimeout): %s", target_path)
+            result.append(_get_dir_prefix(target_path))
+        return tuple(result)
+
     def _get_modified_files(
-        self, file_dict: dict[str, FoundFile]
+        self, file_dict: dict[str, FoundFile] | Iterable[tuple[str, FoundFile]]
     ) -> Generator[FoundFile]:
         """Get a list of files that need to be backed up.
 
         Args:
-            file_dict (dict[str, FoundFile]):\
+            file_dict (dict[str, FoundFile] | Iterable[tuple[str, FoundFile]]):\
                 List of files to be checked for backup List of files that need to be backed up
 
         Yields:
             FoundFile: File that need to be backed up.
         """
-        for key, file in file_dict.items():
-            mdata = self._m_repo.get_metadata(key)
-
-            if (
-                mdata is None
-                or mdata.mtime <= file.mtime - _MTIME_ALLOW_ERR
-                or mdata.mtime > file.mtime + _MTIME_ALLOW_ERR
-            ):
-                yield file
+        if isinstance(file_dict, dict):
+            file_dict = file_dict.items()
+
+        with metarepo.MetadataBatchWriter(
+            self._m_repo, self._metadata_batch_size, self._metadata_batch_sec
+        ) as m_writer:
+            for key, file in file_dict:
+                stored_mdata = self._m_repo.get_metadata(key)
+                if stored_mdata is None:
+                    yield file
+                    continue
+
+                mdata = _get_metadata(key, file)
+                if stored_mdata.is_modified(mdata, _MTIME_ALLOW_ERR):
+                    yield file
+                elif stored_mdata.has_unknown(mdata):
+                    # e.g. the metadata recorded by an older version
+                    m_writer.add(mdata._replace(digest=stored_mdata.digest))
 
     def _get_files_to_be_discarded(
         self,
@@ -208,26 +616,199 @@ class BackupFacade:
         # This is in case we come up with a way to make it more efficient in the future.
         yield from result
 
+    def _get_rows_to_be_discarded(
+        self,
+        table: filetable.FileTable,
+        today: datetime.date = datetime.date.today(),
+        phase1_weeks: int = None,
+        phase2_months: int = None,
+    ) -> list[int]:
+        """Get rows of the backup files to be discarded.
+
+        Same rules as _get_files_to_be_discarded(), but backups newer than Phase 1\
+        are dropped by comparing the mtime column with the switchover timestamp,\
+        without converting their mtime to datetime.
+
+        Args:
+            table (filetable.FileTable): Files found by AllFileScanner.get_file_table()
+            today (datetime.date, optional):\
+                The date that serves as the starting point for determining the actual\
+                duration of Phase 1 or Phase 2. Defaults to datetime.date.today().
+            phase1_weeks (int, optional):
+                The number of weeks that make up Phase 1, counting backwards from\
+                this week. Defaults to None.
+            phase2_months (int, optional):
+                The number of months that make up Phase 2, counting backwards from\
+                this month. Defaults to None.
+
+        Returns:
+            list[int]: Rows of the files to be discarded
+        """
+        mtimes = table.mtimes
+        return _select_discarded(
+            (
+                (row, mtimes[row], base_path)
+                for row, base_path in self._d_repo.get_backup_rows(table)
+            ),
+            today,
+            phase1_weeks,
+            phase2_months,
+        )
+
+
+def _get_dir_prefix(dirpath: str) -> str:
+    # Normalized path with a trailing separator, to match the keys under it.
+    dirpath = os.path.normcase(os.path.abspath(dirpath))
+    return dirpath if dirpath.endswith(os.sep) else dirpath + os.sep
+
+
+def _get_metadata(key: str, file: FoundFile) -> metarepo.Metadata:
+    # st_ino and st_dev are 0 if they are not available from the scan (e.g. on
+    # Windows), and are recorded as unknown.
+    return metarepo.Metadata(
+        key, file.mtime, file.size, file.inode or None, file.device or None, file.ctime
+    )
+
+
+def _get_row_metadata(
+    table: filetable.FileTable, row: int, key: str
+) -> metarepo.Metadata:
+    # Same as _get_metadata() for a row of the table.
+    return metarepo.Metadata(
+        key,
+        table.mtimes[row],
+        table.sizes[row],
+        table.inodes[row] or None,
+        table.devices[row] or None,
+        table.ctimes[row],
+    )
+
+
+def _order_files(files: Iterable[FoundFile], copy_order: str) -> Iterable[FoundFile]:
+    """Sort the files to be copied, to reduce seeks on HDD.
+
+    Args:
+        files (Iterable[FoundFile]): Files to be copied
+        copy_order (str): One of COPY_ORDERS
+
+    Returns:
+        Iterable[FoundFile]: Files in the order to be copied
+    """
+    if copy_order == "inode":
+        return sorted(files, key=_get_inode_key)
+    if copy_order == "extent":
+        return sorted(files, key=_get_extent_key)
+    return files
+
+
+def _get_inode_key(file: FoundFile) -> tuple[int, int]:
+    try:
+        file_stat = file.stat()
+    except OSError:
+        return (0, 0)
+    return (file_stat.st_dev, file_stat.st_ino)
+
+
+def _get_extent_key(file: FoundFile) -> tuple[int, int, int]:
+    # Files whose extent is unknown (e.g. empty or not on Linux) come first, in
+    # the order of inode numbers.
+    dev, ino = _get_inode_key(file)
+    offset = get_physical_offset(str(file))
+    return (dev, -1 if offset is None else offset, ino)
+
+
+def _select_discarded(
+    backups: Iterable[tuple[Any, float, str]],
+    today: datetime.date,
+    phase1_weeks: int,
+    phase2_months: int,
+) -> list:
+    """Select the backups to be discarded by the rules of _get_files_to_be_discarded().
+
+    Backups newer than Phase 1 are dropped by comparing their mtime with the\
+    switchover timestamp, without converting their mtime to datetime.
+
+    Args:
+        backups (Iterable[tuple[Any, float, str]]):\
+            Backups (e.g. rows of FileTable) with their mtime and their base path\
+            excluding the date and sequence number. Backups whose base path is\
+            None (not named as backups) are not discarded.
+        today (datetime.date):\
+            The date that serves as the starting point for determining the actual\
+            duration of Phase 1 or Phase 2.
+        phase1_weeks (int): The number of weeks that make up Phase 1.
+        phase2_months (int): The number of months that make up Phase 2.
+
+    Returns:
+        list: Backups to be discarded
+    """
+    # Date of Phase Switchover
+    phase1 = _get_phase1_date(today, phase1_weeks)
+    phase2 = _get_phase2_date(today, phase2_months)
+
+    result = []
+    if phase1 is None:
+        return result
+
+    phase1_timestamp = _get_phase1_timestamp(today, phase1_weeks)
+
+    # Temporary dict
+    phase1_keep = {}
+    phase2_keep = {}
+    for backup, timestamp, base_path in backups:
+        if base_path is None or not timestamp < phase1_timestamp:
+            # Newer than Phase 1 (or the status is unavailable)
+            continue
+
+        mtime = datetime.datetime.fromtimestamp(timestamp)
+        if _is_in_phase2(mtime, phase1, phase2):
+            # phase2: keep newest file per week
+            aggregation_date = mtime.date() - datetime.timedelta(
+                days=mtime.date().weekday()
+            )
+            _separate_keep_and_discard_backup_files(
+                result, phase2_keep, mtime, aggregation_date, base_path, backup
+            )
+        else:
+            # phase1: keep newest file per day
+            _separate_keep_and_discard_backup_files(
+                result, phase1_keep, mtime, mtime.date(), base_path, backup
+            )
+
+    return result
+
+
+def _build_backup_files(paths: Iterable[str]) -> Generator[FoundFile]:
+    # The status is read before the backup is removed, for the log of its mtime.
+    for path in paths:
+        file = FoundFile(path)
+        try:
+            file.stat()
+        except OSError:
+            continue
+        yield file
+
 
 def _separate_keep_and_discard_backup_files(
-    discard_list: list[FoundFile],
+    discard_list: list[FoundFile | int],
     keep_list: dict[datetime.datetime, dict[str, dict[str, Any]]],
     mtime: datetime.datetime,
     aggregation_date: datetime.datetime,
     file_base_path: str,
-    file: FoundFile,
+    file: FoundFile | int,
 ) -> None:
     """Classify backup files into those to be kept and discarded.
 
     Args:
-        discard_list (list[FoundFile]): A list of files to be discarded.
+        discard_list (list[FoundFile | int]):\
+            A list of files (or rows of FileTable) to be discarded.
         keep_list (dict[datetime.datetime, dict[str, dict[str, Any]]]):\
             A dictionary of files to be kept.
         mtime (datetime.datetime): The modification time of the file.
         aggregation_date (datetime.datetime): The date from which the aggregation starts.
         file_base_path (str):\
             The base path of a backed-up file excluding the date and sequence number.
-        file (FoundFile): File to be classified
+        file (FoundFile | int): File (or row of FileTable) to be classified
 
     Note:
         This function has side effects and modifies thie input list "discard_files" and the\
@@ -256,6 +837,14 @@ def _get_phase1_date(today: datetime.date, phase1_weeks: int) -> datetime.date:
     )
 
 
+def _get_phase1_timestamp(today: datetime.date, phase1_weeks: int) -> float:
+    phase1 = _get_phase1_date(today, phase1_weeks)
+    if phase1 is None:
+        return None
+
+    return datetime.datetime.combine(phase1, datetime.time()).timestamp()
+
+
 def _get_phase2_date(today: datetime.date, phase2_months: int) -> datetime.date:
     if phase2_months is None:
         return None
@@ -3,6 +3,8 @@ import argparse
 import json
 import os
 import pathlib
+import platform
+import re
 from logging import (
     NOTSET,
     DEBUG,
@@ -148,11 +150,89 @@ def validate_app_cnf(cnf: dict) -> None:
     if os.path.isabs(cnf["common"]["destination_dir"]):
         raise CnfError("Configuration failed (destination_dir is absolute path)")
 
+    for key, choices in (
+        ("db_journal_mode", ("delete", "truncate", "persist", "memory", "wal", "off")),
+        ("db_synchronous", ("off", "normal", "full", "extra")),
+        ("db_temp_store", ("default", "file", "memory")),
+    ):
+        value = cnf["common"].get(key)
+        if not value is None and not str(value).lower() in choices:
+            raise CnfError(f"Configuration failed ({key} is invalid: {value})")
+
+    for key in ("db_cache_size_kib", "db_mmap_size_mib"):
+        if cnf["common"].get(key, 0) < 0:
+            raise CnfError(f"Configuration failed ({key} is negative)")
+
+    if cnf["common"].get("scan_workers", 1) < 1:
+        raise CnfError("Configuration failed (scan_workers is less than 1)")
+
+    if cnf["common"].get("walk_workers", 1) < 1:
+        raise CnfError("Configuration failed (walk_workers is less than 1)")
+
+    if cnf["common"].get("streaming", False) and cnf["common"].get("columnar", False):
+        raise CnfError("Configuration failed (streaming and columnar are exclusive)")
+
+    copy_order = cnf["common"].get("copy_order", "scan")
+    if not copy_order in ("scan", "inode", "extent"):
+        raise CnfError(f"Configuration failed (copy_order is invalid: {copy_order})")
+
+    if cnf["common"].get("streaming", False) and copy_order != "scan":
+        raise CnfError("Configuration failed (copy_order needs streaming = false)")
+
+    if cnf["common"].get("hotspot_top", 0) < 0:
+        raise CnfError("Configuration failed (hotspot_top is negative)")
+
+    if cnf["common"].get("hotspot_runs", 1) < 1:
+        raise CnfError("Configuration failed (hotspot_runs is less than 1)")
+
+    if cnf["common"].get("metadata_batch_size", 1) < 1:
+        raise CnfError("Configuration failed (metadata_batch_size is less than 1)")
+
+    if cnf["common"].get("metadata_batch_sec", 0.0) < 0:
+        raise CnfError("Configuration failed (metadata_batch_sec is negative)")
+
+    if cnf["common"].get("hash_workers", 1) < 1:
+        raise CnfError("Configuration failed (hash_workers is less than 1)")
+
+    if cnf["common"].get("watch", False) and platform.system() != "Linux":
+        raise CnfError("Configuration failed (watch is only supported on Linux)")
+
     if "targets" in cnf and cnf["targets"]:
-        target_paths = [target["path"] for target in cnf["targets"]]
+        target_paths = [
+            os.path.normcase(os.path.abspath(target["path"]))
+            for target in cnf["targets"]
+        ]
         if len(target_paths) != len(set(target_paths)):
             raise CnfError("Duplicate target directory.")
 
+        for target in cnf["targets"]:
+            if target.get("scan_timeout_sec", 0) < 0:
+                raise CnfError("Configuration failed (scan_timeout_sec is negative)")
+
+            for key in ("min_size", "max_size", "min_age", "max_age"):
+                if target.get(key, 0) < 0:
+                    raise CnfError(f"Configuration failed ({key} is negative)")
+
+            if 0 < target.get("max_size", 0) < target.get("min_size", 0):
+                raise CnfError("Configuration failed (max_size is less than min_size)")
+
+            if 0 < target.get("max_age", 0) < target.get("min_age", 0):
+                raise CnfError("Configuration failed (max_age is less than min_age)")
+
+            change_detection = target.get("change_detection", "mtime")
+            if not change_detection in ("mtime", "hash"):
+                raise CnfError(
+                    "Configuration failed"
+                    f" (change_detection is invalid: {change_detection})"
+                )
+
+            try:
+                re.compile(target.get("prune_regex", ""))
+            except re.error as exc:
+                raise CnfError(
+                    f"Configuration failed (prune_regex is invalid: {exc})"
+                ) from exc
+
 
 def merge_app_cnf(
     app_cnf: dict[str, Any],
@@ -190,6 +270,18 @@ def get_cli_cnf(args: list[str]) -> dict[str, Any]:
         "The internal database is updated,"
         "but the database files are automatically backed up prior to execution.",
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and back up files as they change (Linux only)."
+        "A full backup is also executed periodically to catch missed changes.",
+    )
+    parser.add_argument(
+        "--report_hotspots",
+        action="store_true",
+        help="Print the slowest and the largest directories of the recent scans"
+        "and exit without backing up.",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -202,6 +294,39 @@ def get_cli_cnf(args: list[str]) -> dict[str, Any]:
     parser.add_argument("--var_dirpath", help="Directory to store variable files.")
     parser.add_argument("--log_dirpath", help="Directory to log.")
     parser.add_argument("--db_filename", help="File name of DB used internally.")
+    parser.add_argument(
+        "--db_journal_mode",
+        choices=["delete", "truncate", "persist", "memory", "wal", "off"],
+        help="Journal mode of DB.",
+    )
+    parser.add_argument(
+        "--db_synchronous",
+        choices=["off", "normal", "full", "extra"],
+        help="How often DB waits for the data to be written to the disk.",
+    )
+    parser.add_argument(
+        "--db_cache_size_kib", type=int, help="Size of the page cache of DB in KiB."
+    )
+    parser.add_argument(
+        "--db_mmap_size_mib",
+        type=int,
+        help="Size of DB file accessed with memory-mapped I/O in MiB."
+        "If 0 is passed, memory-mapped I/O is not used.",
+    )
+    parser.add_argument(
+        "--db_temp_store",
+        choices=["default", "file", "memory"],
+        help="Where the temporary tables of DB are stored.",
+    )
+    parser.add_argument(
+        "--ignore_filename",
+        help="File name of ignore files placed in target directories."
+        "If empty string is passed, ignore files are not used.",
+    )
+    parser.add_argument(
+        "--ignore_cache_filename",
+        help="File name of the cache of ignore files used internally.",
+    )
     parser.add_argument(
         "--destination_dir",
         help="Name of the directory where the backup files will be stored. Must be a relative path.",
@@ -228,6 +353,74 @@ def get_cli_cnf(args: list[str]) -> dict[str, Any]:
         type=bool,
         help="Whether scan symbolic link directory or not.",
     )
+    parser.add_argument(
+        "--scan_workers",
+        type=int,
+        help="Number of threads that scan the target directories concurrently.",
+    )
+    parser.add_argument(
+        "--walk_workers",
+        type=int,
+        help="Number of threads that walk the directory tree of each target directory.",
+    )
+    parser.add_argument(
+        "--streaming",
+        type=bool,
+        help="Whether copy files while scanning or not.",
+    )
+    parser.add_argument(
+        "--columnar",
+        type=bool,
+        help="Whether hold the scan result in a columnar table or not.",
+    )
+    parser.add_argument(
+        "--copy_order",
+        choices=["scan", "inode", "extent"],
+        help="Order of copying files. inode and extent reduce seeks on HDD.",
+    )
+    parser.add_argument(
+        "--bulk_diff",
+        type=bool,
+        help="Whether compare the scan with the metadata in bulk with SQL or not.",
+    )
+    parser.add_argument(
+        "--hotspot_top",
+        type=int,
+        help="Number of the slowest and the largest directories recorded per scan."
+        "If 0 is passed, they are not recorded.",
+    )
+    parser.add_argument(
+        "--hotspot_runs",
+        type=int,
+        help="Number of the recent scans whose hotspots are kept.",
+    )
+    parser.add_argument(
+        "--metadata_batch_size",
+        type=int,
+        help="Number of the metadata of backed up files committed to DB at once.",
+    )
+    parser.add_argument(
+        "--metadata_batch_sec",
+        type=float,
+        help="Seconds after which the metadata are committed to DB"
+        "even if metadata_batch_size is not reached. If 0 is passed, there is no limit.",
+    )
+    parser.add_argument(
+        "--hash_workers",
+        type=int,
+        help="Number of threads that compute the digests of the files of the targets"
+        ' with change_detection = "hash".',
+    )
+    parser.add_argument(
+        "--watch_debounce_sec",
+        type=float,
+        help="Seconds to wait after the last change of a file before it is backed up in watch mode.",
+    )
+    parser.add_argument(
+        "--watch_reconcile_sec",
+        type=float,
+        help="Interval in seconds of the full backup in watch mode.",
+    )
     parser.add_argument(
         "--discard_old_backup",
         type=bool,
@@ -5,9 +5,10 @@ import os
 import pathlib
 import re
 import shutil
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterable
 from logging import getLogger
 
+from .filetable import FLAG_IN_DST_DIR, FileTable
 from .fsutil import FoundFile
 from .scanner import AllFileScanner
 
@@ -75,6 +76,26 @@ def _escape_re_sp(text: str) -> str:
     return result
 
 
+def _get_link_identity(file: FoundFile) -> tuple[int, int]:
+    """Get (st_dev, st_ino) of the file if it has multiple hardlinks, or None."""
+    try:
+        file_stat = file.stat()
+    except OSError:
+        return None
+
+    if file_stat.st_nlink < 2 or file_stat.st_ino == 0:
+        return None
+    return (file_stat.st_dev, file_stat.st_ino)
+
+
+def _is_same_status(dst_file: FoundFile, src_file: FoundFile) -> bool:
+    """Whether the backup seems to be a copy of the current source file.
+
+    The size is also compared, since some tools change files keeping their mtime.
+    """
+    return dst_file.mtime == src_file.mtime and dst_file.size == src_file.size
+
+
 #### Classes ####
 
 
@@ -155,12 +176,20 @@ class DestinationRepository:
         return re.compile(result)
 
     def get_dst_file(
-        self, src_file: FoundFile, all_files: dict[str, FoundFile] = None
+        self,
+        src_file: FoundFile,
+        all_files: dict[str, FoundFile] = None,
+        changed_in_place: bool = False,
     ) -> tuple[FoundFile, bool]:
         """Get the file from which the backup will be taken.
 
         Args:
             src_file (FoundFile): File of backup source
+            changed_in_place (bool, optional):\
+                Whether the source file was changed keeping the mtime and size of its\
+                last backup. A backup with the same mtime and size is then of the old\
+                content, and is not regarded as the backup of the file.\
+                Defaults to False.
 
         Returns:
             tuple[FoundFile, bool]:\
@@ -178,11 +207,23 @@ class DestinationRepository:
 
         if self._seq_sep is None:
             return self._get_dst_path_without_seq(
-                src_file, dst_path, file_name, mtime_date, file_ext, all_files
+                src_file,
+                dst_path,
+                file_name,
+                mtime_date,
+                file_ext,
+                all_files,
+                changed_in_place,
             )
         else:
             return self._get_dst_path_with_seq(
-                src_file, dst_path, file_name, mtime_date, file_ext, all_files
+                src_file,
+                dst_path,
+                file_name,
+                mtime_date,
+                file_ext,
+                all_files,
+                changed_in_place,
             )
 
     def _get_dst_path_without_seq(
@@ -193,6 +234,7 @@ class DestinationRepository:
         mtime_date: str,
         file_ext: str,
         all_files: dict[str, FoundFile],
+        changed_in_place: bool = False,
     ):
         # Assemble the destination path from each element.
         dst_filepath = self._build_dst_filepath(
@@ -203,11 +245,11 @@ class DestinationRepository:
 
         if self._is_exist_file(dst_filepath, all_files):
             dst_file = self._build_dst_file(src_file, dst_filepath, all_files)
-            if dst_file.mtime == src_file.mtime:
+            if not changed_in_place and _is_same_status(dst_file, src_file):
                 # Ignore if a backup has already been taken.
                 is_skip = True
         else:
-            dst_file = FoundFile(dst_filepath, src_file.scan_root_path)
+            dst_file = FoundFile(dst_filepath, src_file.scan_root_str)
 
         return (dst_file, is_skip)
 
@@ -219,6 +261,7 @@ class DestinationRepository:
         mtime_date: str,
         file_ext: str,
         all_files: dict[str, FoundFile],
+        changed_in_place: bool = False,
     ):
         # Assemble the destination path from each element.
         seq_num = 0
@@ -230,7 +273,7 @@ class DestinationRepository:
 
         while self._is_exist_file(dst_filepath, all_files):
             dst_file = self._build_dst_file(src_file, dst_filepath, all_files)
-            if dst_file.mtime == src_file.mtime:
+            if not changed_in_place and _is_same_status(dst_file, src_file):
                 # Ignore if a backup has already been taken.
                 is_skip = True
                 break
@@ -240,7 +283,7 @@ class DestinationRepository:
                 dst_path, file_name, mtime_date, seq_num, file_ext
             )
         else:
-            dst_file = FoundFile(dst_filepath, src_file.scan_root_path)
+            dst_file = FoundFile(dst_filepath, src_file.scan_root_str)
 
         return (dst_file, is_skip)
 
@@ -254,15 +297,31 @@ class DestinationRepository:
         self, src_file: FoundFile, dst_filepath: str, all_files: dict[str, FoundFile]
     ) -> FoundFile:
         if all_files is None:
-            return FoundFile(dst_filepath, src_file.scan_root_path)
+            return FoundFile(dst_filepath, src_file.scan_root_str)
         else:
             return all_files[os.path.normcase(os.path.abspath(dst_filepath))]
 
-    def create_backup(self, src_file: FoundFile) -> tuple[FoundFile, FoundFile]:
+    def create_backup(
+        self,
+        src_file: FoundFile,
+        linked_backups: dict[tuple[int, int], str] = None,
+        changed_in_place: bool = False,
+    ) -> tuple[FoundFile, FoundFile]:
         """Create a duplicate file for backup purposes.
 
         Args:
             src_file (FoundFile): Source files that need to be backed up.
+            linked_backups (dict[tuple[int, int], str], optional):\
+                Backups already created in this run for source files with multiple\
+                hardlinks, keyed by (st_dev, st_ino) of the source. If the source\
+                file shares its inode with one of them, the backup is created as\
+                a hardlink to it instead of a copy. The dict is updated with the\
+                backup of src_file. If None is passed, the file is always copied.\
+                Defaults to None.
+            changed_in_place (bool, optional):\
+                Whether the source file was changed keeping the mtime and size of its\
+                last backup. The backup is then created even if a backup with the\
+                same mtime and size exists. Defaults to False.
 
         Returns:
             tuple[FoundFile, FoundFile]:\
@@ -270,36 +329,66 @@ class DestinationRepository:
                 The previous value in the tuple is the source file, and the latter is\
                 the destination file.
         """
-        dst_file, is_skip = self.get_dst_file(src_file)
+        dst_file, is_skip = self.get_dst_file(
+            src_file, changed_in_place=changed_in_place
+        )
         dst_dir = dst_file.parent
+        identity = None if linked_backups is None else _get_link_identity(src_file)
+
         if is_skip:
             self._logger.debug("SKIP(Already): %s", src_file)
+            if not identity is None:
+                linked_backups.setdefault(identity, str(dst_file))
             return (src_file, dst_file)
-        else:
-            try:
-                if not self._dry_run:
-                    if not dst_dir.exists():
-                        dst_dir.mkdir()
+
+        link_target = None if identity is None else linked_backups.get(identity)
+        try:
+            if not self._dry_run:
+                if not dst_dir.exists():
+                    dst_dir.mkdir()
+                if link_target is None or not self._link(link_target, str(dst_file)):
+                    link_target = None
                     shutil.copy2(str(src_file), str(dst_file))
-            except OSError as os_error:
-                self._logger.warning("ERROR: %s", str(os_error))
-                return None
-            else:
-                self._logger.info(
-                    "COPY_FILE_TO_[%s]: (%i MB) %s",
-                    self._dst_dir_name,
-                    round(src_file.size / 1024.0 / 1024.0 + 0.0005),
-                    src_file,
-                )
-                return (src_file, dst_file)
+        except OSError as os_error:
+            self._logger.warning("ERROR: %s", str(os_error))
+            return None
+
+        if not identity is None:
+            linked_backups.setdefault(identity, str(dst_file))
+
+        if link_target is None:
+            self._logger.info(
+                "COPY_FILE_TO_[%s]: (%i MB) %s",
+                self._dst_dir_name,
+                round(src_file.size / 1024.0 / 1024.0 + 0.0005),
+                src_file,
+            )
+        else:
+            self._logger.info(
+                "LINK_FILE_TO_[%s]: (%i MB) %s",
+                self._dst_dir_name,
+                round(src_file.size / 1024.0 / 1024.0 + 0.0005),
+                src_file,
+            )
+        return (src_file, dst_file)
 
     def create_backups(
-        self, src_list: list[FoundFile]
+        self,
+        src_list: list[FoundFile],
+        is_changed_in_place: Callable[[FoundFile], bool] = None,
     ) -> Generator[tuple[FoundFile, FoundFile]]:
         """Create a duplicate files for backup purposes.
 
+        Source files that are hardlinks to the same inode are copied once, and the\
+        other backups are created as hardlinks to the first one when the file\
+        system allows it.
+
         Args:
             src_list (list[FoundFile]): List of source files that need to be backed up.
+            is_changed_in_place (Callable[[FoundFile], bool], optional):\
+                Function that tells whether a source file was changed keeping the\
+                mtime and size of its last backup (see create_backup()). If None is\
+                passed, no file is regarded as such. Defaults to None.
 
         Yields:
             tuple[FoundFile, FoundFile]: File that have completed the backup process
@@ -308,20 +397,34 @@ class DestinationRepository:
             This method returns a Generator and processes one file at a time. To\
             complete the processing, all values must be retrieved from the Generator.
         """
-
+        linked_backups = {}
         for src_file in src_list:
-            result = self.create_backup(src_file)
+            changed_in_place = not is_changed_in_place is None and is_changed_in_place(
+                src_file
+            )
+            result = self.create_backup(src_file, linked_backups, changed_in_place)
             if not result is None:
                 yield result
 
+    def _link(self, link_target: str, dst_filepath: str) -> bool:
+        try:
+            os.link(link_target, dst_filepath)
+        except OSError as os_error:
+            # e.g. on another file system, or not supported by the file system
+            self._logger.debug("SKIP_LINK: %s", str(os_error))
+            return False
+        return True
+
     def get_all_backups(
-        self, all_files: dict[str, FoundFile] = None
+        self,
+        all_files: dict[str, FoundFile] | Iterable[tuple[str, FoundFile]] = None,
     ) -> Generator[tuple[str, tuple[FoundFile, str]]]:
         """Get all backups.
 
         Args:
-            all_files (dict[str, FoundFile], optional):\
+            all_files (dict[str, FoundFile] | Iterable[tuple[str, FoundFile]], optional):\
                 dict of information for all files already retrieved externally with AllFileScanner.\
+                An iterable of key and file pairs can also be passed.\
                 If omitted or None is passed, AllFileScanner is used internally.
 
         Yields:
@@ -331,10 +434,49 @@ class DestinationRepository:
         if all_files is None:
             all_files = self._scanner.get_all_files()
 
-        for key, file in all_files.items():
-            match_result = self._check_filepath_re.fullmatch(file.normpath_str)
-            if not match_result is None:
-                yield (key, (file, match_result.group(1) + match_result.group(2)))
+        if isinstance(all_files, dict):
+            all_files = all_files.items()
+
+        for key, file in all_files:
+            if file.in_dst_dir is False:
+                # Source files recognized during the scan cannot be backups.
+                continue
+            base_path = self.get_base_path(file.normpath_str)
+            if not base_path is None:
+                yield (key, (file, base_path))
+
+    def get_backup_rows(self, table: FileTable) -> list[tuple[int, str]]:
+        """Get rows of all backups in the table.
+
+        Args:
+            table (FileTable): Files found by AllFileScanner.get_file_table()
+
+        Returns:
+            list[tuple[int, str]]:\
+                Rows of the backup files and the base paths of them excluding the\
+                date and sequence number.
+        """
+        rows = table.rows_with_flag(FLAG_IN_DST_DIR)
+        result = []
+        for row, key in zip(rows, table.keys(rows)):
+            base_path = self.get_base_path(key)
+            if not base_path is None:
+                result.append((row, base_path))
+        return result
+
+    def get_base_path(self, key: str) -> str:
+        """Get the base path of the backup excluding the date and sequence number.
+
+        Args:
+            key (str): Normalized path of the file
+
+        Returns:
+            str: Base path. None if the file is not named as a backup.
+        """
+        match_result = self._check_filepath_re.fullmatch(key)
+        if match_result is None:
+            return None
+        return match_result.group(1) + match_result.group(2)
 
     def remove_backup(self, file: FoundFile) -> FoundFile:
         """Remove the specified backup file.
@@ -0,0 +1,234 @@
+"""Module for columnar representation of a scan result"""
+import math
+import os
+from array import array
+from collections.abc import Iterable
+
+from .fsutil import FoundFile
+
+#### Constants ####
+
+FLAG_IN_DST_DIR = 0x01
+FLAG_SYMLINK = 0x02
+FLAG_HIDDEN = 0x04
+FLAG_STAT_ERROR = 0x08
+
+#### Classes ####
+
+
+class FileTable:
+    """Columnar table of files found by the scan
+
+    Each file is a row. Directory paths and scan roots are interned and shared\
+    by all files in them, and numbers are held in typed arrays, so that a row\
+    costs a few dozen bytes instead of a FoundFile and its stat_result.
+
+    Attributes:
+        names (list[str]): Name of each file
+        dir_ids (array): Id of the directory of each file
+        sizes (array): st_size of each file
+        mtimes (array): st_mtime of each file (NaN if the status is unavailable)
+        inodes (array): st_ino of each file
+        devices (array): st_dev of each file
+        ctimes (array): st_ctime of each file (NaN if the status is unavailable)
+        modes (array): st_mode of each file
+        nlinks (array): st_nlink of each file
+        flags (array): FLAG_* bits of each file
+        dir_paths (list[str]): Path string of each directory
+        dir_relpaths (list[str]): Path of each directory relative to its scan root
+        dir_root_ids (array): Id of the scan root of each directory
+        roots (list[str]): Normalized path string of each scan root
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.dir_ids = array("L")
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.inodes = array("Q")
+        self.devices = array("Q")
+        self.ctimes = array("d")
+        self.modes = array("I")
+        self.nlinks = array("L")
+        self.flags = array("B")
+
+        self.dir_paths: list[str] = []
+        self.dir_relpaths: list[str] = []
+        self.dir_root_ids = array("L")
+        self.roots: list[str] = []
+
+        self._dir_index: dict[tuple[int, str], int] = {}
+        self._root_index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_files(cls, files: Iterable[FoundFile]) -> "FileTable":
+        """Build a table from files.
+
+        Args:
+            files (Iterable[FoundFile]): Files found by the scan
+
+        Returns:
+            FileTable: Table with a row per file
+        """
+        table = cls()
+        for file in files:
+            table.append(file)
+        return table
+
+    def append(self, file: FoundFile) -> None:
+        """Add a row of the file. The file object itself is not kept.
+
+        Args:
+            file (FoundFile): File found by the scan
+        """
+        root_id = self._root_index.get(file.scan_root_str)
+        if root_id is None:
+            root_id = len(self.roots)
+            self._root_index[file.scan_root_str] = root_id
+            self.roots.append(file.scan_root_str)
+
+        relpath = file.relpath_str
+        dir_relpath, name = os.path.split(relpath)
+        dir_id = self._dir_index.get((root_id, dir_relpath))
+        if dir_id is None:
+            dir_id = len(self.dir_paths)
+            self._dir_index[(root_id, dir_relpath)] = dir_id
+            self.dir_paths.append(file.parent_str)
+            self.dir_relpaths.append(dir_relpath)
+            self.dir_root_ids.append(root_id)
+
+        flags = 0
+        if file.in_dst_dir:
+            flags |= FLAG_IN_DST_DIR
+        if file.is_symlink():
+            flags |= FLAG_SYMLINK
+
+        try:
+            file_stat = file.stat()
+            if file.is_hidden():
+                flags |= FLAG_HIDDEN
+        except OSError:
+            # e.g. broken symbolic link
+            flags |= FLAG_STAT_ERROR
+            self.sizes.append(0)
+            self.mtimes.append(math.nan)
+            self.inodes.append(0)
+            self.devices.append(0)
+            self.ctimes.append(math.nan)
+            self.modes.append(0)
+            self.nlinks.append(0)
+        else:
+            self.sizes.append(file_stat.st_size)
+            self.mtimes.append(file_stat.st_mtime)
+            self.inodes.append(file_stat.st_ino)
+            self.devices.append(file_stat.st_dev)
+            self.ctimes.append(file_stat.st_ctime)
+            self.modes.append(file_stat.st_mode)
+            self.nlinks.append(file_stat.st_nlink)
+
+        self.names.append(name)
+        self.dir_ids.append(dir_id)
+        self.flags.append(flags)
+
+    def path(self, row: int) -> str:
+        """Path string of the file of the row."""
+        return os.path.join(self.dir_paths[self.dir_ids[row]], self.names[row])
+
+    def relpath(self, row: int) -> str:
+        """Path string of the file of the row relative to its scan root."""
+        dir_relpath = self.dir_relpaths[self.dir_ids[row]]
+        name = self.names[row]
+        return dir_relpath + os.sep + name if dir_relpath else name
+
+    def root(self, row: int) -> str:
+        """Normalized path string of the scan root of the row."""
+        return self.roots[self.dir_root_ids[self.dir_ids[row]]]
+
+    def keys(self, rows: Iterable[int]) -> list[str]:
+        """Normalized paths of the files of the rows (same as FoundFile.normpath_str).
+
+        Args:
+            rows (Iterable[int]): Rows of the table
+
+        Returns:
+            list[str]: Normalized paths in the order of rows
+        """
+        dir_paths = [os.path.normcase(dir_path) for dir_path in self.dir_paths]
+        dir_ids = self.dir_ids
+        names = self.names
+        normcase = os.path.normcase
+        join = os.path.join
+        return [join(dir_paths[dir_ids[row]], normcase(names[row])) for row in rows]
+
+    def rows_with_flag(self, flag: int, value: bool = True) -> list[int]:
+        """Rows whose flags have (or do not have) the bit.
+
+        Args:
+            flag (int): FLAG_* bit
+            value (bool, optional): Whether the bit is set. Defaults to True.
+
+        Returns:
+            list[int]: Rows in ascending order
+        """
+        if value:
+            return [row for row, flags in enumerate(self.flags) if flags & flag]
+        else:
+            return [row for row, flags in enumerate(self.flags) if not flags & flag]
+
+    def file(self, row: int) -> FoundFile:
+        """Create a FoundFile of the row, with the status captured at scan time.
+
+        Args:
+            row (int): Row of the table
+
+        Returns:
+            FoundFile: File of the row
+        """
+        flags = self.flags[row]
+        return FoundFile(
+            self.path(row),
+            self.root(row),
+            _RowEntry(self, row),
+            bool(flags & FLAG_IN_DST_DIR),
+        )
+
+
+class _RowEntry:
+    """Stand-in for os.DirEntry, giving the status held in a row of FileTable"""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: FileTable, row: int) -> None:
+        self._table = table
+        self._row = row
+
+    def is_symlink(self) -> bool:
+        return bool(self._table.flags[self._row] & FLAG_SYMLINK)
+
+    def stat(self) -> os.stat_result:
+        table = self._table
+        row = self._row
+        if table.flags[row] & FLAG_STAT_ERROR:
+            raise OSError(f"status is unavailable: {table.path(row)}")
+
+        # st_uid, st_gid and st_atime are not held in the table, and are filled
+        # with 0 and st_mtime. Platform specific fields (e.g. st_file_attributes)
+        # are not available.
+        mtime = table.mtimes[row]
+        ctime = table.ctimes[row]
+        return os.stat_result(
+            (
+                table.modes[row],
+                table.inodes[row],
+                table.devices[row],
+                table.nlinks[row],
+                0,
+                0,
+                table.sizes[row],
+            )
+            + (int(mtime), int(mtime), int(ctime))
+            + (mtime, mtime, ctime)
+        )
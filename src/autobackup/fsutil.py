@@ -1,11 +1,38 @@
 """Module of utilities related to file system"""
+import contextlib
+import functools
+import hashlib
 import os
 import pathlib
 import platform
+import re
 import stat
-from collections.abc import Generator
+import struct
+import threading
+import time
+from collections.abc import Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from logging import getLogger
 
+from .hotspot import HotspotRecorder
+from .ignorefile import IgnoreFiles, is_ignored
+
+# os.path.normcase() does nothing on POSIX, so the call is skipped there.
+_NORMCASE_NEEDED = os.path.normcase("A") != "A"
+_normcase = os.path.normcase if _NORMCASE_NEEDED else str
+# platform.system() is the same for all files, so it is called only once.
+_PLATFORM = platform.system()
+
+# ioctl to get the physical extents of a file (Linux)
+_FS_IOC_FIEMAP = 0xC020660B
+# The location is not known yet (e.g. delayed allocation)
+_FIEMAP_EXTENT_UNKNOWN = 0x00000002
+# struct fiemap (32 bytes) followed by one struct fiemap_extent (56 bytes)
+_FIEMAP_FORMAT = "=QQIIII" + "QQQQQIIII"
+
+# Hash function of the contents of files (BLAKE2b with 256-bit digest)
+_new_content_hash = functools.partial(hashlib.blake2b, digest_size=32)
+
 
 class ScanLoopError(Exception):
     """Loop detected during recursive scan
@@ -15,48 +42,384 @@ class ScanLoopError(Exception):
     """
 
 
+def get_physical_offset(filepath: str) -> int:
+    """Get the physical offset of the first extent of the file on its device.
+
+    The FIEMAP ioctl is used, which is supported by most Linux file systems.
+
+    Args:
+        filepath (str): Path of the file
+
+    Returns:
+        int: Offset in bytes. None if it is not available (e.g. empty file, other\
+            OS or file system).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return None
+
+    request = bytearray(struct.calcsize(_FIEMAP_FORMAT))
+    # fm_start = 0, fm_length = whole file, fm_extent_count = 1
+    struct.pack_into(
+        _FIEMAP_FORMAT, request, 0, 0, 0xFFFFFFFFFFFFFFFF, 0, 0, 1, 0, *([0] * 9)
+    )
+    try:
+        with open(filepath, "rb") as fp:
+            fcntl.ioctl(fp.fileno(), _FS_IOC_FIEMAP, request, True)
+    except OSError:
+        return None
+
+    fields = struct.unpack_from(_FIEMAP_FORMAT, request)
+    mapped_extents, physical, flags = fields[3], fields[7], fields[11]
+    if mapped_extents < 1 or flags & _FIEMAP_EXTENT_UNKNOWN:
+        return None
+    return physical
+
+
+def get_content_digest(filepath: str) -> bytes:
+    """Get the digest of the content of the file.
+
+    hashlib releases the GIL while hashing, so that files can be hashed in\
+    parallel by several threads.
+
+    Args:
+        filepath (str): Path of the file
+
+    Returns:
+        bytes: BLAKE2b digest (32 bytes)
+    """
+    with open(filepath, "rb") as fp:
+        return hashlib.file_digest(fp, _new_content_hash).digest()
+
+
+def _get_dir_identity(directory: os.DirEntry | str) -> tuple[int, int]:
+    """Get the identity of a directory as a pair of st_dev and st_ino.
+
+    The stat cached in os.DirEntry is used if possible. On Windows, the cached stat\
+    does not contain st_dev and st_ino, so the directory is stat'ed again.
+    """
+    if isinstance(directory, os.DirEntry):
+        dir_stat = directory.stat()
+        if dir_stat.st_ino != 0 or dir_stat.st_dev != 0:
+            return (dir_stat.st_dev, dir_stat.st_ino)
+        directory = directory.path
+
+    dir_stat = os.stat(directory)
+    return (dir_stat.st_dev, dir_stat.st_ino)
+
+
+class _ScanContext:
+    """Settings and state shared while scanning one directory tree"""
+
+    def __init__(
+        self,
+        scan_root: str,
+        scan_symlink_dir: bool,
+        exclude_dirs: Iterable[str] = None,
+        prune_regex: str = None,
+        ignore_files: IgnoreFiles = None,
+        dst_dir_name: str = None,
+        one_file_system: bool = False,
+        inode_order: bool = False,
+        hotspots: HotspotRecorder = None,
+        thread_safe: bool = False,
+        cancelled: threading.Event = None,
+    ) -> None:
+        self.scan_root = scan_root
+        # Shared by all files found in this tree instead of parsed for each file.
+        self.abs_root_str = os.path.abspath(scan_root)
+        self.root_str = _normcase(self.abs_root_str)
+        self.scan_symlink_dir = scan_symlink_dir
+        self.ignore_files = ignore_files
+        self.dst_dir_name = os.path.normcase(dst_dir_name) if dst_dir_name else None
+        # Files are tagged as source or backup only when dst_dir_name is known.
+        self.root_in_dst_dir = None if self.dst_dir_name is None else False
+        self.exclude_dirs = {os.path.normcase(name) for name in exclude_dirs or ()}
+        self.prune_re = re.compile(prune_regex) if prune_regex else None
+        root_id = _get_dir_identity(scan_root)
+        self.visited = {root_id}
+        # st_dev of the root, if the walk must not cross mount points.
+        self.root_dev = root_id[0] if one_file_system else None
+        self.skipped_mounts: list[str] = []
+        self.inode_order = inode_order
+        self.hotspots = hotspots
+        self.lock = threading.Lock() if thread_safe else contextlib.nullcontext()
+        self.cancelled = cancelled if not cancelled is None else threading.Event()
+
+    def is_excluded_dir(self, name: str, relpath: str) -> bool:
+        """Whether the directory is pruned by exclude_dirs or prune_regex."""
+        return os.path.normcase(name) in self.exclude_dirs or (
+            not self.prune_re is None and not self.prune_re.fullmatch(relpath) is None
+        )
+
+    def load_ignore_file(
+        self, dirpath: str, relpath: str, items: list[os.DirEntry], chain: tuple
+    ) -> tuple:
+        """Append the patterns of the ignore file in the directory to the chain."""
+        if chain is None or self.ignore_files is None:
+            return chain
+        for item in items:
+            if self.ignore_files.is_ignore_file(item.name):
+                matcher = self.ignore_files.get_matcher(dirpath, item)
+                if not matcher is None:
+                    return chain + ((relpath, matcher),)
+                break
+        return chain
+
+
 class RecursiveScanDir:
     """Class for scanning directry recursively"""
 
     def __init__(self) -> None:
         self._logger = getLogger(__name__)
+        # Mount points not descended into by the last scan with one_file_system.
+        self.skipped_mounts: list[str] = []
+        self._cancelled = threading.Event()
 
-    def _recursive_scandir(
-        self, dirpath: str, scan_root: str, scan_symlink_dir: bool, found: list[str]
-    ) -> Generator["FoundFile"]:
-        for item in os.scandir(dirpath):
-            item_hash = hash(os.path.normcase(os.path.realpath(item)))
-
-            if item_hash in found:
-                raise ScanLoopError(str(item))
-
-            found.append(item_hash)
+    def cancel(self) -> None:
+        """Stop the scan running in another thread before the next directory.
 
-            if item.is_dir():
-                if scan_symlink_dir or not item.is_symlink():
-                    yield from self._recursive_scandir(
-                        item.path, scan_root, scan_symlink_dir, found
-                    )
-            else:
-                yield FoundFile(item.path, scan_root)
+        No file is found and nothing is recorded to hotspots and ignore_files after\
+        the cancel, e.g. by the walk of a target abandoned after its timeout.
+        """
+        self._cancelled.set()
 
     def recursive_scandir(
-        self, dirpath: str = ".", scan_symlink_dir: bool = True
+        self,
+        dirpath: str = ".",
+        scan_symlink_dir: bool = True,
+        exclude_dirs: Iterable[str] = None,
+        prune_regex: str = None,
+        ignore_files: IgnoreFiles = None,
+        dst_dir_name: str = None,
+        one_file_system: bool = False,
+        inode_order: bool = False,
+        hotspots: HotspotRecorder = None,
     ) -> Generator["FoundFile"]:
         """Scan directory recursively.
 
         Args:
             dirpath (str, optional): Directory to scan recursively. Defaults to ".".
-            catch_link (bool, optional):\
+            scan_symlink_dir (bool, optional):\
+                Whether to scan the directory where the symbolic link leads. Defaults to True.
+            exclude_dirs (Iterable[str], optional):\
+                Names of directories not to descend into. Defaults to None.
+            prune_regex (str, optional):\
+                Regular expression of the relative paths of directories not to\
+                descend into. Defaults to None.
+            ignore_files (IgnoreFiles, optional):\
+                Ignore files to be applied while descending. Defaults to None.
+            dst_dir_name (str, optional):\
+                Name of backup destination directory, in which ignore files are\
+                not applied. Defaults to None.
+            one_file_system (bool, optional):\
+                Whether to stop at directories on other file systems than dirpath\
+                (mount points). They are listed in skipped_mounts. Defaults to False.
+            inode_order (bool, optional):\
+                Whether to list the entries of each directory in the order of inode\
+                numbers instead of the order of os.scandir(). Defaults to False.
+            hotspots (HotspotRecorder, optional):\
+                Recorder of the time spent on each directory. Defaults to None.
+
+        Yields:
+            FoundFile: FoundFile object pointing to the path of file.
+        """
+        ctx = _ScanContext(
+            dirpath,
+            scan_symlink_dir,
+            exclude_dirs,
+            prune_regex,
+            ignore_files,
+            dst_dir_name,
+            one_file_system,
+            inode_order,
+            hotspots,
+            cancelled=self._cancelled,
+        )
+        self.skipped_mounts = ctx.skipped_mounts
+
+        # Walk with an explicit stack instead of recursive generators, so that the
+        # depth of the tree is limited neither by the recursion limit nor by the
+        # number of directory handles opened at the same time.
+        stack = [(dirpath, "", (), ctx.root_in_dst_dir)]
+        while stack:
+            files, sub_dirs = self._scan_one_dir(*stack.pop(), ctx)
+            yield from files
+            stack.extend(reversed(sub_dirs))
+
+    def parallel_scandir(
+        self,
+        dirpath: str = ".",
+        scan_symlink_dir: bool = True,
+        workers: int = 4,
+        exclude_dirs: Iterable[str] = None,
+        prune_regex: str = None,
+        ignore_files: IgnoreFiles = None,
+        dst_dir_name: str = None,
+        one_file_system: bool = False,
+        inode_order: bool = False,
+        hotspots: HotspotRecorder = None,
+    ) -> Generator["FoundFile"]:
+        """Scan directory recursively with multiple threads.
+
+        Each thread lists one directory at a time from the shared queue of\
+        directories, and puts the sub-directories it finds back into the queue.\
+        The files found are the same as recursive_scandir(), but the order in\
+        which they are yielded is not deterministic.
+
+        Args:
+            dirpath (str, optional): Directory to scan recursively. Defaults to ".".
+            scan_symlink_dir (bool, optional):\
                 Whether to scan the directory where the symbolic link leads. Defaults to True.
+            workers (int, optional): Number of threads. Defaults to 4.
+            exclude_dirs (Iterable[str], optional):\
+                Names of directories not to descend into. Defaults to None.
+            prune_regex (str, optional):\
+                Regular expression of the relative paths of directories not to\
+                descend into. Defaults to None.
+            ignore_files (IgnoreFiles, optional):\
+                Ignore files to be applied while descending. Defaults to None.
+            dst_dir_name (str, optional):\
+                Name of backup destination directory, in which ignore files are\
+                not applied. Defaults to None.
+            one_file_system (bool, optional):\
+                Whether to stop at directories on other file systems than dirpath\
+                (mount points). They are listed in skipped_mounts. Defaults to False.
+            inode_order (bool, optional):\
+                Whether to list the entries of each directory in the order of inode\
+                numbers instead of the order of os.scandir(). Defaults to False.
+            hotspots (HotspotRecorder, optional):\
+                Recorder of the time spent on each directory. Defaults to None.
 
         Yields:
             FoundFile: FoundFile object pointing to the path of file.
         """
-        yield from self._recursive_scandir(dirpath, dirpath, scan_symlink_dir, [])
+        ctx = _ScanContext(
+            dirpath,
+            scan_symlink_dir,
+            exclude_dirs,
+            prune_regex,
+            ignore_files,
+            dst_dir_name,
+            one_file_system,
+            inode_order,
+            hotspots,
+            thread_safe=True,
+            cancelled=self._cancelled,
+        )
+        self.skipped_mounts = ctx.skipped_mounts
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pending: set[Future] = {
+                executor.submit(
+                    self._scan_one_dir, dirpath, "", (), ctx.root_in_dst_dir, ctx
+                )
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, sub_dirs = future.result()
+                    for sub_dir in sub_dirs:
+                        pending.add(executor.submit(self._scan_one_dir, *sub_dir, ctx))
+                    yield from files
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _scan_one_dir(
+        self,
+        dirpath: str,
+        relpath: str,
+        chain: tuple,
+        in_dst_dir: bool,
+        ctx: _ScanContext,
+    ) -> tuple[list["FoundFile"], list[tuple[str, str, tuple, bool]]]:
+        # chain holds the ignore files of the parent directories.
+        # None means that ignore files are not applied (in the destination directory).
+        # in_dst_dir tells whether dirpath is in the destination directory, which is
+        # recognized here once, so that no file has to be classified by its path later.
+        files = []
+        sub_dirs = []
+        if ctx.cancelled.is_set():
+            return (files, sub_dirs)
+        started = time.perf_counter()
+        with os.scandir(dirpath) as scandir_it:
+            items = list(scandir_it)
+        listed = time.perf_counter()
+        if ctx.cancelled.is_set():
+            # e.g. the listing was blocked on a hung mount until the timeout.
+            return (files, sub_dirs)
+
+        if ctx.inode_order:
+            # d_ino is returned by readdir(), so sorting needs no system call. The
+            # files are stat'ed in this order, which reduces seeks on HDD.
+            items.sort(key=os.DirEntry.inode)
+
+        chain = ctx.load_ignore_file(dirpath, relpath, items, chain)
+
+        for item in items:
+            if item.is_dir():
+                if ctx.scan_symlink_dir or not item.is_symlink():
+                    item_relpath = os.path.join(relpath, item.name)
+
+                    if ctx.is_excluded_dir(item.name, item_relpath):
+                        self._logger.debug("SKIP_DIR(Excluded): %s", item.path)
+                        continue
+
+                    sub_in_dst_dir = in_dst_dir
+                    if ctx.dst_dir_name == os.path.normcase(item.name):
+                        sub_chain = None
+                        sub_in_dst_dir = True
+                    elif chain and is_ignored(chain, item_relpath, True):
+                        self._logger.debug("SKIP_DIR(Ignored): %s", item.path)
+                        continue
+                    else:
+                        sub_chain = chain
+
+                    dir_id = _get_dir_identity(item)
+
+                    if not ctx.root_dev is None and dir_id[0] != ctx.root_dev:
+                        self._logger.debug("SKIP_DIR(Mount): %s", item.path)
+                        with ctx.lock:
+                            ctx.skipped_mounts.append(item.path)
+                        continue
+
+                    with ctx.lock:
+                        if dir_id in ctx.visited:
+                            raise ScanLoopError(str(item))
+                        ctx.visited.add(dir_id)
+
+                    sub_dirs.append(
+                        (item.path, item_relpath, sub_chain, sub_in_dst_dir)
+                    )
+            else:
+                item_relpath = relpath + os.sep + item.name if relpath else item.name
+                if not chain or not is_ignored(chain, item_relpath, False):
+                    files.append(
+                        FoundFile._from_scan(
+                            ctx.abs_root_str,
+                            ctx.root_str,
+                            item_relpath,
+                            item,
+                            in_dst_dir,
+                        )
+                    )
+
+        if not ctx.hotspots is None and not ctx.cancelled.is_set():
+            # The status of the entries is got by is_dir() and FoundFile, so the
+            # time after listing is spent mostly on stat().
+            ctx.hotspots.add(
+                dirpath, listed - started, time.perf_counter() - listed, len(items)
+            )
+
+        return (files, sub_dirs)
 
     def scandir(
-        self, dirpath: str = ".", dst_dir_name: str = None
+        self,
+        dirpath: str = ".",
+        dst_dir_name: str = None,
+        ignore_files: IgnoreFiles = None,
     ) -> Generator["FoundFile"]:
         """Scan directory.
 
@@ -65,27 +428,60 @@ class RecursiveScanDir:
         Args:
             dirpath (str, optional): Directory to scan. Defaults to ".".
             dst_dir_name (str, optional): Sub-directory to scan. Defaults to None.
+            ignore_files (IgnoreFiles, optional):\
+                Ignore files to be applied to the files in dirpath. Defaults to None.
 
         Yields:
             FoundFile: FoundFile object pointing to the path of file.
         """
+        in_dst_dir = False if dst_dir_name else None
+        matcher = None
+        if not ignore_files is None:
+            matcher = ignore_files.get_matcher(dirpath)
 
         for item in os.scandir(dirpath):
             if not item.is_dir():
-                yield FoundFile(item.path, dirpath)
+                if not matcher is None and matcher.match(item.name, False):
+                    continue
+                yield FoundFile(item.path, dirpath, item, in_dst_dir)
 
         if dst_dir_name:
             dst_dir_path = os.path.join(dirpath, dst_dir_name)
             if os.path.exists(dst_dir_path):
                 for item in os.scandir(dst_dir_path):
                     if not item.is_dir():
-                        yield FoundFile(item.path, dirpath)
+                        yield FoundFile(item.path, dirpath, item, True)
 
 
-class FoundFile(os.PathLike):
-    """Class of file which scanned with recursice_scandir() method"""
+class FoundFile:
+    """Class of file which scanned with recursice_scandir() method
+
+    Paths are kept as plain strings computed once at construction, and pathlib\
+    objects are created only when they are requested. Since millions of\
+    instances may be alive at the same time, attributes are stored in __slots__.\
+    (os.PathLike is not a base class because it has no __slots__, but instances\
+    are still recognized as os.PathLike by __fspath__.)
+    """
 
-    def __init__(self, filepath: str, scan_root_dirpath: str = None) -> None:
+    __slots__ = (
+        "_path_str",
+        "_root_str",
+        "_relpath_str",
+        "_str",
+        "_normpath_str",
+        "_hash",
+        "in_dst_dir",
+        "_stat",
+        "_is_symlink",
+    )
+
+    def __init__(
+        self,
+        filepath: str,
+        scan_root_dirpath: str = None,
+        dir_entry: os.DirEntry = None,
+        in_dst_dir: bool = None,
+    ) -> None:
         """Initializer
 
         Args:
@@ -93,70 +489,173 @@ class FoundFile(os.PathLike):
             scan_root_dirpath (str, optional):\
                 Path string of the directory that acts as the starting point for\
                 scanning files recursively.
+            dir_entry (os.DirEntry, optional):\
+                Entry of the file found by os.scandir(). If passed, the status of the\
+                file is captured from it, and no more system calls are needed to get\
+                size, mtime, etc. If omitted, the status is read on first access.
+            in_dst_dir (bool, optional):\
+                Whether the file is in the backup destination directory, as recognized\
+                during the scan. None means unknown. Defaults to None.
+
+        Raises:
+            ValueError: Raised when the file is not under scan_root_dirpath.
         """
         filepath = os.path.abspath(filepath)
-        self.path = pathlib.Path(filepath)
 
         if scan_root_dirpath is None:
-            scan_root_dirpath = os.path.dirname(filepath)
+            root_str = os.path.dirname(filepath)
+        else:
+            root_str = os.path.abspath(scan_root_dirpath)
+        if _NORMCASE_NEEDED:
+            root_str = os.path.normcase(root_str)
 
-        self.scan_root_path = pathlib.Path(
-            os.path.normcase(os.path.abspath(scan_root_dirpath))
-        )
+        prefix = root_str if root_str.endswith(os.sep) else root_str + os.sep
+        if _normcase(filepath[: len(prefix)]) == prefix:
+            relpath_str = filepath[len(prefix) :]
+        else:
+            # Raises ValueError with the same message as pathlib.
+            relpath_str = str(pathlib.Path(filepath).relative_to(root_str))
+
+        self._set_paths(filepath, root_str, relpath_str)
+        self.in_dst_dir = in_dst_dir
+        self._capture(dir_entry)
+
+    @classmethod
+    def _from_scan(
+        cls,
+        abs_root_str: str,
+        root_str: str,
+        relpath_str: str,
+        dir_entry: os.DirEntry,
+        in_dst_dir: bool,
+    ) -> "FoundFile":
+        # Constructor for the walkers, which already know the normalized root and
+        # the relative path, so that no path needs to be parsed again.
+        self = cls.__new__(cls)
+        self._set_paths(os.path.join(abs_root_str, relpath_str), root_str, relpath_str)
+        self.in_dst_dir = in_dst_dir
+        self._capture(dir_entry)
+        return self
+
+    def _set_paths(self, path_str: str, root_str: str, relpath_str: str) -> None:
+        self._path_str = path_str
+        self._root_str = root_str
+        self._relpath_str = relpath_str
+        if _NORMCASE_NEEDED:
+            self._str = os.path.join(root_str, relpath_str)
+            self._normpath_str = os.path.normcase(self._str)
+        else:
+            # Share one string object, since the paths are identical on POSIX.
+            self._str = path_str
+            self._normpath_str = path_str
+        self._hash = hash((self._str, root_str))
+
+    def _capture(self, dir_entry: os.DirEntry) -> None:
+        self._stat = None
+        self._is_symlink = None
+        if not dir_entry is None:
+            self._is_symlink = dir_entry.is_symlink()
+            try:
+                self._stat = dir_entry.stat()
+            except OSError:
+                # e.g. broken symbolic link. The error is raised again on access.
+                pass
+
+    @property
+    def path(self) -> pathlib.Path:
+        """pathlib.Path object of the found file"""
+        return pathlib.Path(self._path_str)
+
+    @property
+    def scan_root_path(self) -> pathlib.Path:
+        """pathlib.Path object of the directory where the scan started (normalized)"""
+        return pathlib.Path(self._root_str)
+
+    @property
+    def scan_root_str(self) -> str:
+        """Path string of the directory where the scan started (normalized)"""
+        return self._root_str
 
     @property
     def relpath(self) -> pathlib.Path:
         """Relative path"""
-        return self.path.relative_to(self.scan_root_path)
+        return pathlib.Path(self._relpath_str)
+
+    @property
+    def relpath_str(self) -> str:
+        """Relative path string"""
+        return self._relpath_str
 
     @property
     def normpath_str(self) -> str:
         """Normalized path"""
-        return os.path.normpath(os.path.normcase(str(self)))
+        return self._normpath_str
 
     @property
     def size(self) -> int:
         """st_size of file"""
-        return self.path.stat().st_size
+        return self.stat().st_size
 
     @property
     def mtime(self) -> float:
         """st_mtime of file"""
-        return self.path.stat().st_mtime
+        return self.stat().st_mtime
+
+    @property
+    def ctime(self) -> float:
+        """st_ctime of file"""
+        return self.stat().st_ctime
+
+    @property
+    def mode(self) -> int:
+        """st_mode of file"""
+        return self.stat().st_mode
+
+    @property
+    def inode(self) -> int:
+        """st_ino of file (0 if it is not available from the scan on this platform)"""
+        return self.stat().st_ino
+
+    @property
+    def device(self) -> int:
+        """st_dev of file (0 if it is not available from the scan on this platform)"""
+        return self.stat().st_dev
 
     @property
     def name(self) -> str:
         """Name of file"""
-        return self.path.name
+        if os.altsep is None:
+            # Faster than os.path.basename(), which is called for every file.
+            return self._relpath_str[self._relpath_str.rfind(os.sep) + 1 :]
+        return os.path.basename(self._relpath_str)
 
     @property
     def stem(self) -> str:
         """Base name of file(stem)"""
-        # if self.path.stem == "":
-        #     return self.path.suffix
-        # else:
-        #     return self.path.stem
-        return self.path.stem
+        name = self.name
+        i = name.rfind(".")
+        # Same as pathlib: a leading dot does not start a suffix.
+        return name[:i] if 0 < i < len(name) - 1 else name
 
     @property
     def suffix(self) -> str:
         """Suffix of file name (a.k.a file extention)"""
-        # if self.path.stem == "":
-        #     return ""
-        # else:
-        #     return self.path.suffix
-        return self.path.suffix
+        name = self.name
+        i = name.rfind(".")
+        return name[i:] if 0 < i < len(name) - 1 else ""
 
     @property
     def parent(self) -> pathlib.Path:
         """Parent directry"""
-        relpath = self.path.parent.relative_to(self.scan_root_path)
-        return pathlib.Path(
-            os.path.normpath(os.path.join(self.scan_root_path, relpath))
-        )
+        return pathlib.Path(self.parent_str)
+
+    @property
+    def parent_str(self) -> str:
+        """Path string of parent directry"""
+        return os.path.dirname(self._str)
 
     def __str__(self) -> str:
-        return os.path.join(str(self.scan_root_path), str(self.relpath))
+        return self._str
 
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, FoundFile):
@@ -164,17 +663,17 @@ class FoundFile(os.PathLike):
         elif isinstance(__o, os.PathLike):
             return self.path == __o
         elif isinstance(__o, str):
-            return str(self.path) == __o
+            return self._path_str == __o
         elif isinstance(__o, bytes):
-            return bytes(self.path) == __o
+            return os.fsencode(self._path_str) == __o
         else:
             return NotImplemented
 
     def __hash__(self):
-        return hash(str(self)) ^ hash(self.scan_root_path)
+        return self._hash
 
     def __fspath__(self):
-        return str(self)
+        return self._str
 
     def __bytes__(self):
         """Return the bytes representation of the path.  This is only
@@ -195,15 +694,29 @@ class FoundFile(os.PathLike):
         Returns:
             bool: Whether this path is symbolic link or not.
         """
-        return self.path.is_symlink()
+        if self._is_symlink is None:
+            self._is_symlink = os.path.islink(self._path_str)
+        return self._is_symlink
 
     def stat(self) -> os.stat_result:
         """Get status of file
 
+        The status captured at scan time (or at the first call) is returned.\
+        Use refresh() to read the current status.
+
         Returns:
             os.stat_result: Status of file
         """
-        return self.path.stat()
+        if self._stat is None:
+            self._stat = os.stat(self._path_str)
+        return self._stat
+
+    def refresh(self) -> None:
+        """Re-read the status of file, discarding the captured one."""
+        self._stat = None
+        self._is_symlink = None
+        self.stat()
+        self.is_symlink()
 
     def exists(self) -> bool:
         """Whether this file exists of not.
@@ -211,7 +724,7 @@ class FoundFile(os.PathLike):
         Returns:
             bool: Whether this file exists of not.
         """
-        return self.path.exists()
+        return os.path.exists(self._path_str)
 
     def is_hidden(self) -> bool:
         """Whether this file is hidden or not.
@@ -222,7 +735,7 @@ class FoundFile(os.PathLike):
         Returns:
             bool: Whether this file is hidden or not
         """
-        pf = platform.system()
+        pf = _PLATFORM
 
         if pf == "Windows":
             return self.stat().st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN
@@ -0,0 +1,265 @@
+"""Module for per-directory scan statistics and their history"""
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+from logging import getLogger
+from typing import NamedTuple
+
+from .metarepo import migrate_db
+
+_RUN_TABLE_NAME = "scanrun"
+_HOTSPOT_TABLE_NAME = "hotspot"
+
+#### Classes ####
+
+
+class DirStat(NamedTuple):
+    """Class of the cost of listing one directory"""
+
+    path: str
+    list_sec: float
+    stat_sec: float
+    entries: int
+
+    @property
+    def total_sec(self) -> float:
+        """Seconds spent on the directory"""
+        return self.list_sec + self.stat_sec
+
+
+class HotspotRecorder:
+    """Keeps the slowest and the largest directories found by the walks
+
+    Only top_n directories of each kind are kept, so the memory usage does not\
+    depend on the number of directories. add() may be called from several threads.
+    """
+
+    def __init__(self, top_n: int = 20) -> None:
+        """Initializer
+
+        Args:
+            top_n (int, optional):\
+                Number of the slowest and of the largest directories to keep.\
+                Defaults to 20.
+        """
+        self._top_n = top_n
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._slowest: list[tuple[float, int, DirStat]] = []
+        self._largest: list[tuple[int, int, DirStat]] = []
+        self.dirs = 0
+
+    def add(self, path: str, list_sec: float, stat_sec: float, entries: int) -> None:
+        """Record the cost of a directory.
+
+        Args:
+            path (str): Path of the directory
+            list_sec (float): Seconds spent on listing the entries
+            stat_sec (float): Seconds spent on getting the status of the entries
+            entries (int): Number of the entries
+        """
+        dir_stat = DirStat(path, list_sec, stat_sec, entries)
+        with self._lock:
+            self.dirs += 1
+            seq = next(self._seq)
+            self._push(self._slowest, (dir_stat.total_sec, seq, dir_stat))
+            self._push(self._largest, (entries, seq, dir_stat))
+
+    def _push(self, heap: list, item: tuple) -> None:
+        # Min-heaps of the top_n items, whose smallest item is replaced.
+        if len(heap) < self._top_n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def slowest(self) -> list[DirStat]:
+        """Directories which took the longest, from the slowest."""
+        return [item[2] for item in sorted(self._slowest, reverse=True)]
+
+    def largest(self) -> list[DirStat]:
+        """Directories which have the most entries, from the largest."""
+        return [item[2] for item in sorted(self._largest, reverse=True)]
+
+    def clear(self) -> None:
+        """Forget the recorded directories, e.g. before the next run."""
+        with self._lock:
+            self._slowest = []
+            self._largest = []
+            self.dirs = 0
+
+
+class HotspotRepository:
+    """Class of repository for storing the hotspots of each run"""
+
+    def __init__(self, db_connection: sqlite3.Connection, max_runs: int = 30):
+        """Initializer
+
+        The tables are created by the migrations of the DB (see\
+        metarepo.migrate_db()).
+
+        Args:
+            db_connection (sqlite3.Connection): Connection to DB
+            max_runs (int, optional):\
+                Number of the recent runs to keep. Defaults to 30.
+        """
+        self._dbconn = db_connection
+        self._max_runs = max_runs
+        self._logger = getLogger(__name__)
+
+        migrate_db(self._dbconn)
+
+    def save_run(self, recorder: HotspotRecorder, started: float = None) -> int:
+        """Store the directories kept by the recorder as a new run.
+
+        Runs older than the recent max_runs are removed.
+
+        Args:
+            recorder (HotspotRecorder): Recorder of the run
+            started (float, optional):\
+                Time when the run started. If None is passed, the current time is\
+                used. Defaults to None.
+
+        Returns:
+            int: Id of the run
+        """
+        if started is None:
+            started = time.time()
+
+        dir_stats = {
+            dir_stat.path: dir_stat
+            for dir_stat in recorder.slowest() + recorder.largest()
+        }
+
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"INSERT INTO {_RUN_TABLE_NAME}(started, dirs) VALUES(?, ?)",
+            (started, recorder.dirs),
+        )
+        run_id = cur.lastrowid
+        cur.executemany(
+            f"INSERT INTO {_HOTSPOT_TABLE_NAME}"
+            "(run_id, path, list_sec, stat_sec, entries) VALUES(?, ?, ?, ?, ?)",
+            [(run_id, *dir_stat) for dir_stat in dir_stats.values()],
+        )
+        old_runs = (
+            f"SELECT run_id FROM {_RUN_TABLE_NAME}"
+            " ORDER BY run_id DESC LIMIT -1 OFFSET ?"
+        )
+        cur.execute(
+            f"DELETE FROM {_HOTSPOT_TABLE_NAME} WHERE run_id IN ({old_runs})",
+            (self._max_runs,),
+        )
+        cur.execute(
+            f"DELETE FROM {_RUN_TABLE_NAME} WHERE run_id IN ({old_runs})",
+            (self._max_runs,),
+        )
+        self._dbconn.commit()
+        cur.close()
+
+        self._logger.debug("SAVE_HOTSPOTS: (%i dirs) run %i", len(dir_stats), run_id)
+        return run_id
+
+    def get_run_ids(self, runs: int) -> list[int]:
+        """Get the ids of the recent runs.
+
+        Args:
+            runs (int): Number of the runs
+
+        Returns:
+            list[int]: Ids of the runs, from the oldest to the latest
+        """
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"SELECT run_id FROM {_RUN_TABLE_NAME} ORDER BY run_id DESC LIMIT ?",
+            (runs,),
+        )
+        result = [run_id for (run_id,) in cur]
+        cur.close()
+        return list(reversed(result))
+
+    def get_hotspots(
+        self, run_id: int, limit: int, by_entries: bool = False
+    ) -> list[DirStat]:
+        """Get the slowest or the largest directories of the run.
+
+        Args:
+            run_id (int): Id of the run
+            limit (int): Number of the directories
+            by_entries (bool, optional):\
+                Whether to order by the number of entries instead of the seconds.\
+                Defaults to False.
+
+        Returns:
+            list[DirStat]: Directories, from the slowest or the largest
+        """
+        order = "entries" if by_entries else "list_sec + stat_sec"
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"SELECT path, list_sec, stat_sec, entries FROM {_HOTSPOT_TABLE_NAME}"
+            f" WHERE run_id = ? ORDER BY {order} DESC LIMIT ?",
+            (run_id, limit),
+        )
+        result = [DirStat(*row) for row in cur]
+        cur.close()
+        return result
+
+    def get_trend(self, path: str, run_ids: list[int]) -> list[DirStat]:
+        """Get the history of the directory over the runs.
+
+        Args:
+            path (str): Path of the directory
+            run_ids (list[int]): Ids of the runs
+
+        Returns:
+            list[DirStat]:\
+                Statistics of each run. None for the runs in which the directory\
+                was not a hotspot.
+        """
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"SELECT run_id, path, list_sec, stat_sec, entries"
+            f" FROM {_HOTSPOT_TABLE_NAME} WHERE path = ?",
+            (path,),
+        )
+        by_run = {row[0]: DirStat(*row[1:]) for row in cur}
+        cur.close()
+        return [by_run.get(run_id) for run_id in run_ids]
+
+    def format_report(self, limit: int = 20, runs: int = 10) -> list[str]:
+        """Format the hotspots of the latest run and their trend.
+
+        Args:
+            limit (int, optional):\
+                Number of the slowest and of the largest directories. Defaults to 20.
+            runs (int, optional):\
+                Number of the recent runs in the trend. Defaults to 10.
+
+        Returns:
+            list[str]: Lines of the report
+        """
+        run_ids = self.get_run_ids(runs)
+        if not run_ids:
+            return ["No scan has been recorded yet."]
+
+        lines = []
+        for title, by_entries in (("Slowest", False), ("Largest", True)):
+            lines.append(
+                f"{title} directories of the latest run"
+                f" (trend over {len(run_ids)} runs, oldest first):"
+            )
+            for dir_stat in self.get_hotspots(run_ids[-1], limit, by_entries):
+                trend = " ".join(
+                    "-"
+                    if past is None
+                    else (str(past.entries) if by_entries else f"{past.total_sec:.3f}")
+                    for past in self.get_trend(dir_stat.path, run_ids)
+                )
+                lines.append(
+                    f"  {dir_stat.total_sec:8.3f} sec"
+                    f" (list {dir_stat.list_sec:.3f}, stat {dir_stat.stat_sec:.3f})"
+                    f" {dir_stat.entries:8d} entries  {dir_stat.path}"
+                )
+                lines.append(f"      trend: {trend}")
+        return lines
@@ -0,0 +1,321 @@
+"""Module for per-directory ignore files with gitignore pattern semantics"""
+import json
+import os
+import re
+import threading
+from logging import getLogger
+from typing import NamedTuple
+
+#### Constants ####
+
+_IGNORECASE = os.path.normcase("A") == "a"
+_FLAGS = re.IGNORECASE if _IGNORECASE else 0
+
+#### Classes ####
+
+
+class IgnoreRule(NamedTuple):
+    """Class of a pattern line of ignore file"""
+
+    regex: str
+    negate: bool
+    dir_only: bool
+
+
+class IgnoreMatcher:
+    """Compiled patterns of one ignore file"""
+
+    def __init__(self, rules: list[IgnoreRule]) -> None:
+        """Initializer
+
+        A pattern which cannot be compiled (e.g. "[z-a]") never matches, as in git.
+
+        Args:
+            rules (list[IgnoreRule]): Patterns in the order of the ignore file
+        """
+        self.rules = rules
+        self._compiled = []
+        for rule in reversed(rules):
+            try:
+                regex = re.compile(rule.regex, _FLAGS)
+            except re.error as re_error:
+                getLogger(__name__).warning(
+                    "IGNORE_RULE_ERROR: %s (%s)", rule.regex, str(re_error)
+                )
+                continue
+            self._compiled.append((regex, rule.negate, rule.dir_only))
+
+    def match(self, relpath: str, is_dir: bool) -> bool:
+        """Match the path against the patterns. The last matching pattern decides.
+
+        Args:
+            relpath (str):\
+                Path relative to the directory of the ignore file, separated with "/".
+            is_dir (bool): Whether the path is a directory.
+
+        Returns:
+            bool:\
+                True if ignored, False if re-included by "!" pattern.\
+                None if no pattern matches.
+        """
+        for regex, negate, dir_only in self._compiled:
+            if dir_only and not is_dir:
+                continue
+            if not regex.fullmatch(relpath) is None:
+                return not negate
+        return None
+
+
+class IgnoreFiles:
+    """Loader and cache of ignore files placed in the scanned directories"""
+
+    def __init__(self, filename: str, cache_filepath: str = None) -> None:
+        """Initializer
+
+        Args:
+            filename (str): Name of ignore files (e.g. ".autobackupignore")
+            cache_filepath (str, optional):\
+                Path of the file to keep the parsed patterns between runs.\
+                If None is passed, patterns are parsed on every run. Defaults to None.
+        """
+        self.filename = filename
+        self._normcased_filename = os.path.normcase(filename)
+        self._cache_filepath = cache_filepath
+        self._logger = getLogger(__name__)
+        self._lock = threading.Lock()
+        self._matchers: dict[str, tuple[tuple[int, int], IgnoreMatcher]] = {}
+        self._persisted = self._load_cache()
+
+    def is_ignore_file(self, name: str) -> bool:
+        """Whether the name is the name of ignore files."""
+        return os.path.normcase(name) == self._normcased_filename
+
+    def get_matcher(
+        self, dirpath: str, dir_entry: os.DirEntry = None
+    ) -> IgnoreMatcher:
+        """Get the compiled patterns of the ignore file in the directory.
+
+        Args:
+            dirpath (str): Directory which may contain the ignore file
+            dir_entry (os.DirEntry, optional):\
+                Entry of the ignore file found by os.scandir(). Defaults to None.
+
+        Returns:
+            IgnoreMatcher: Compiled patterns. None if there is no ignore file.
+        """
+        filepath = os.path.join(dirpath, self.filename)
+        try:
+            file_stat = os.stat(filepath) if dir_entry is None else dir_entry.stat()
+        except OSError:
+            return None
+
+        key = os.path.normcase(os.path.abspath(filepath))
+        version = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        cached = self._matchers.get(key)
+        if not cached is None and cached[0] == version:
+            return cached[1]
+
+        persisted = self._persisted.get(key)
+        if not persisted is None and tuple(persisted["version"]) == version:
+            rules = [IgnoreRule(*rule) for rule in persisted["rules"]]
+        else:
+            try:
+                with open(filepath, encoding="utf-8", errors="replace") as fp:
+                    rules = parse_ignore_lines(fp)
+            except OSError as os_error:
+                self._logger.warning("IGNORE_FILE_ERROR: %s", str(os_error))
+                return None
+            self._logger.debug("IGNORE_FILE: (%i rules) %s", len(rules), filepath)
+
+        matcher = IgnoreMatcher(rules)
+        with self._lock:
+            self._matchers[key] = (version, matcher)
+        return matcher
+
+    def is_ignored(
+        self, scan_root: str, relpath: str, dst_dir_name: str = None
+    ) -> bool:
+        """Whether the file is ignored by the ignore files from scan_root down to it.
+
+        Args:
+            scan_root (str): Target directory which contains the file
+            relpath (str): Path of the file relative to scan_root
+            dst_dir_name (str, optional):\
+                Name of backup destination directory, in which ignore files are\
+                not applied. Defaults to None.
+
+        Returns:
+            bool: True if the file or one of its parent directories is ignored.
+        """
+        parts = relpath.split(os.sep)
+        if not dst_dir_name is None and os.path.normcase(dst_dir_name) in [
+            os.path.normcase(part) for part in parts[:-1]
+        ]:
+            return False
+
+        chain = ()
+        for i in range(len(parts)):
+            base = os.sep.join(parts[:i])
+            matcher = self.get_matcher(os.path.join(scan_root, base))
+            if not matcher is None:
+                chain = chain + ((base, matcher),)
+            if is_ignored(chain, os.sep.join(parts[: i + 1]), i < len(parts) - 1):
+                return True
+        return False
+
+    def save(self) -> None:
+        """Write the patterns of the ignore files loaded in this run to the cache."""
+        if self._cache_filepath is None:
+            return
+
+        with self._lock:
+            cache = {
+                key: {"version": list(version), "rules": matcher.rules}
+                for key, (version, matcher) in self._matchers.items()
+            }
+
+        tmp_filepath = self._cache_filepath + ".tmp"
+        try:
+            with open(tmp_filepath, "w", encoding="utf-8") as fp:
+                json.dump(cache, fp)
+            os.replace(tmp_filepath, self._cache_filepath)
+        except OSError as os_error:
+            self._logger.warning("IGNORE_CACHE_ERROR: %s", str(os_error))
+
+    def _load_cache(self) -> dict:
+        if self._cache_filepath is None or not os.path.exists(self._cache_filepath):
+            return {}
+        try:
+            with open(self._cache_filepath, encoding="utf-8") as fp:
+                return json.load(fp)
+        except (OSError, ValueError) as exc:
+            self._logger.warning("IGNORE_CACHE_ERROR: %s", str(exc))
+            return {}
+
+
+#### Functions ####
+
+
+def is_ignored(
+    chain: tuple[tuple[str, IgnoreMatcher], ...], relpath: str, is_dir: bool
+) -> bool:
+    """Whether the path is ignored by the ignore files of its parent directories.
+
+    Args:
+        chain (tuple[tuple[str, IgnoreMatcher], ...]):\
+            Relative paths of the directories containing ignore files and their\
+            compiled patterns, from the shallowest to the deepest.
+        relpath (str): Path relative to the scan root
+        is_dir (bool): Whether the path is a directory.
+
+    Returns:
+        bool: True if ignored
+    """
+    if os.sep != "/":
+        relpath = relpath.replace(os.sep, "/")
+
+    # Patterns of the deeper ignore file take precedence.
+    for base, matcher in reversed(chain):
+        if base:
+            if os.sep != "/":
+                base = base.replace(os.sep, "/")
+            sub_relpath = relpath[len(base) + 1 :]
+        else:
+            sub_relpath = relpath
+        result = matcher.match(sub_relpath, is_dir)
+        if not result is None:
+            return result
+    return False
+
+
+def parse_ignore_lines(lines) -> list[IgnoreRule]:
+    """Parse the lines of ignore file with gitignore semantics.
+
+    Args:
+        lines (Iterable[str]): Lines of ignore file
+
+    Returns:
+        list[IgnoreRule]: Patterns translated into regular expressions
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        line = _strip_trailing_spaces(line)
+        if line == "" or line.startswith("#"):
+            continue
+
+        negate = False
+        if line.startswith("!"):
+            negate = True
+            line = line[1:]
+        elif line.startswith("\\#") or line.startswith("\\!"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if line == "":
+            continue
+
+        anchored = "/" in line
+        line = line.lstrip("/")
+
+        regex = _translate_path(line)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        rules.append(IgnoreRule(regex, negate, dir_only))
+    return rules
+
+
+def _strip_trailing_spaces(line: str) -> str:
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        return stripped + " "
+    return stripped
+
+
+def _translate_path(pattern: str) -> str:
+    segments = pattern.split("/")
+    regex = ""
+    for i, segment in enumerate(segments):
+        is_last = i == len(segments) - 1
+        if segment == "**":
+            regex += ".*" if is_last else "(?:.*/)?"
+        else:
+            regex += _translate_segment(segment) + ("" if is_last else "/")
+    return regex
+
+
+def _translate_segment(segment: str) -> str:
+    regex = ""
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            while i + 1 < len(segment) and segment[i + 1] == "*":
+                i += 1
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "\\" and i + 1 < len(segment):
+            i += 1
+            regex += re.escape(segment[i])
+        elif char == "[":
+            start = i + 1
+            if segment[start : start + 1] in ("!", "^"):
+                start += 1
+            if segment[start : start + 1] == "]":
+                start += 1
+            end = segment.find("]", start)
+            if end < 0:
+                regex += re.escape(char)
+            else:
+                body = segment[i + 1 : end].replace("[", "\\[")
+                if body[0] in ("!", "^"):
+                    body = "^" + body[1:]
+                regex += "[" + body + "]"
+                i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex
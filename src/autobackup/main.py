@@ -4,13 +4,17 @@ import os
 import sqlite3
 import sys
 import time
+from collections.abc import Callable
 from contextlib import closing
 from logging import FileHandler, Logger, error, getLogger
 
 from .appinit import init_app
 from .bkup import BackupFacade
 from .cnf import CnfError, ConfigurationLoader, get_cli_cnf
+from .hotspot import HotspotRecorder, HotspotRepository
+from .ignorefile import IgnoreFiles
 from .repoinit import BackupRepositoryFactory, MetadataRepositoryFactory
+from .watcher import BackupWatcher, TargetWatcher
 
 
 class Main:
@@ -61,6 +65,9 @@ class Main:
         Returns:
             int: Exit code of command
         """
+        if self._app_cnf["common"]["report_hotspots"]:
+            return self._report_hotspots()
+
         exit_code = -1
 
         try:
@@ -68,6 +75,22 @@ class Main:
                 "START: autobackup%s",
                 (" (dry-run)" if self._app_cnf["common"]["dry_run"] else ""),
             )
+            # Preparing the ignore files
+            ignore_files = None
+            if self._app_cnf["common"]["ignore_filename"]:
+                ignore_files = IgnoreFiles(
+                    self._app_cnf["common"]["ignore_filename"],
+                    os.path.join(
+                        self._app_cnf["common"]["var_dirpath"],
+                        self._app_cnf["common"]["ignore_cache_filename"],
+                    ),
+                )
+
+            # Preparing the recorder of the slowest and the largest directories
+            hotspots = None
+            if self._app_cnf["common"]["hotspot_top"] > 0:
+                hotspots = HotspotRecorder(self._app_cnf["common"]["hotspot_top"])
+
             # Preparing the BackupRepositories
             b_factory = BackupRepositoryFactory(
                 self._app_cnf["targets"],
@@ -76,33 +99,71 @@ class Main:
                 self._seq_num_sep,
                 self._app_cnf["common"]["scan_symlink_dir"],
                 self._app_cnf["common"]["dry_run"],
+                self._app_cnf["common"]["scan_workers"],
+                self._app_cnf["common"]["walk_workers"],
+                ignore_files,
+                self._app_cnf["common"]["copy_order"] != "scan",
+                hotspots,
             )
             s_repo = b_factory.get_source_repository()
             d_repo = b_factory.get_destination_repository()
             scnr = b_factory.get_all_file_scanner()
 
-            with closing(
-                sqlite3.connect(
-                    os.path.join(
-                        self._app_cnf["common"]["var_dirpath"],
-                        self._app_cnf["common"]["db_filename"],
-                    )
-                )
-            ) as dbconn:
+            with closing(sqlite3.connect(self._get_db_filepath())) as dbconn:
                 # Preparing the MetadatapRepository
-                m_factory = MetadataRepositoryFactory(dbconn)
+                m_factory = MetadataRepositoryFactory(
+                    dbconn,
+                    self._app_cnf["common"]["db_journal_mode"],
+                    self._app_cnf["common"]["db_synchronous"],
+                    self._app_cnf["common"]["db_cache_size_kib"],
+                    self._app_cnf["common"]["db_mmap_size_mib"],
+                    self._app_cnf["common"]["db_temp_store"],
+                )
                 m_repo = m_factory.get_metadata_repository()
 
                 # Preparing the BackupFacade
-                b_facade = BackupFacade(s_repo, d_repo, m_repo, scnr)
+                b_facade = BackupFacade(
+                    s_repo,
+                    d_repo,
+                    m_repo,
+                    scnr,
+                    self._app_cnf["common"]["metadata_batch_size"],
+                    self._app_cnf["common"]["metadata_batch_sec"],
+                    [
+                        target["path"]
+                        for target in self._app_cnf["targets"]
+                        if target.get("change_detection", "mtime") == "hash"
+                    ],
+                    self._app_cnf["common"]["hash_workers"],
+                )
 
-                # Execute
-                b_facade.execute(
-                    self._app_cnf["common"]["discard_old_backup"],
-                    self._app_cnf["common"]["discard_phase1_weeks"],
-                    self._app_cnf["common"]["discard_phase2_months"],
+                h_repo = HotspotRepository(
+                    dbconn, self._app_cnf["common"]["hotspot_runs"]
                 )
 
+                def _execute_backup() -> None:
+                    started = time.time()
+                    b_facade.execute(
+                        self._app_cnf["common"]["discard_old_backup"],
+                        self._app_cnf["common"]["discard_phase1_weeks"],
+                        self._app_cnf["common"]["discard_phase2_months"],
+                        self._app_cnf["common"]["streaming"],
+                        self._app_cnf["common"]["columnar"],
+                        self._app_cnf["common"]["copy_order"],
+                        self._app_cnf["common"]["bulk_diff"],
+                    )
+                    if not hotspots is None:
+                        h_repo.save_run(hotspots, started)
+                        hotspots.clear()
+                    m_repo.prune_hash_cache()
+                    m_repo.incremental_vacuum()
+
+                # Execute
+                if self._app_cnf["common"]["watch"]:
+                    self._watch(b_facade, _execute_backup, ignore_files)
+                else:
+                    _execute_backup()
+
             self._logger.info(
                 "FINISH: autobackup%s",
                 (" (dry-run)" if self._app_cnf["common"]["dry_run"] else ""),
@@ -124,3 +185,61 @@ class Main:
             self._logger.error("FINISH_WITH_ERROR: %s: %s", type(exc), exc)
         finally:
             return exit_code
+
+    def _report_hotspots(self) -> int:
+        """Print the hotspots of the recent scans.
+
+        Returns:
+            int: Exit code of command
+        """
+        try:
+            with closing(sqlite3.connect(self._get_db_filepath())) as dbconn:
+                h_repo = HotspotRepository(
+                    dbconn, self._app_cnf["common"]["hotspot_runs"]
+                )
+                for line in h_repo.format_report(
+                    self._app_cnf["common"]["hotspot_top"] or 20
+                ):
+                    print(line)
+        except sqlite3.Error as db_err:
+            self._logger.error("FINISH_WITH_ERROR: %s: %s", type(db_err), db_err)
+            return -1
+        return 0
+
+    def _get_db_filepath(self) -> str:
+        return os.path.join(
+            self._app_cnf["common"]["var_dirpath"],
+            self._app_cnf["common"]["db_filename"],
+        )
+
+    def _watch(
+        self,
+        b_facade: BackupFacade,
+        execute_backup: Callable[[], None],
+        ignore_files: IgnoreFiles = None,
+    ):
+        """Back up files continuously until interrupted.
+
+        Args:
+            b_facade (BackupFacade): BackupFacade object
+            execute_backup (Callable[[], None]): Function that runs a full backup
+            ignore_files (IgnoreFiles, optional):\
+                Ignore files to be applied to the changed files. Defaults to None.
+        """
+        target_watcher = TargetWatcher(
+            self._app_cnf["targets"],
+            self._app_cnf["common"]["destination_dir"],
+            self._app_cnf["common"]["scan_symlink_dir"],
+            self._app_cnf["common"]["watch_debounce_sec"],
+            ignore_files,
+        )
+        b_watcher = BackupWatcher(
+            target_watcher,
+            b_facade.backup_files,
+            execute_backup,
+            self._app_cnf["common"]["watch_reconcile_sec"],
+        )
+        try:
+            b_watcher.run()
+        except KeyboardInterrupt:
+            self._logger.info("WATCH_STOP")
@@ -1,12 +1,32 @@
 """Module to update database based on dictionary of new file information"""
 import sqlite3
-from collections.abc import Generator
+import time
+from collections.abc import Generator, Iterable
 from logging import getLogger
 from typing import NamedTuple
 
 _TABLE_NAME = "fileinfo"
 _PATH_COL_NAME = "path"
 _MTIME_COL_NAME = "mtime"
+_SIZE_COL_NAME = "size"
+_INODE_COL_NAME = "inode"
+_DEVICE_COL_NAME = "device"
+_CTIME_COL_NAME = "ctime"
+_DIGEST_COL_NAME = "digest"
+# Columns in the order of the fields of Metadata
+_COL_NAMES = (
+    _PATH_COL_NAME,
+    _MTIME_COL_NAME,
+    _SIZE_COL_NAME,
+    _INODE_COL_NAME,
+    _DEVICE_COL_NAME,
+    _CTIME_COL_NAME,
+    _DIGEST_COL_NAME,
+)
+_STATUS_COL_NAMES = _COL_NAMES[2:6]
+_HASH_CACHE_TABLE_NAME = "hashcache"
+_SCAN_TABLE_NAME = "temp.scanned"
+_SCHEMA_TABLE_NAME = "schema_version"
 
 
 def _esc_sp_ch(target: str) -> str:
@@ -15,11 +35,206 @@ def _esc_sp_ch(target: str) -> str:
     return result
 
 
+def _create_fileinfo_table(cur: sqlite3.Cursor) -> None:
+    # Version 1: the table of the first release
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {_TABLE_NAME}({_PATH_COL_NAME} TEXT PRIMARY KEY, {_MTIME_COL_NAME} REAL)"
+    )
+
+
+def _rebuild_fileinfo_table_without_rowid(cur: sqlite3.Cursor) -> None:
+    # Version 2: WITHOUT ROWID, so that the rows are stored in the index of the
+    # paths instead of a separate rowid table and an index
+    cur.execute(
+        f"CREATE TABLE {_TABLE_NAME}_new"
+        f"({_PATH_COL_NAME} TEXT PRIMARY KEY, {_MTIME_COL_NAME} REAL) WITHOUT ROWID"
+    )
+    cur.execute(
+        f"INSERT INTO {_TABLE_NAME}_new({_PATH_COL_NAME},{_MTIME_COL_NAME})"
+        f" SELECT {_PATH_COL_NAME},{_MTIME_COL_NAME} FROM {_TABLE_NAME}"
+    )
+    cur.execute(f"DROP TABLE {_TABLE_NAME}")
+    cur.execute(f"ALTER TABLE {_TABLE_NAME}_new RENAME TO {_TABLE_NAME}")
+
+
+def _add_fileinfo_status_columns(cur: sqlite3.Cursor) -> None:
+    # Version 3: status of the file other than mtime. NULL means unknown, e.g. for
+    # the records of older versions.
+    for col_name, col_type in (
+        (_SIZE_COL_NAME, "INTEGER"),
+        (_INODE_COL_NAME, "INTEGER"),
+        (_DEVICE_COL_NAME, "INTEGER"),
+        (_CTIME_COL_NAME, "REAL"),
+    ):
+        cur.execute(f"ALTER TABLE {_TABLE_NAME} ADD COLUMN {col_name} {col_type}")
+
+
+def _add_digest_column_and_hash_cache(cur: sqlite3.Cursor) -> None:
+    # Version 4: digest of the content of the last backed up version, and the
+    # digests of the files keyed on their status (one per inode)
+    cur.execute(f"ALTER TABLE {_TABLE_NAME} ADD COLUMN {_DIGEST_COL_NAME} BLOB")
+    cur.execute(
+        f"CREATE TABLE {_HASH_CACHE_TABLE_NAME}"
+        f"({_DEVICE_COL_NAME} INTEGER, {_INODE_COL_NAME} INTEGER,"
+        f" {_SIZE_COL_NAME} INTEGER, {_MTIME_COL_NAME} REAL,"
+        f" {_DIGEST_COL_NAME} BLOB NOT NULL,"
+        f" PRIMARY KEY({_DEVICE_COL_NAME}, {_INODE_COL_NAME})) WITHOUT ROWID"
+    )
+
+
+def _create_hotspot_tables(cur: sqlite3.Cursor) -> None:
+    # Version 5: the tables of HotspotRepository, which were created by
+    # HotspotRepository itself before this version
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS scanrun"
+        "(run_id INTEGER PRIMARY KEY AUTOINCREMENT, started REAL, dirs INTEGER)"
+    )
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS hotspot"
+        "(run_id INTEGER, path TEXT, list_sec REAL, stat_sec REAL,"
+        " entries INTEGER, PRIMARY KEY(run_id, path))"
+    )
+
+
+def _add_ctime_to_hash_cache(cur: sqlite3.Cursor) -> None:
+    # Version 6: ctime of the file in the key of the cached digest, since a file
+    # rewritten in place may keep its size and mtime. The digests cached by older
+    # versions have no ctime, so they are not used and are replaced.
+    cur.execute(
+        f"ALTER TABLE {_HASH_CACHE_TABLE_NAME} ADD COLUMN {_CTIME_COL_NAME} REAL"
+    )
+
+
+# Migration to the version N is _MIGRATIONS[N - 1]. Append a function to change
+# the schema, and never modify the existing ones.
+_MIGRATIONS = (
+    _create_fileinfo_table,
+    _rebuild_fileinfo_table_without_rowid,
+    _add_fileinfo_status_columns,
+    _add_digest_column_and_hash_cache,
+    _create_hotspot_tables,
+    _add_ctime_to_hash_cache,
+)
+
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+def migrate_db(db_connection: sqlite3.Connection) -> None:
+    """Upgrade the schema of the DB to SCHEMA_VERSION, keeping the data.
+
+    The tables of all repositories sharing the DB (e.g. HotspotRepository) are\
+    created by the migrations, so that their schema can be changed later.
+
+    Args:
+        db_connection (sqlite3.Connection): Connection to DB
+
+    Raises:
+        sqlite3.DatabaseError: If the DB was created by a newer version
+    """
+    cur = db_connection.cursor()
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {_SCHEMA_TABLE_NAME}(version INTEGER NOT NULL)"
+    )
+    cur.execute(f"SELECT MAX(version) FROM {_SCHEMA_TABLE_NAME}")
+    (version,) = cur.fetchone()
+    if version is None:
+        version = 0
+    if version > SCHEMA_VERSION:
+        cur.close()
+        raise sqlite3.DatabaseError(
+            f"schema version of DB is newer than supported: {version}"
+        )
+
+    if version == SCHEMA_VERSION:
+        cur.close()
+        return
+
+    cur.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (_TABLE_NAME,),
+    )
+    (is_existing,) = cur.fetchone()
+
+    db_connection.commit()
+    # Must be set before the tables are created or followed by VACUUM.
+    cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    for new_version in range(version + 1, SCHEMA_VERSION + 1):
+        cur.execute("BEGIN")
+        _MIGRATIONS[new_version - 1](cur)
+        cur.execute(f"DELETE FROM {_SCHEMA_TABLE_NAME}")
+        cur.execute(
+            f"INSERT INTO {_SCHEMA_TABLE_NAME}(version) VALUES(?)", (new_version,)
+        )
+        db_connection.commit()
+
+    cur.execute("PRAGMA auto_vacuum")
+    (auto_vacuum,) = cur.fetchone()
+    if auto_vacuum != 2:
+        # The DB had tables before auto_vacuum was set.
+        cur.execute("VACUUM")
+    cur.close()
+
+    if is_existing:
+        getLogger(__name__).info(
+            "MIGRATE_DB: schema version %i to %i", version, SCHEMA_VERSION
+        )
+
+
 class Metadata(NamedTuple):
-    """Class of Metadata"""
+    """Class of Metadata
+
+    The fields other than key and mtime are None if they are unknown (e.g. the\
+    metadata recorded by an older version, or st_ino on Windows), and unknown\
+    fields are not compared. digest is the digest of the content of the backed up\
+    version, and is recorded only for the targets with change_detection = "hash".
+    """
 
     key: str
     mtime: float
+    size: int = None
+    inode: int = None
+    device: int = None
+    ctime: float = None
+    digest: bytes = None
+
+    def is_modified(self, current: "Metadata", allow_err: float = 0.0) -> bool:
+        """Whether the file has been changed since this metadata was recorded.
+
+        Args:
+            current (Metadata): Metadata of the current status of the file
+            allow_err (float, optional):\
+                Difference of mtime and ctime regarded as the same. Defaults to 0.0.
+
+        Returns:
+            bool: True if mtime or any of the known fields differs
+        """
+        if not current.mtime - allow_err < self.mtime <= current.mtime + allow_err:
+            return True
+        if not self.ctime is None and not current.ctime is None:
+            if not current.ctime - allow_err < self.ctime <= current.ctime + allow_err:
+                return True
+        for stored, scanned in (
+            (self.size, current.size),
+            (self.inode, current.inode),
+            (self.device, current.device),
+        ):
+            if not stored is None and not scanned is None and stored != scanned:
+                return True
+        return False
+
+    def has_unknown(self, current: "Metadata") -> bool:
+        """Whether the current status has fields which are unknown in this metadata.
+
+        Args:
+            current (Metadata): Metadata of the current status of the file
+
+        Returns:
+            bool: True if any field is None in this metadata but not in current
+        """
+        return any(
+            stored is None and not scanned is None
+            for stored, scanned in zip(self[2:6], current[2:6])
+        )
 
 
 class MetadataRepository:
@@ -34,13 +249,39 @@ class MetadataRepository:
         self._dbconn = db_connection
         self._logger = getLogger(__name__)
 
+        migrate_db(self._dbconn)
+
+    def incremental_vacuum(self, min_free_ratio: float = 0.1) -> int:
+        """Return the free pages of the DB file to the file system.
+
+        Pages are freed when metadata are removed, but the DB file does not\
+        shrink by itself. Nothing is done until the free pages reach\
+        min_free_ratio of the file, so that it can be called after every run.
+
+        Args:
+            min_free_ratio (float, optional):\
+                Ratio of the free pages to the all pages. Defaults to 0.1.
+
+        Returns:
+            int: Number of the freed pages
+        """
         cur = self._dbconn.cursor()
-        cur.execute(
-            f"CREATE TABLE IF NOT EXISTS {_TABLE_NAME}({_PATH_COL_NAME} TEXT PRIMARY KEY, {_MTIME_COL_NAME} REAL)"
-        )
-        self._dbconn.commit()
+        (free_pages,) = cur.execute("PRAGMA freelist_count").fetchone()
+        (all_pages,) = cur.execute("PRAGMA page_count").fetchone()
+        if free_pages == 0 or free_pages < all_pages * min_free_ratio:
+            cur.close()
+            return 0
+
+        # Each step of the statement frees a page, but execute() steps a statement
+        # without result columns only once. executescript() runs it to the end.
+        self._dbconn.executescript("PRAGMA incremental_vacuum;")
+        (remaining_pages,) = cur.execute("PRAGMA freelist_count").fetchone()
         cur.close()
 
+        result = free_pages - remaining_pages
+        self._logger.debug("VACUUM_DB: %i pages", result)
+        return result
+
     def get_metadata(self, key: str) -> Metadata:
         """Get metadata by key from this repository.
 
@@ -53,18 +294,43 @@ class MetadataRepository:
         cur = self._dbconn.cursor()
 
         cur.execute(
-            f"SELECT {_MTIME_COL_NAME} FROM {_TABLE_NAME} WHERE {_PATH_COL_NAME} = {_esc_sp_ch(key)}"
+            f"SELECT {','.join(_COL_NAMES[1:])} FROM {_TABLE_NAME}"
+            f" WHERE {_PATH_COL_NAME} = ?",
+            (key,),
         )
-        mtime = None
-        for (tmp,) in cur:
-            mtime = tmp
+        row = cur.fetchone()
 
         cur.close()
 
-        if mtime is None:
+        if row is None or row[0] is None:
             return None
         else:
-            return Metadata(key, mtime)
+            return Metadata(key, *row)
+
+    def get_metadatas(self, keys: list[str]) -> list[Metadata]:
+        """Get metadata of the keys from this repository with a single query.
+
+        Args:
+            keys (list[str]):\
+                Normalized file paths. Keep the number of them below the limit of\
+                the parameters of a statement (999 on old versions of SQLite).
+
+        Returns:
+            list[Metadata]: Metadata of the keys contained in repo, in no order.
+        """
+        if not keys:
+            return []
+
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"SELECT {','.join(_COL_NAMES)} FROM {_TABLE_NAME}"
+            f" WHERE {_PATH_COL_NAME} IN ({','.join('?' * len(keys))})"
+            f" AND {_MTIME_COL_NAME} IS NOT NULL",
+            keys,
+        )
+        result = [Metadata(*row) for row in cur]
+        cur.close()
+        return result
 
     def get_all_metadatas(self) -> Generator[Metadata]:
         """Get all metadata from this repository.
@@ -73,10 +339,8 @@ class MetadataRepository:
             Metadata: Metadata
         """
         cur = self._dbconn.cursor()
-        for key, mtime in cur.execute(
-            f"SELECT {_PATH_COL_NAME},{_MTIME_COL_NAME} FROM {_TABLE_NAME}"
-        ):
-            yield Metadata(key, mtime)
+        for row in cur.execute(f"SELECT {','.join(_COL_NAMES)} FROM {_TABLE_NAME}"):
+            yield Metadata(*row)
         cur.close()
 
     def remove_metadata(self, key: str, do_commit: bool = True) -> Metadata:
@@ -140,10 +404,305 @@ class MetadataRepository:
         cur = self._dbconn.cursor()
 
         cur.execute(
-            f"REPLACE INTO {_TABLE_NAME}({_PATH_COL_NAME},{_MTIME_COL_NAME}) VALUES({_esc_sp_ch(mdata.key)},{str(mdata.mtime)})"
+            f"REPLACE INTO {_TABLE_NAME}({','.join(_COL_NAMES)})"
+            " VALUES(?, ?, ?, ?, ?, ?, ?)",
+            mdata,
         )
         self._logger.debug("REPLACE_INTO_DB: %s", mdata.key)
 
         cur.close()
         if do_commit:
             self._dbconn.commit()
+
+    def update_metadatas(self, mdatas: list[Metadata], do_commit: bool = True) -> None:
+        """Update the metadatas in this repository with a single statement.
+
+        Args:
+            mdatas (list[Metadata]): Metadatas to update or register new
+            do_commit (bool, optional):\
+                Whether the commit process is handled internally or not. Defaults to True.
+        """
+        cur = self._dbconn.cursor()
+
+        cur.executemany(
+            f"REPLACE INTO {_TABLE_NAME}({','.join(_COL_NAMES)})"
+            " VALUES(?, ?, ?, ?, ?, ?, ?)",
+            mdatas,
+        )
+        self._logger.debug("REPLACE_INTO_DB: total %i records", len(mdatas))
+
+        cur.close()
+        if do_commit:
+            self._dbconn.commit()
+
+    def load_scanned(self, items: Iterable[Metadata]) -> None:
+        """Load the metadata of the scanned files into a temporary table.
+
+        The table is compared with the metadata by get_modified_keys() and\
+        remove_unscanned(), so that the whole scan is diffed with a few statements\
+        instead of a query per file.
+
+        Args:
+            items (Iterable[Metadata]): Metadata of the current status of the files
+        """
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {_SCAN_TABLE_NAME}"
+            f"({_PATH_COL_NAME} TEXT PRIMARY KEY, {_MTIME_COL_NAME} REAL,"
+            f" {_SIZE_COL_NAME} INTEGER, {_INODE_COL_NAME} INTEGER,"
+            f" {_DEVICE_COL_NAME} INTEGER, {_CTIME_COL_NAME} REAL,"
+            f" {_DIGEST_COL_NAME} BLOB) WITHOUT ROWID"
+        )
+        cur.execute(f"DELETE FROM {_SCAN_TABLE_NAME}")
+        cur.executemany(
+            f"REPLACE INTO {_SCAN_TABLE_NAME}({','.join(_COL_NAMES)})"
+            " VALUES(?, ?, ?, ?, ?, ?, ?)",
+            items,
+        )
+        cur.close()
+
+    def get_modified_keys(self, allow_err: float = 0.0) -> list[str]:
+        """Get the keys of the scanned files which are new or modified.
+
+        Args:
+            allow_err (float, optional):\
+                Difference of mtime and ctime regarded as the same. Defaults to 0.0.
+
+        Returns:
+            list[str]:\
+                Keys whose metadata is missing, or has a different mtime or other\
+                known field (same as Metadata.is_modified())
+        """
+        # A comparison with NULL is not true, so unknown fields are not compared.
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"SELECT s.{_PATH_COL_NAME} FROM {_SCAN_TABLE_NAME} AS s"
+            f" LEFT JOIN {_TABLE_NAME} AS f ON f.{_PATH_COL_NAME} = s.{_PATH_COL_NAME}"
+            f" WHERE f.{_MTIME_COL_NAME} IS NULL"
+            f" OR f.{_MTIME_COL_NAME} <= s.{_MTIME_COL_NAME} - ?"
+            f" OR f.{_MTIME_COL_NAME} > s.{_MTIME_COL_NAME} + ?"
+            f" OR f.{_CTIME_COL_NAME} <= s.{_CTIME_COL_NAME} - ?"
+            f" OR f.{_CTIME_COL_NAME} > s.{_CTIME_COL_NAME} + ?"
+            f" OR f.{_SIZE_COL_NAME} <> s.{_SIZE_COL_NAME}"
+            f" OR f.{_INODE_COL_NAME} <> s.{_INODE_COL_NAME}"
+            f" OR f.{_DEVICE_COL_NAME} <> s.{_DEVICE_COL_NAME}",
+            (allow_err,) * 4,
+        )
+        result = [key for (key,) in cur]
+        cur.close()
+        return result
+
+    def fill_unknown(self, do_commit: bool = True) -> int:
+        """Fill the unknown fields of the metadata with those of the scanned files.
+
+        The metadata recorded by an older version get the fields which are\
+        compared from the next run, without backing up the files again.
+
+        Args:
+            do_commit (bool, optional):\
+                Whether the commit process is handled internally or not. Defaults to True.
+
+        Returns:
+            int: Number of the filled fields
+        """
+        result = 0
+        cur = self._dbconn.cursor()
+        for col_name in _STATUS_COL_NAMES:
+            cur.execute(
+                f"UPDATE {_TABLE_NAME} SET {col_name} ="
+                f" (SELECT s.{col_name} FROM {_SCAN_TABLE_NAME} AS s"
+                f" WHERE s.{_PATH_COL_NAME} = {_TABLE_NAME}.{_PATH_COL_NAME})"
+                f" WHERE {col_name} IS NULL AND {_PATH_COL_NAME} IN"
+                f" (SELECT {_PATH_COL_NAME} FROM {_SCAN_TABLE_NAME}"
+                f" WHERE {col_name} IS NOT NULL)"
+            )
+            result += cur.rowcount
+        self._logger.debug("FILL_DB: total %i fields", result)
+        cur.close()
+        if do_commit:
+            self._dbconn.commit()
+
+        return result
+
+    def remove_unscanned(
+        self, keep_prefixes: tuple[str, ...] = (), do_commit: bool = True
+    ) -> int:
+        """Remove the metadata of the files which are not in the scanned files.
+
+        Args:
+            keep_prefixes (tuple[str, ...], optional):\
+                Prefixes of the keys to be kept even if they are not scanned (e.g.\
+                the targets skipped in this run). Defaults to ().
+            do_commit (bool, optional):\
+                Whether the commit process is handled internally or not. Defaults to True.
+
+        Returns:
+            int: Number of the removed metadata
+        """
+        keep_condition = "".join(
+            f" AND substr({_PATH_COL_NAME}, 1, ?) <> ?" for _ in keep_prefixes
+        )
+        params = [
+            param for prefix in keep_prefixes for param in (len(prefix), prefix)
+        ]
+
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"DELETE FROM {_TABLE_NAME} WHERE {_PATH_COL_NAME} NOT IN"
+            f" (SELECT {_PATH_COL_NAME} FROM {_SCAN_TABLE_NAME}){keep_condition}",
+            params,
+        )
+        result = cur.rowcount
+        self._logger.debug("DELETE_FROM_DB: total %i records", result)
+        cur.close()
+        if do_commit:
+            self._dbconn.commit()
+
+        return result
+
+    def get_cached_digest(self, mdata: Metadata) -> bytes:
+        """Get the digest of the content of the file from the cache.
+
+        Args:
+            mdata (Metadata): Metadata of the current status of the file
+
+        Returns:
+            bytes:\
+                Digest cached for the same device, inode, size, mtime and ctime.\
+                None if it is not cached, or the inode or the ctime of the file is\
+                unknown.
+        """
+        if mdata.device is None or mdata.inode is None or mdata.ctime is None:
+            return None
+
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"SELECT {_DIGEST_COL_NAME} FROM {_HASH_CACHE_TABLE_NAME}"
+            f" WHERE {_DEVICE_COL_NAME} = ? AND {_INODE_COL_NAME} = ?"
+            f" AND {_SIZE_COL_NAME} = ? AND {_MTIME_COL_NAME} = ?"
+            f" AND {_CTIME_COL_NAME} = ?",
+            (mdata.device, mdata.inode, mdata.size, mdata.mtime, mdata.ctime),
+        )
+        row = cur.fetchone()
+        cur.close()
+        return None if row is None else row[0]
+
+    def cache_digest(self, mdata: Metadata, digest: bytes) -> None:
+        """Cache the digest of the content of the file, replacing the old one.
+
+        The digest is committed together with the next commit of the metadata.
+
+        Args:
+            mdata (Metadata): Metadata of the status of the file when it was read
+            digest (bytes): Digest of the content
+        """
+        if mdata.device is None or mdata.inode is None:
+            return
+
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"REPLACE INTO {_HASH_CACHE_TABLE_NAME}"
+            f"({_DEVICE_COL_NAME},{_INODE_COL_NAME},{_SIZE_COL_NAME},"
+            f"{_MTIME_COL_NAME},{_CTIME_COL_NAME},{_DIGEST_COL_NAME})"
+            " VALUES(?, ?, ?, ?, ?, ?)",
+            (mdata.device, mdata.inode, mdata.size, mdata.mtime, mdata.ctime, digest),
+        )
+        cur.close()
+
+    def prune_hash_cache(self, do_commit: bool = True) -> int:
+        """Remove the cached digests of the files which are no longer recorded.
+
+        Args:
+            do_commit (bool, optional):\
+                Whether the commit process is handled internally or not. Defaults to True.
+
+        Returns:
+            int: Number of the removed digests
+        """
+        cur = self._dbconn.cursor()
+        cur.execute(
+            f"DELETE FROM {_HASH_CACHE_TABLE_NAME}"
+            f" WHERE ({_DEVICE_COL_NAME}, {_INODE_COL_NAME}) NOT IN"
+            f" (SELECT {_DEVICE_COL_NAME}, {_INODE_COL_NAME} FROM {_TABLE_NAME}"
+            f" WHERE {_DEVICE_COL_NAME} IS NOT NULL AND {_INODE_COL_NAME} IS NOT NULL)"
+        )
+        result = cur.rowcount
+        self._logger.debug("DELETE_FROM_HASH_CACHE: total %i records", result)
+        cur.close()
+        if do_commit:
+            self._dbconn.commit()
+
+        return result
+
+    def clear_scanned(self) -> None:
+        """Drop the temporary table loaded by load_scanned()."""
+        cur = self._dbconn.cursor()
+        cur.execute(f"DROP TABLE IF EXISTS {_SCAN_TABLE_NAME}")
+        cur.close()
+
+
+class MetadataBatchWriter:
+    """Writer which stores metadata in batches
+
+    The added metadata are written and committed in one transaction per batch_size\
+    records or per batch_sec seconds, instead of a commit (and a sync of the\
+    journal) per file. Add the metadata of a file only after its backup is\
+    completed: a crash then loses at most the last batch, and those files are\
+    just backed up again in the next run.
+    """
+
+    def __init__(
+        self,
+        m_repo: MetadataRepository,
+        batch_size: int = 1000,
+        batch_sec: float = 5.0,
+    ) -> None:
+        """Initializer
+
+        Args:
+            m_repo (MetadataRepository): MetadataRepository object
+            batch_size (int, optional):\
+                Number of the records committed at once. If 1 is passed, each\
+                record is committed as soon as it is added. Defaults to 1000.
+            batch_sec (float, optional):\
+                Seconds after which the pending records are committed even if\
+                batch_size is not reached. If 0 is passed, there is no time limit.\
+                Defaults to 5.0.
+        """
+        self._m_repo = m_repo
+        self._batch_size = batch_size
+        self._batch_sec = batch_sec
+        self._pending: list[Metadata] = []
+        self._first_added = 0.0
+
+    def __enter__(self) -> "MetadataBatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # The pending records are of completed backups, so they are written
+        # even if the backup is interrupted.
+        self.flush()
+
+    def add(self, mdata: Metadata) -> None:
+        """Add the metadata, and commit the pending records if the batch is full.
+
+        Args:
+            mdata (Metadata): Metadata to update or register new
+        """
+        if not self._pending:
+            self._first_added = time.monotonic()
+        self._pending.append(mdata)
+
+        if len(self._pending) >= self._batch_size or (
+            self._batch_sec > 0
+            and time.monotonic() - self._first_added >= self._batch_sec
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write and commit the pending records."""
+        if len(self._pending) == 1:
+            self._m_repo.update_metadata(self._pending[0])
+        elif self._pending:
+            self._m_repo.update_metadatas(self._pending)
+        self._pending = []
@@ -3,22 +3,67 @@ import sqlite3
 from typing import Any
 
 from .dstrepo import DestinationRepository
+from .hotspot import HotspotRecorder
+from .ignorefile import IgnoreFiles
 from .metarepo import MetadataRepository
-from .scanner import AllFileScanner
+from .scanner import AllFileScanner, get_nested_targets
 from .srcrepo import SourceRepository
 
 
 class MetadataRepositoryFactory:
     """Factoriy class of MetadataRepository"""
 
-    def __init__(self, db_connection: sqlite3.Connection) -> None:
+    def __init__(
+        self,
+        db_connection: sqlite3.Connection,
+        journal_mode: str = None,
+        synchronous: str = None,
+        cache_size_kib: int = None,
+        mmap_size_mib: int = None,
+        temp_store: str = None,
+    ) -> None:
         """Initializer
 
+        The settings are applied to the connection. If None is passed to a setting,\
+        the default of SQLite is used.
+
         Args:
             db_connection (sqlite3.Connection): Connection to DB
+            journal_mode (str, optional):\
+                Journal mode (e.g. 'wal' or 'delete'). Defaults to None.
+            synchronous (str, optional):\
+                How often SQLite waits for the data to be written to the disk\
+                ('off', 'normal', 'full' or 'extra'). Defaults to None.
+            cache_size_kib (int, optional):\
+                Size of the page cache in KiB. Defaults to None.
+            mmap_size_mib (int, optional):\
+                Size of the DB file accessed with memory-mapped I/O in MiB\
+                (0 to disable). Defaults to None.
+            temp_store (str, optional):\
+                Where the temporary tables are stored ('default', 'file' or\
+                'memory'). Defaults to None.
         """
         self._dbconnection = db_connection
 
+        # PRAGMA does not accept bound parameters. The values are checked by
+        # validate_app_cnf().
+        pragmas = []
+        if not journal_mode is None:
+            pragmas.append(f"journal_mode = {journal_mode}")
+        if not synchronous is None:
+            pragmas.append(f"synchronous = {synchronous}")
+        if not cache_size_kib is None:
+            pragmas.append(f"cache_size = -{int(cache_size_kib)}")
+        if not mmap_size_mib is None:
+            pragmas.append(f"mmap_size = {int(mmap_size_mib) * 1024 * 1024}")
+        if not temp_store is None:
+            pragmas.append(f"temp_store = {temp_store}")
+
+        cur = self._dbconnection.cursor()
+        for pragma in pragmas:
+            cur.execute(f"PRAGMA {pragma}").fetchall()
+        cur.close()
+
     def get_metadata_repository(self) -> MetadataRepository:
         """Get MetadataRepositry object.
 
@@ -39,6 +84,11 @@ class BackupRepositoryFactory:
         seq_num_sep: str = "_",
         scan_symlink_dir: bool = False,
         dry_run: bool = False,
+        scan_workers: int = 1,
+        walk_workers: int = 1,
+        ignore_files: IgnoreFiles = None,
+        inode_order: bool = False,
+        hotspots: HotspotRecorder = None,
     ) -> None:
         """Initializer
 
@@ -51,6 +101,22 @@ class BackupRepositoryFactory:
                 Separator between date and sequence number.\
                 If None is passed, No sequence number will be assigned, and the backup\
                 will be overwritten if the date/time string is the same.
+            scan_symlink_dir (bool, optional):\
+                Whether scan symbolic link directory or not. Defaults to False.
+            dry_run (bool, optional): Whether to perform a dry run. Defaults to False.
+            scan_workers (int, optional):\
+                Number of threads that scan the target directories concurrently.\
+                Defaults to 1.
+            walk_workers (int, optional):\
+                Number of threads that walk the directory tree of each target directory.\
+                Defaults to 1.
+            ignore_files (IgnoreFiles, optional):\
+                Ignore files to be applied while scanning. Defaults to None.
+            inode_order (bool, optional):\
+                Whether to stat the files of each directory in the order of inode\
+                numbers. Defaults to False.
+            hotspots (HotspotRecorder, optional):\
+                Recorder of the time spent on each directory. Defaults to None.
         """
         self._targets = targets
         self._dst_dir_name = dst_dir_name
@@ -62,6 +128,21 @@ class BackupRepositoryFactory:
             {target["path"]: target["recursive"] for target in targets},
             scan_symlink_dir,
             self._dst_dir_name,
+            scan_workers,
+            walk_workers,
+            {
+                target["path"]: {
+                    "exclude_dirs": target.get("exclude_dirs", []),
+                    "prune_regex": target.get("prune_regex", ""),
+                    "one_file_system": target.get("one_file_system", False),
+                }
+                for target in targets
+            },
+            ignore_files,
+            get_nested_targets(targets),
+            {target["path"]: target.get("scan_timeout_sec", 0) for target in targets},
+            inode_order,
+            hotspots,
         )
 
     def get_source_repository(self) -> SourceRepository:
@@ -1,24 +1,86 @@
 """Module for AllFileScanner"""
+import contextlib
+import os
+import threading
+from collections.abc import Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
+from typing import Any
 
 from . import fsutil
+from .filetable import FileTable
+from .hotspot import HotspotRecorder
+from .ignorefile import IgnoreFiles
 
 
 class AllFileScanner:
     """Get files in directories"""
 
     def __init__(
-        self, target_dirs: dict[str, bool], scan_symlink_dir: bool, dst_dir_name: str
+        self,
+        target_dirs: dict[str, bool],
+        scan_symlink_dir: bool,
+        dst_dir_name: str,
+        scan_workers: int = 1,
+        walk_workers: int = 1,
+        target_options: dict[str, dict[str, Any]] = None,
+        ignore_files: IgnoreFiles = None,
+        nested_targets: dict[str, str] = None,
+        scan_timeouts: dict[str, float] = None,
+        inode_order: bool = False,
+        hotspots: HotspotRecorder = None,
     ) -> None:
         """Initializer
 
         Args:
-            targets (list[dict[str, Any]]): Scan target directories
+            target_dirs (dict[str, bool]):\
+                Scan target directories. The value indicates whether to scan recursively.
+            scan_symlink_dir (bool): Whether scan symbolic link directory or not.
+            dst_dir_name (str): Name of backup destination directory
+            scan_workers (int, optional):\
+                Number of threads that scan the target directories concurrently.\
+                If 1 is passed, the targets are scanned one after another. Defaults to 1.
+            walk_workers (int, optional):\
+                Number of threads that walk the directory tree of each target directory.\
+                If 1 is passed, directories are listed one at a time. Defaults to 1.
+            target_options (dict[str, dict[str, Any]], optional):\
+                Options of the walk for each target directory, such as exclude_dirs\
+                and prune_regex. Defaults to None.
+            ignore_files (IgnoreFiles, optional):\
+                Ignore files to be applied while scanning. Defaults to None.
+            nested_targets (dict[str, str], optional):\
+                Target directories which are not walked by themselves, because they\
+                are walked as a part of another target (see get_nested_targets()).\
+                Defaults to None.
+            scan_timeouts (dict[str, float], optional):\
+                Seconds to wait for the walk of each target directory. A target\
+                whose walk does not finish in time is skipped in this run and listed\
+                in skipped_targets. 0 means no limit. A target with a timeout is\
+                walked by a single thread regardless of walk_workers.\
+                Defaults to None.
+            inode_order (bool, optional):\
+                Whether to stat the files of each directory in the order of inode\
+                numbers. Defaults to False.
+            hotspots (HotspotRecorder, optional):\
+                Recorder of the time spent on each directory by the recursive walks.\
+                Defaults to None.
         """
         self._logger = getLogger(__name__)
         self._target_dirs = target_dirs
         self._scan_symlink_dir = scan_symlink_dir
         self._dst_dir_name = dst_dir_name
+        self._scan_workers = scan_workers
+        self._walk_workers = walk_workers
+        self._target_options = target_options if not target_options is None else {}
+        self._ignore_files = ignore_files
+        self._nested_targets = nested_targets if not nested_targets is None else {}
+        self._walkers: dict[str, fsutil.RecursiveScanDir] = {}
+        self._scan_timeouts = scan_timeouts if not scan_timeouts is None else {}
+        self._inode_order = inode_order
+        self._hotspots = hotspots
+        self._lock = threading.Lock()
+        # Target directories skipped in the last scan because of the timeout.
+        self.skipped_targets: list[str] = []
 
     def get_all_files(self) -> dict[str, fsutil.FoundFile]:
         """Get files in directories.
@@ -26,31 +88,248 @@ class AllFileScanner:
         Returns:
             dict[str, fsutil.FoundFile]: Files that is found
         """
-        result = {}
+        return dict(self.iter_all_files())
+
+    def get_src_and_backup_files(
+        self,
+    ) -> tuple[dict[str, fsutil.FoundFile], dict[str, fsutil.FoundFile]]:
+        """Get files in directories, separated into source files and backup files.
+
+        Files are classified by the walker as it enters the destination\
+        directories, so no file needs to be classified by its path afterwards.
+
+        Returns:
+            tuple[dict[str, fsutil.FoundFile], dict[str, fsutil.FoundFile]]:\
+                Files outside and inside the destination directories.
+        """
+        src_files = {}
+        backup_files = {}
+        for key, file in self.iter_all_files():
+            if file.in_dst_dir:
+                backup_files[key] = file
+            else:
+                src_files[key] = file
+        return (src_files, backup_files)
+
+    def get_file_table(self) -> FileTable:
+        """Get files in directories as a columnar table.
+
+        FoundFile objects are discarded as soon as they are added to the table,\
+        so the memory usage per file is much smaller than get_all_files().
+
+        Returns:
+            FileTable: Files that is found
+        """
+        table = FileTable()
+        for _, file in self.iter_all_files():
+            table.append(file)
+        return table
+
+    def iter_all_files(self) -> Generator[tuple[str, fsutil.FoundFile]]:
+        """Get files in directories one at a time while scanning.
+
+        Yields:
+            tuple[str, fsutil.FoundFile]:\
+                Files that is found. key is normalized path of the file.
+        """
         files_total = 0
         dirs_total = 0
-        r_scanner = fsutil.RecursiveScanDir()
+        skipped_mounts_total = 0
+        self.skipped_targets = []
+        targets = []
         for target_path, recursive in self._target_dirs.items():
-            if recursive:
-                found_files_gen = r_scanner.recursive_scandir(
-                    target_path, self._scan_symlink_dir
+            if target_path in self._nested_targets:
+                self._logger.debug(
+                    "SKIP_DIR(Nested): %s (in %s)",
+                    target_path,
+                    self._nested_targets[target_path],
                 )
             else:
-                found_files_gen = r_scanner.scandir(target_path, self._dst_dir_name)
+                targets.append((target_path, recursive))
 
-            found_files = [found_file for found_file in found_files_gen]
+        with contextlib.ExitStack() as stack:
+            if self._scan_workers > 1 and len(targets) > 1:
+                executor = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=min(self._scan_workers, len(targets)))
+                )
+                # map() returns the results in the order of the targets, so the
+                # logs below are deterministic regardless of which scan ends first.
+                found_files_per_target = executor.map(
+                    lambda target: self._scan_target(*target), targets
+                )
+            else:
+                found_files_per_target = (
+                    self._scan_target(target_path, recursive, False)
+                    for target_path, recursive in targets
+                )
 
-            for file in found_files:
-                result[file.normpath_str] = file
+            for (target_path, _), found_files in zip(targets, found_files_per_target):
+                files_count = 0
+                dirs = set()
+                for file in found_files:
+                    files_count += 1
+                    dirs.add(file.parent_str)
+                    yield (file.normpath_str, file)
 
-            files_count = len(found_files)
-            dirs_count = len({found_file.parent for found_file in found_files})
-            files_total += files_count
-            dirs_total += dirs_count
-            self._logger.debug(
-                "SCAN_DIR: (%i files, %i dirs) %s", files_count, dirs_count, target_path
-            )
+                files_total += files_count
+                dirs_total += len(dirs)
+                self._logger.debug(
+                    "SCAN_DIR: (%i files, %i dirs) %s",
+                    files_count,
+                    len(dirs),
+                    target_path,
+                )
+
+                walker = self._walkers.pop(target_path, None)
+                if not walker is None and not target_path in self.skipped_targets:
+                    for mount_path in walker.skipped_mounts:
+                        skipped_mounts_total += 1
+                        self._logger.info("SKIP_DIR(Mount): %s", mount_path)
+
+        if not self._ignore_files is None:
+            self._ignore_files.save()
 
         self._logger.info("SCAN_DIR: total %i files, %i dirs", files_total, dirs_total)
+        if skipped_mounts_total > 0:
+            self._logger.info(
+                "SKIP_DIR(Mount): total %i mount points", skipped_mounts_total
+            )
+        if self.skipped_targets:
+            self._logger.warning(
+                "SCAN_TIMEOUT: total %i targets skipped", len(self.skipped_targets)
+            )
+
+    def _scan_target(
+        self, target_path: str, recursive: bool, materialize: bool = True
+    ) -> Iterable[fsutil.FoundFile]:
+        timeout = self._scan_timeouts.get(target_path)
+        if not timeout:
+            return self._walk_target(target_path, recursive, materialize)
+
+        # The walk runs in a daemon thread, so that it can be abandoned if it is
+        # blocked on a hung mount. Daemon threads do not keep the process alive,
+        # so the walk is not parallelized (see _walk_target()).
+        # The abandoned walk is cancelled, so that it does not touch the hotspots
+        # and the ignore files shared with the other walks once it is unblocked.
+        r_scanner = fsutil.RecursiveScanDir()
+        result = []
+        errors = []
 
+        def _walk() -> None:
+            try:
+                result.extend(
+                    self._walk_target(target_path, recursive, False, r_scanner)
+                )
+            except Exception as exc:
+                errors.append(exc)
+
+        worker = threading.Thread(
+            target=_walk, name=f"scan:{target_path}", daemon=True
+        )
+        worker.start()
+        worker.join(timeout)
+
+        if worker.is_alive():
+            r_scanner.cancel()
+            self._logger.warning("SCAN_TIMEOUT: (%g sec) %s", timeout, target_path)
+            with self._lock:
+                self.skipped_targets.append(target_path)
+            return []
+        if errors:
+            raise errors[0]
         return result
+
+    def _walk_target(
+        self,
+        target_path: str,
+        recursive: bool,
+        materialize: bool = True,
+        r_scanner: fsutil.RecursiveScanDir = None,
+    ) -> Iterable[fsutil.FoundFile]:
+        if r_scanner is None:
+            r_scanner = fsutil.RecursiveScanDir()
+        self._walkers[target_path] = r_scanner
+        options = self._target_options.get(target_path, {})
+        # A walk with a timeout may be abandoned on a hung mount. It is not run in
+        # a thread pool, whose workers are joined at the exit of the interpreter.
+        if (
+            recursive
+            and self._walk_workers > 1
+            and not self._scan_timeouts.get(target_path)
+        ):
+            found_files_gen = r_scanner.parallel_scandir(
+                target_path,
+                self._scan_symlink_dir,
+                self._walk_workers,
+                ignore_files=self._ignore_files,
+                dst_dir_name=self._dst_dir_name,
+                inode_order=self._inode_order,
+                hotspots=self._hotspots,
+                **options,
+            )
+        elif recursive:
+            found_files_gen = r_scanner.recursive_scandir(
+                target_path,
+                self._scan_symlink_dir,
+                ignore_files=self._ignore_files,
+                dst_dir_name=self._dst_dir_name,
+                inode_order=self._inode_order,
+                hotspots=self._hotspots,
+                **options,
+            )
+        else:
+            found_files_gen = r_scanner.scandir(
+                target_path, self._dst_dir_name, self._ignore_files
+            )
+
+        if materialize:
+            return [found_file for found_file in found_files_gen]
+        else:
+            return found_files_gen
+
+
+def get_nested_targets(targets: list[dict[str, Any]]) -> dict[str, str]:
+    """Find target directories which are walked as a part of another target.
+
+    A target is nested in another target if it is under the directory of the\
+    other target, the other target is walked recursively, and neither of them\
+    has options of the walk (pruning directories, stopping at mount points or a\
+    scan timeout). Files of a nested target are found by the walk of the outer\
+    target, so that each directory is listed only once.
+
+    Args:
+        targets (list[dict[str, Any]]): Target settings
+
+    Returns:
+        dict[str, str]:\
+            Paths of the nested targets and paths of the outermost targets whose\
+            walk covers them.
+    """
+    covering_targets = []
+    for target in targets:
+        if target.get("recursive", False) and not _has_walk_options(target):
+            key = os.path.normcase(os.path.abspath(target["path"]))
+            prefix = key if key.endswith(os.sep) else key + os.sep
+            covering_targets.append((len(key), prefix, target["path"]))
+    covering_targets.sort()
+
+    result = {}
+    for target in targets:
+        if _has_walk_options(target):
+            # Walked separately, so that its own options are applied.
+            continue
+        key = os.path.normcase(os.path.abspath(target["path"]))
+        for _, prefix, outer_path in covering_targets:
+            if key.startswith(prefix):
+                result[target["path"]] = outer_path
+                break
+    return result
+
+
+def _has_walk_options(target: dict[str, Any]) -> bool:
+    return bool(
+        target.get("exclude_dirs")
+        or target.get("prune_regex")
+        or target.get("one_file_system")
+        or target.get("scan_timeout_sec")
+    )
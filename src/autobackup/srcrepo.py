@@ -1,25 +1,169 @@
 """Module for backup source repository"""
 import os
 import re
+import time
+from collections.abc import Callable
 from logging import getLogger
 from typing import Any
 
-from _collections_abc import Generator
+from _collections_abc import Generator, Iterable
 
-from . import fsutil
-from .scanner import AllFileScanner
+from . import filetable, fsutil
+from .scanner import AllFileScanner, get_nested_targets
 
 
-def _get_target_dict(targets: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+# Characters which have a special meaning in regular expressions
+_META_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+class _MatchPlan:
+    """Search criteria of a target, compiled once per run
+
+    catch_regex and ignore_regex of the usual forms, such as ".*\\.txt",\
+    "build/.*" or ".*\\.(txt|md)", are matched with str methods instead of re.
+    """
+
+    __slots__ = (
+        "catch_hidden",
+        "catch_link",
+        "min_size",
+        "max_size",
+        "min_age",
+        "max_age",
+        "limits_stat",
+        "_catch",
+        "_ignore",
+    )
+
+    def __init__(self, target: dict[str, Any]) -> None:
+        self.catch_hidden = target["catch_hidden"]
+        self.catch_link = target["catch_link"]
+        # 0 means no limit.
+        self.min_size = target.get("min_size", 0)
+        self.max_size = target.get("max_size", 0)
+        self.min_age = target.get("min_age", 0)
+        self.max_age = target.get("max_age", 0)
+        self.limits_stat = any(
+            (self.min_size, self.max_size, self.min_age, self.max_age)
+        )
+        self._catch = _compile_fullmatch(target["catch_regex"])
+        self._ignore = _compile_fullmatch(target["ignore_regex"])
+
+    def match(self, relpath: str) -> bool:
+        """Whether the path matches catch_regex and does not match ignore_regex."""
+        return self._catch(relpath) and not self._ignore(relpath)
+
+    def match_size(self, size: int) -> bool:
+        """Whether the size is within min_size and max_size."""
+        return size >= self.min_size and (not self.max_size or size <= self.max_size)
+
+    def match_age(self, mtime: float, now: float) -> bool:
+        """Whether the time since the modification is within min_age and max_age."""
+        age = now - mtime
+        return age >= self.min_age and (not self.max_age or age <= self.max_age)
+
+
+def _compile_fullmatch(regex: str) -> Callable[[str], bool]:
+    """Compile the regular expression into a function equivalent to fullmatch().
+
+    Args:
+        regex (str): Regular expression
+
+    Returns:
+        Callable[[str], bool]: Function which tells whether a string matches.
+    """
+    # "." does not match a newline, so a string with a newline never matches the
+    # ".*" part. The literals themselves must not contain a newline for the check.
+    if regex == ".*":
+        return lambda string: not "\n" in string
+
+    head = regex.startswith(".*")
+    tail = regex.endswith(".*") and not regex.endswith("\\.*")
+    body = regex[2 if head else 0 : -2 if tail else len(regex)]
+    literals = _parse_literals(body)
+
+    if literals is None or ((head or tail) and any("\n" in lit for lit in literals)):
+        pattern = re.compile(regex)
+        return lambda string: not pattern.fullmatch(string) is None
+    if head and tail:
+        return lambda string: not "\n" in string and any(
+            lit in string for lit in literals
+        )
+    if head:
+        return lambda string: string.endswith(literals) and not "\n" in string
+    if tail:
+        return lambda string: string.startswith(literals) and not "\n" in string
+
+    literal_set = frozenset(literals)
+    return lambda string: string in literal_set
+
+
+def _parse_literals(regex: str) -> tuple[str, ...]:
+    """Parse a literal or a group of literals such as "(txt|md)".
+
+    Args:
+        regex (str): Part of regular expression
+
+    Returns:
+        tuple[str, ...]:\
+            Strings matched by the regular expression. None if it is not a literal\
+            nor a group of literals.
+    """
+    if regex.startswith("(?:") and regex.endswith(")"):
+        alternatives = regex[3:-1].split("|")
+    elif regex.startswith("(") and not regex.startswith("(?") and regex.endswith(")"):
+        alternatives = regex[1:-1].split("|")
+    else:
+        alternatives = [regex]
+
+    result = []
+    for alternative in alternatives:
+        chars = []
+        i = 0
+        while i < len(alternative):
+            char = alternative[i]
+            if char == "\\":
+                # Only escaped symbols are literal, e.g. \. but not \d
+                if i + 1 == len(alternative) or alternative[i + 1].isalnum():
+                    return None
+                i += 1
+                char = alternative[i]
+            elif char in _META_CHARS:
+                return None
+            chars.append(char)
+            i += 1
+        result.append("".join(chars))
+    return tuple(result)
+
+
+def _get_target_dict(targets: list[dict[str, Any]]) -> dict[str, _MatchPlan]:
     result = {}
     for target in targets:
         key = os.path.normcase(os.path.abspath(target["path"]))
-        result[key] = {
-            "catch_regex": re.compile(target["catch_regex"]),
-            "ignore_regex": re.compile(target["ignore_regex"]),
-            "catch_hidden": target["catch_hidden"],
-            "catch_link": target["catch_link"],
-        }
+        result[key] = _MatchPlan(target)
+
+    return result
+
+
+def _get_nested_target_dict(
+    targets: list[dict[str, Any]], target_dict: dict[str, _MatchPlan]
+) -> dict[str, list[tuple[str, bool, _MatchPlan]]]:
+    result = {}
+    for inner_path, outer_path in get_nested_targets(targets).items():
+        inner_key = os.path.normcase(os.path.abspath(inner_path))
+        outer_key = os.path.normcase(os.path.abspath(outer_path))
+        recursive = next(
+            target.get("recursive", False)
+            for target in targets
+            if target["path"] == inner_path
+        )
+        result.setdefault(outer_key, []).append(
+            (
+                inner_key[len(outer_key.rstrip(os.sep)) + 1 :],
+                recursive,
+                target_dict[inner_key],
+            )
+        )
 
     return result
 
@@ -40,17 +184,22 @@ class SourceRepository:
         """
         self._scanner = scanner
         self._target_dict = _get_target_dict(targets)
+        self._nested_target_dict = _get_nested_target_dict(targets, self._target_dict)
         self._dst_dir_name = dst_dir_name
         self._logger = getLogger(__name__)
 
     def get_all_files(
-        self, all_files: dict[str, fsutil.FoundFile] = None
+        self,
+        all_files: dict[str, fsutil.FoundFile]
+        | Iterable[tuple[str, fsutil.FoundFile]] = None,
     ) -> Generator[tuple[str, fsutil.FoundFile]]:
         """Get All files under the target path.
 
         Args:
-            all_files (dict[str, fsutil.FoundFile], optional):\
+            all_files (dict[str, fsutil.FoundFile] | Iterable[tuple[str, fsutil.FoundFile]], optional):\
                 dict of information for all files already retrieved externally with AllFileScanner.\
+                An iterable of key and file pairs (e.g. AllFileScanner.iter_all_files())\
+                can also be passed to process files while scanning.\
                 If omitted or None is passed, AllFileScanner is used internally.
 
         Yields:
@@ -59,23 +208,29 @@ class SourceRepository:
         if all_files is None:
             all_files = self._scanner.get_all_files()
 
-        for key, file in all_files.items():
-            if (
-                os.sep + os.path.normcase(self._dst_dir_name) + os.sep
-                in file.normpath_str
+        if isinstance(all_files, dict):
+            all_files = all_files.items()
+
+        dst_dir_part = os.sep + os.path.normcase(self._dst_dir_name) + os.sep
+        for key, file in all_files:
+            if file.in_dst_dir or (
+                file.in_dst_dir is None and dst_dir_part in file.normpath_str
             ):
                 self._logger.debug("NOT_SRC(BkupDir): %s", str(file))
                 continue
             yield (key, file)
 
     def get_files_matching_criteria(
-        self, all_files: dict[str, fsutil.FoundFile] = None
+        self,
+        all_files: dict[str, fsutil.FoundFile]
+        | Iterable[tuple[str, fsutil.FoundFile]] = None,
     ) -> Generator[tuple[str, fsutil.FoundFile]]:
         """Get files witch match search criteria under the target path.
 
         Args:
-            all_files (dict[str, fsutil.FoundFile], optional):\
+            all_files (dict[str, fsutil.FoundFile] | Iterable[tuple[str, fsutil.FoundFile]], optional):\
                 dict of information for all files already retrieved externally with AllFileScanner.\
+                An iterable of key and file pairs can also be passed.\
                 If omitted or None is passed, AllFileScanner is used internally.
 
         Yields:
@@ -83,56 +238,118 @@ class SourceRepository:
                 The files witch match the search criteria. key is normalized path of\
                 the file.
         """
-        src_files = self.get_all_files(all_files)
+        target_dict = self._target_dict
+        nested_target_dict = self._nested_target_dict
+        now = time.time()
+
+        for key, file in self.get_all_files(all_files):
+            scan_root = file.scan_root_str
+            relpath = file.relpath_str
+            if scan_root in nested_target_dict:
+                plans = self._get_targets_of(scan_root, relpath)
+            else:
+                plans = ((relpath, target_dict[scan_root]),)
+
+            for plan_relpath, plan in plans:
+                if self._is_to_be_caught(file, plan_relpath, plan, now):
+                    yield (key, file)
+                    break
+
+    def get_rows_matching_criteria(self, table: filetable.FileTable) -> list[int]:
+        """Get rows of the table witch match search criteria.
+
+        Hidden and symbolic link files, sizes and ages are judged by the status\
+        captured at scan time, so no file is accessed again.
+
+        Args:
+            table (filetable.FileTable): Files found by AllFileScanner.get_file_table()
 
-        for key, file in src_files:
-            target_dict_key = str(file.scan_root_path)
+        Returns:
+            list[int]: Rows of the files witch match the search criteria
+        """
+        dir_root_ids = table.dir_root_ids
+        dir_ids = table.dir_ids
+        skip_flags = filetable.FLAG_IN_DST_DIR | filetable.FLAG_STAT_ERROR
+        now = time.time()
 
-            target_criteria = self._target_dict[target_dict_key]
+        result = []
+        for row, flags in enumerate(table.flags):
+            if flags & skip_flags:
+                continue
 
-            if self._is_to_be_caught(
-                file,
-                target_criteria["catch_regex"],
-                target_criteria["ignore_regex"],
-                target_criteria["catch_hidden"],
-                target_criteria["catch_link"],
+            for relpath, plan in self._get_targets_of(
+                table.roots[dir_root_ids[dir_ids[row]]], table.relpath(row)
             ):
-                yield (key, file)
+                if not plan.catch_hidden and flags & filetable.FLAG_HIDDEN:
+                    continue
+                if not plan.catch_link and flags & filetable.FLAG_SYMLINK:
+                    continue
+                if plan.limits_stat and not (
+                    plan.match_size(table.sizes[row])
+                    and plan.match_age(table.mtimes[row], now)
+                ):
+                    continue
+
+                if plan.match(relpath):
+                    result.append(row)
+                    break
+        return result
+
+    def _get_targets_of(
+        self, scan_root: str, relpath: str
+    ) -> Generator[tuple[str, _MatchPlan]]:
+        """Get all targets which contain the file.
+
+        Args:
+            scan_root (str): Normalized path of the target which found the file
+            relpath (str): Path of the file relative to scan_root
+
+        Yields:
+            tuple[str, _MatchPlan]:\
+                Path of the file relative to the target and the search criteria of\
+                the target. The target which found the file comes first.
+        """
+        yield (relpath, self._target_dict[scan_root])
+
+        nested_targets = self._nested_target_dict.get(scan_root)
+        if nested_targets is None:
+            return
+
+        normcased_relpath = os.path.normcase(relpath)
+        for inner_relpath, recursive, plan in nested_targets:
+            if normcased_relpath.startswith(inner_relpath + os.sep):
+                sub_relpath = relpath[len(inner_relpath) + 1 :]
+                if recursive or not os.sep in sub_relpath:
+                    yield (sub_relpath, plan)
 
     def _is_to_be_caught(
-        self,
-        file: fsutil.FoundFile,
-        catch_exp: re.Pattern,
-        ignore_exp: re.Pattern,
-        catch_hidden: bool,
-        catch_link: bool,
+        self, file: fsutil.FoundFile, relpath: str, plan: _MatchPlan, now: float
     ) -> bool:
-        if catch_hidden:
-            if catch_link:
-                return (
-                    catch_exp.fullmatch(str(file.relpath)) is not None
-                    and ignore_exp.fullmatch(str(file.relpath)) is None
-                )
-            else:
-                return (
-                    not self._is_symlink(file)
-                    and catch_exp.fullmatch(str(file.relpath)) is not None
-                    and ignore_exp.fullmatch(str(file.relpath)) is None
-                )
-        else:
-            if catch_link:
-                return (
-                    not self._is_hidden(file)
-                    and catch_exp.fullmatch(str(file.relpath)) is not None
-                    and ignore_exp.fullmatch(str(file.relpath)) is None
-                )
-            else:
-                return (
-                    not self._is_hidden(file)
-                    and not self._is_symlink(file)
-                    and catch_exp.fullmatch(str(file.relpath)) is not None
-                    and ignore_exp.fullmatch(str(file.relpath)) is None
-                )
+        # The path is checked first, since it needs neither stat() nor a system
+        # call. Hidden and symbolic link files, sizes and ages are judged by the
+        # status captured at scan time.
+        return (
+            plan.match(relpath)
+            and (plan.catch_hidden or not self._is_hidden(file))
+            and (plan.catch_link or not self._is_symlink(file))
+            and (not plan.limits_stat or self._is_within_limits(file, plan, now))
+        )
+
+    def _is_within_limits(
+        self, file: fsutil.FoundFile, plan: _MatchPlan, now: float
+    ) -> bool:
+        try:
+            if not plan.match_size(file.size):
+                self._logger.debug("NOT_SRC(Size): %s", str(file))
+                return False
+            if not plan.match_age(file.mtime, now):
+                self._logger.debug("NOT_SRC(Age): %s", str(file))
+                return False
+        except OSError as os_error:
+            # e.g. broken symbolic link, which is handled as before.
+            self._logger.debug("SKIP_STAT_CHECK: %s: %s", str(file), str(os_error))
+
+        return True
 
     def _is_hidden(self, file: fsutil.FoundFile):
         result = False
@@ -0,0 +1,401 @@
+"""Module for continuous backup driven by inotify (Linux only)"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import re
+import select
+import struct
+import time
+from collections.abc import Callable, Generator
+from logging import getLogger
+from typing import Any
+
+from .fsutil import FoundFile
+from .ignorefile import IgnoreFiles
+from .scanner import get_nested_targets
+
+#### Constants ####
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+#### Classes ####
+
+
+class WatchError(Exception):
+    """Exception raised when inotify cannot be used."""
+
+
+class Inotify:
+    """Thin wrapper of the inotify API of Linux"""
+
+    def __init__(self) -> None:
+        """Initializer
+
+        Raises:
+            WatchError: Raised when inotify is not available on this platform.
+        """
+        libc_name = ctypes.util.find_library("c")
+        try:
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            self._libc.inotify_init1.argtypes = [ctypes.c_int]
+            self._libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+        except (OSError, AttributeError) as exc:
+            raise WatchError(f"inotify is not available: {exc}") from exc
+
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise WatchError(f"inotify_init1 failed: {os.strerror(err)}")
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """Add a watch for the path.
+
+        Args:
+            path (str): Path to be watched
+            mask (int): Events to be watched
+
+        Raises:
+            OSError: Raised when the watch cannot be added. errno is ENOSPC when\
+                the limit of the number of watches is reached.
+
+        Returns:
+            int: Watch descriptor
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read_events(self) -> Generator[tuple[int, int, str]]:
+        """Read events that are ready without blocking.
+
+        Yields:
+            tuple[int, int, str]: Watch descriptor, mask and name of the event.
+        """
+        while True:
+            try:
+                buf = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return
+
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(buf[offset : offset + name_len].rstrip(b"\0"))
+                offset += name_len
+                yield (wd, mask, name)
+
+    def close(self) -> None:
+        """Close the inotify instance."""
+        os.close(self.fd)
+
+
+class ChangeCoalescer:
+    """Coalesce change events per path until no event arrives for a while"""
+
+    def __init__(self, debounce_sec: float) -> None:
+        """Initializer
+
+        Args:
+            debounce_sec (float):\
+                Seconds to wait after the last event of a path before it is ready.
+        """
+        self._debounce_sec = debounce_sec
+        self._changes: dict[str, tuple[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def add(self, path: str, scan_root: str, now: float) -> None:
+        """Record a change of the path.
+
+        Args:
+            path (str): Path of the changed file
+            scan_root (str): Target directory which contains the file
+            now (float): Time of the event
+        """
+        self._changes[path] = (scan_root, now)
+
+    def pop_ready(self, now: float) -> list[tuple[str, str]]:
+        """Remove and return the paths which have not changed for the debounce window.
+
+        Args:
+            now (float): Current time
+
+        Returns:
+            list[tuple[str, str]]: Paths and target directories of the changed files.
+        """
+        ready = [
+            (path, scan_root)
+            for path, (scan_root, last_time) in self._changes.items()
+            if now - last_time >= self._debounce_sec
+        ]
+        for path, _ in ready:
+            del self._changes[path]
+        return ready
+
+
+class TargetWatcher:
+    """Watch target directories and collect the changed files"""
+
+    def __init__(
+        self,
+        targets: list[dict[str, Any]],
+        dst_dir_name: str,
+        scan_symlink_dir: bool,
+        debounce_sec: float,
+        ignore_files: IgnoreFiles = None,
+    ) -> None:
+        """Initializer
+
+        Args:
+            targets (list[dict[str, Any]]):\
+                dict of directory paths and search criterias to be backed up
+            dst_dir_name (str): Name of backup destination directory
+            scan_symlink_dir (bool): Whether watch symbolic link directory or not.
+            debounce_sec (float):\
+                Seconds to wait after the last event of a file before it is backed up.
+            ignore_files (IgnoreFiles, optional):\
+                Ignore files to be applied to the changed files. Defaults to None.
+        """
+        self._targets = targets
+        self._dst_dir_name = os.path.normcase(dst_dir_name)
+        self._scan_symlink_dir = scan_symlink_dir
+        self._coalescer = ChangeCoalescer(debounce_sec)
+        self._ignore_files = ignore_files
+        self._inotify = None
+        self._watches: dict[int, tuple[str, str, bool]] = {}
+        self._excludes: dict[str, tuple[set[str], re.Pattern]] = {}
+        self._root_devs: dict[str, int] = {}
+        self.overflowed = False
+        self.limited = False
+        self._logger = getLogger(__name__)
+
+    def start(self) -> None:
+        """Set up watches over all target directories.
+
+        Raises:
+            WatchError: Raised when inotify is not available on this platform.
+        """
+        self.close()
+        self._inotify = Inotify()
+        self.overflowed = False
+        nested_targets = get_nested_targets(self._targets)
+        for target in self._targets:
+            if target["path"] in nested_targets:
+                # Watched as a part of the outer target.
+                continue
+            scan_root = os.path.abspath(target["path"])
+            prune_regex = target.get("prune_regex", "")
+            self._excludes[scan_root] = (
+                {os.path.normcase(name) for name in target.get("exclude_dirs", [])},
+                re.compile(prune_regex) if prune_regex else None,
+            )
+            if target.get("one_file_system", False):
+                self._root_devs[scan_root] = os.stat(scan_root).st_dev
+            self._add_watches(scan_root, scan_root, target["recursive"])
+        self._logger.info("WATCH_START: %i dirs", len(self._watches))
+
+    def close(self) -> None:
+        """Remove all watches."""
+        if not self._inotify is None:
+            self._inotify.close()
+            self._inotify = None
+        self._watches = {}
+
+    def poll(self, timeout: float) -> list[FoundFile]:
+        """Wait for events and return the files which are ready to be backed up.
+
+        Args:
+            timeout (float): Maximum seconds to wait for events
+
+        Returns:
+            list[FoundFile]: Files which have not changed for the debounce window.
+        """
+        ready, _, _ = select.select([self._inotify.fd], [], [], timeout)
+        now = time.monotonic()
+        if ready:
+            for wd, mask, name in self._inotify.read_events():
+                self._handle_event(wd, mask, name, now)
+
+        return [
+            FoundFile(path, scan_root, in_dst_dir=False)
+            for path, scan_root in self._coalescer.pop_ready(now)
+            if os.path.isfile(path) and not self._is_ignored(path, scan_root)
+        ]
+
+    def _handle_event(self, wd: int, mask: int, name: str, now: float) -> None:
+        if mask & IN_Q_OVERFLOW:
+            self._logger.warning("WATCH_OVERFLOW: events were lost")
+            self.overflowed = True
+            return
+
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+
+        if not wd in self._watches or name == "":
+            return
+
+        dirpath, scan_root, recursive = self._watches[wd]
+        path = os.path.join(dirpath, name)
+
+        if mask & IN_ISDIR:
+            if recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                if self._is_dir_to_be_watched(name, path, scan_root):
+                    # Files created before the watch is added produce no event.
+                    self._add_watches(path, scan_root, True, now)
+        else:
+            self._coalescer.add(path, scan_root, now)
+
+    def _is_ignored(self, path: str, scan_root: str) -> bool:
+        if self._ignore_files is None:
+            return False
+        return self._ignore_files.is_ignored(
+            scan_root, os.path.relpath(path, scan_root), self._dst_dir_name
+        )
+
+    def _is_dir_to_be_watched(self, name: str, path: str, scan_root: str) -> bool:
+        if os.path.normcase(name) == self._dst_dir_name:
+            return False
+
+        exclude_dirs, prune_re = self._excludes.get(scan_root, (set(), None))
+        if os.path.normcase(name) in exclude_dirs:
+            return False
+        if not prune_re is None and prune_re.fullmatch(
+            os.path.relpath(path, scan_root)
+        ):
+            return False
+
+        root_dev = self._root_devs.get(scan_root)
+        if not root_dev is None:
+            try:
+                if os.stat(path).st_dev != root_dev:
+                    return False
+            except OSError:
+                return False
+
+        return self._scan_symlink_dir or not os.path.islink(path)
+
+    def _add_watches(
+        self, dirpath: str, scan_root: str, recursive: bool, now: float = None
+    ) -> None:
+        stack = [dirpath]
+        while stack:
+            current = stack.pop()
+            try:
+                wd = self._inotify.add_watch(current, _WATCH_MASK)
+            except OSError as os_error:
+                if os_error.errno == errno.ENOSPC:
+                    # Rebuilding the watches would hit the limit again, so changes
+                    # under the unwatched dirs are left to the periodic full backup.
+                    if not self.limited:
+                        self._logger.warning(
+                            "WATCH_LIMIT: %s (left to the full backup)", current
+                        )
+                    self.limited = True
+                    return
+                self._logger.warning("WATCH_ERROR: %s", str(os_error))
+                continue
+
+            self._watches[wd] = (current, scan_root, recursive)
+
+            if not recursive:
+                continue
+
+            try:
+                with os.scandir(current) as items:
+                    for item in items:
+                        if item.is_dir():
+                            if self._is_dir_to_be_watched(
+                                item.name, item.path, scan_root
+                            ):
+                                stack.append(item.path)
+                        elif not now is None:
+                            self._coalescer.add(item.path, scan_root, now)
+            except OSError as os_error:
+                self._logger.warning("WATCH_ERROR: %s", str(os_error))
+
+
+class BackupWatcher:
+    """Back up files continuously as they change"""
+
+    def __init__(
+        self,
+        watcher: TargetWatcher,
+        backup_files: Callable[[list[FoundFile]], None],
+        reconcile: Callable[[], None],
+        reconcile_sec: float,
+    ) -> None:
+        """Initializer
+
+        Args:
+            watcher (TargetWatcher): TargetWatcher object
+            backup_files (Callable[[list[FoundFile]], None]):\
+                Function that backs up the changed files
+            reconcile (Callable[[], None]):\
+                Function that runs a full backup to catch missed events
+            reconcile_sec (float): Interval of the full backup in seconds
+        """
+        self._watcher = watcher
+        self._backup_files = backup_files
+        self._reconcile = reconcile
+        self._reconcile_sec = reconcile_sec
+        self._logger = getLogger(__name__)
+
+    def run(self, should_stop: Callable[[], bool] = lambda: False) -> None:
+        """Watch and back up until should_stop returns True.
+
+        Args:
+            should_stop (Callable[[], bool], optional):\
+                Function to be checked whether to stop. Defaults to never stop.
+        """
+        self._watcher.start()
+        try:
+            self._reconcile()
+            next_reconcile = time.monotonic() + self._reconcile_sec
+
+            while not should_stop():
+                timeout = max(0.0, min(1.0, next_reconcile - time.monotonic()))
+                changed_files = self._watcher.poll(timeout)
+                if changed_files:
+                    self._backup_files(changed_files)
+
+                if self._watcher.overflowed or time.monotonic() >= next_reconcile:
+                    self._logger.info("WATCH_RECONCILE")
+                    # Rebuild watches first, so no event is lost during the full scan.
+                    self._watcher.start()
+                    self._reconcile()
+                    next_reconcile = time.monotonic() + self._reconcile_sec
+        finally:
+            self._watcher.close()
@@ -0,0 +1,71 @@
+"""Benchmark of checking the contents of touched files by their digests.
+
+The files are hashed with each number of threads, as BackupFacade does for the
+targets with change_detection = "hash", and then looked up in the hash cache as
+in the next run, in which the files are not read again.
+
+Usage:
+    python -m tests.bench.bench_content_hash [files] [size_kib] [dirpath]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+from autobackup import bkup, fsutil, metarepo
+
+FILES = 2_000
+SIZE_KIB = 256
+WORKERS = (1, 4)
+
+
+def _hash(filepaths: list[str], workers: int) -> list[bytes]:
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(fsutil.get_content_digest, filepaths))
+
+
+def main(args: list[str]) -> int:
+    """Print the time of hashing the files and of looking up their digests."""
+    count = int(args[0]) if args else FILES
+    size_kib = int(args[1]) if len(args) > 1 else SIZE_KIB
+    with tempfile.TemporaryDirectory(dir=args[2] if len(args) > 2 else None) as tmp:
+        filepaths = []
+        for i in range(count):
+            filepath = os.path.join(tmp, f"file{i}.bin")
+            with open(filepath, "wb") as fp:
+                fp.write(os.urandom(size_kib * 1024))
+            filepaths.append(filepath)
+
+        for workers in WORKERS:
+            started = time.perf_counter()
+            digests = _hash(filepaths, workers)
+            elapsed = time.perf_counter() - started
+            print(
+                f"hash {workers} threads: {count} files of {size_kib} KiB,"
+                f" {elapsed * 1000:.0f} ms"
+            )
+
+        with closing(sqlite3.connect(":memory:")) as dbconn:
+            m_repo = metarepo.MetadataRepository(dbconn)
+            mdatas = [
+                bkup._get_metadata(filepath, fsutil.FoundFile(filepath))
+                for filepath in filepaths
+            ]
+            for mdata, digest in zip(mdatas, digests):
+                m_repo.cache_digest(mdata, digest)
+            dbconn.commit()
+
+            started = time.perf_counter()
+            for mdata in mdatas:
+                m_repo.get_cached_digest(mdata)
+            elapsed = time.perf_counter() - started
+            print(f"cache lookups   : {count} files, {elapsed * 1000:.0f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
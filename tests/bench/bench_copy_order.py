@@ -0,0 +1,82 @@
+"""Benchmark of copy throughput in scan, inode and extent order.
+
+The source files are evicted from the page cache before each run with\
+posix_fadvise(), so that the reads hit the disk. The difference between the\
+orders shows up on HDD; on SSD or tmpfs they are expected to be close.
+
+Usage:
+    python -m tests.bench.bench_copy_order [dirpath]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from autobackup import bkup, dstrepo, fsutil
+
+DIRS = 50
+FILES_PER_DIR = 40
+FILE_SIZE = 64 * 1024
+
+
+def _build_tree(root: str) -> None:
+    # Files are written in random order, so that the scan order differs from the
+    # order of inode numbers and of the data on the disk.
+    paths = [
+        os.path.join(root, f"dir{dir_num}", f"file{i}.bin")
+        for dir_num in range(DIRS)
+        for i in range(FILES_PER_DIR)
+    ]
+    for dir_num in range(DIRS):
+        os.mkdir(os.path.join(root, f"dir{dir_num}"))
+    random.Random(0).shuffle(paths)
+    for path in paths:
+        with open(path, "wb") as fp:
+            fp.write(os.urandom(FILE_SIZE))
+    os.sync()
+
+
+def _evict(files: list[fsutil.FoundFile]) -> None:
+    for file in files:
+        fd = os.open(str(file), os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def _remove_backups(root: str) -> None:
+    for dir_num in range(DIRS):
+        shutil.rmtree(os.path.join(root, f"dir{dir_num}", ".old"), ignore_errors=True)
+
+
+def main(args: list[str]) -> int:
+    """Build the synthetic tree and print the throughput of each order."""
+    with tempfile.TemporaryDirectory(dir=args[0] if args else None) as tmp_dirpath:
+        _build_tree(tmp_dirpath)
+        files = list(fsutil.RecursiveScanDir().recursive_scandir(tmp_dirpath, False))
+        d_repo = dstrepo.DestinationRepository(None, ".old", "_%Y-%m-%d", "_", False)
+        total_mb = len(files) * FILE_SIZE / 1024.0 / 1024.0
+
+        for copy_order in bkup.COPY_ORDERS:
+            _remove_backups(tmp_dirpath)
+            os.sync()
+            _evict(files)
+
+            started = time.perf_counter()
+            for _ in d_repo.create_backups(bkup._order_files(files, copy_order)):
+                pass
+            elapsed = time.perf_counter() - started
+
+            print(
+                f"{copy_order:6}: {len(files)} files, {elapsed * 1000:.0f} ms, "
+                f"{total_mb / elapsed:.1f} MB/s"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
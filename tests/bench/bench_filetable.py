@@ -0,0 +1,52 @@
+"""Benchmark of memory per file of FileTable compared with a dict of FoundFile.
+
+Usage:
+    python -m tests.bench.bench_filetable
+"""
+import gc
+import sys
+import tempfile
+import tracemalloc
+
+from autobackup import filetable, fsutil
+from tests.bench.bench_foundfile import _build_tree
+
+
+def _measure(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (result, current)
+
+
+def main() -> int:
+    """Build the synthetic tree and print the memory usage per file."""
+    with tempfile.TemporaryDirectory() as tmp_dirpath:
+        _build_tree(tmp_dirpath)
+
+        def _scan():
+            return fsutil.RecursiveScanDir().recursive_scandir(tmp_dirpath, False)
+
+        def _build_dict():
+            files = {file.normpath_str: file for file in _scan()}
+            for file in files.values():
+                file.stat()
+            return files
+
+        files, dict_bytes = _measure(_build_dict)
+        del files
+        table, table_bytes = _measure(lambda: filetable.FileTable.from_files(_scan()))
+
+        print(
+            f"{len(table)} files: "
+            f"dict of FoundFile {dict_bytes / len(table):.0f} bytes/file, "
+            f"FileTable {table_bytes / len(table):.0f} bytes/file"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Benchmark of memory and access cost of FoundFile.
+
+Usage:
+    python -m tests.bench.bench_foundfile
+"""
+import gc
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+from autobackup import fsutil
+
+DIRS = 200
+FILES_PER_DIR = 100
+REPEAT = 5
+
+
+def _build_tree(root: str) -> None:
+    for dir_num in range(DIRS):
+        dirpath = os.path.join(root, f"dir{dir_num}")
+        os.mkdir(dirpath)
+        for i in range(FILES_PER_DIR):
+            open(os.path.join(dirpath, f"file{i}.txt"), "wb").close()
+
+
+def _scan(root: str) -> list[fsutil.FoundFile]:
+    return list(fsutil.RecursiveScanDir().recursive_scandir(root, False))
+
+
+def _access(files: list[fsutil.FoundFile]) -> None:
+    # The attributes used for every file by the repositories and the scanner.
+    for file in files:
+        file.normpath_str
+        str(file.relpath)
+        str(file)
+        hash(file)
+        file.parent
+
+
+def main() -> int:
+    """Build the synthetic tree and print the memory usage and the timings."""
+    with tempfile.TemporaryDirectory() as tmp_dirpath:
+        _build_tree(tmp_dirpath)
+
+        gc.collect()
+        tracemalloc.start()
+        files = _scan(tmp_dirpath)
+        _access(files)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        scan_sec = min(timeit.repeat(lambda: _scan(tmp_dirpath), number=1, repeat=REPEAT))
+        access_sec = min(timeit.repeat(lambda: _access(files), number=1, repeat=REPEAT))
+
+        print(
+            f"{len(files)} files: "
+            f"{current / len(files):.0f} bytes/file (incl. stat), "
+            f"scan {scan_sec * 1000:.1f} ms, "
+            f"access {access_sec * 1000:.1f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
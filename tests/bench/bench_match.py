@@ -0,0 +1,78 @@
+"""Benchmark of matching the search criteria of targets.
+
+The files are synthesized in memory with the status captured at scan time, so\
+only the matching is measured, not the file system.
+
+Usage:
+    python -m tests.bench.bench_match [files]
+"""
+import os
+import sys
+import time
+
+from autobackup import fsutil, srcrepo
+
+FILES = 1_000_000
+SCAN_ROOT = os.path.abspath(os.path.join(os.sep, "bench", "root"))
+SUFFIXES = [".txt", ".md", ".log", ".py", ".json"]
+CATCH_REGEXES = [".*", ".*\\.txt", ".*\\.(txt|md)", "src/.*", ".*\\.tx[t]"]
+
+
+class _Entry:
+    # Stand-in for os.DirEntry, with the status captured at scan time.
+    def __init__(self, file_stat: os.stat_result) -> None:
+        self._stat = file_stat
+
+    def is_symlink(self) -> bool:
+        return False
+
+    def stat(self) -> os.stat_result:
+        return self._stat
+
+
+def _build_files(count: int) -> list[tuple[str, fsutil.FoundFile]]:
+    entry = _Entry(os.stat(__file__))
+    files = []
+    for i in range(count):
+        name = f"file{i}{SUFFIXES[i % len(SUFFIXES)]}"
+        if i % 50 == 0:
+            name = "." + name
+        relpath = os.path.join("src" if i % 2 else "doc", f"dir{i // 1000}", name)
+        file = fsutil.FoundFile(
+            os.path.join(SCAN_ROOT, relpath), SCAN_ROOT, entry, False
+        )
+        files.append((file.normpath_str, file))
+    return files
+
+
+def main(args: list[str]) -> int:
+    """Build the synthetic files and print the time of matching per catch_regex."""
+    count = int(args[0]) if args else FILES
+    files = _build_files(count)
+
+    for catch_regex in CATCH_REGEXES:
+        targets = [
+            {
+                "path": SCAN_ROOT,
+                "catch_regex": catch_regex,
+                "ignore_regex": ".*\\.bak",
+                "catch_hidden": False,
+                "catch_link": False,
+            }
+        ]
+        s_repo = srcrepo.SourceRepository(None, targets, ".old")
+
+        started = time.perf_counter()
+        matched = sum(1 for _ in s_repo.get_files_matching_criteria(files))
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"{catch_regex:14}: {count} files, {matched} matched, "
+            f"{elapsed * 1000:.0f} ms ({elapsed / count * 1e9:.0f} ns/file)"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
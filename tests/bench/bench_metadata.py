@@ -0,0 +1,89 @@
+"""Benchmark of comparing a scan with the metadata in the DB.
+
+1% of the files are modified and 1% of the metadata belong to removed files.
+
+Usage:
+    python -m tests.bench.bench_metadata [files]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+from autobackup import bkup, metarepo
+
+FILES = 200_000
+
+
+class _File:
+    # Stand-in for FoundFile, with the attributes used by the change detection.
+    __slots__ = ("normpath_str", "mtime", "size", "inode", "device", "ctime")
+
+    def __init__(self, key: str, mtime: float) -> None:
+        self.normpath_str = key
+        self.mtime = mtime
+        self.size = 0
+        self.inode = 0
+        self.device = 0
+        self.ctime = mtime
+
+
+def _build_db(dbpath: str, count: int) -> dict[str, _File]:
+    src_files = {}
+    with closing(sqlite3.connect(dbpath)) as dbconn:
+        metarepo.MetadataRepository(dbconn)
+        rows = []
+        for i in range(count):
+            key = f"/bench/root/dir{i // 1000}/file{i}.txt"
+            rows.append((key, 1000.0, 0, None, None, 1000.0, None))
+            if i % 100 == 0:
+                continue
+            src_files[key] = _File(key, 2000.0 if i % 100 == 1 else 1000.0)
+        dbconn.executemany(
+            f"INSERT INTO {metarepo._TABLE_NAME} VALUES(?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        dbconn.commit()
+    return src_files
+
+
+def _diff_per_file(fcd: bkup.BackupFacade, src_files: dict) -> int:
+    for _ in fcd._m_repo.remove_metadatas(fcd._get_uncontained_keys(src_files)):
+        pass
+    return sum(1 for _ in fcd._get_modified_files(src_files))
+
+
+def _diff_in_bulk(fcd: bkup.BackupFacade, src_files: dict) -> int:
+    return len(
+        fcd._diff_in_bulk(
+            bkup._get_metadata(key, file) for key, file in src_files.items()
+        )
+    )
+
+
+def main(args: list[str]) -> int:
+    """Build the DB and print the time of each way of comparison."""
+    count = int(args[0]) if args else FILES
+    with tempfile.TemporaryDirectory() as tmp_dirpath:
+        for name, diff in [("per file", _diff_per_file), ("bulk", _diff_in_bulk)]:
+            dbpath = os.path.join(tmp_dirpath, f"{name}.sqlite3")
+            src_files = _build_db(dbpath, count)
+            with closing(sqlite3.connect(dbpath)) as dbconn:
+                fcd = bkup.BackupFacade(
+                    None, None, metarepo.MetadataRepository(dbconn), None
+                )
+                started = time.perf_counter()
+                modified = diff(fcd, src_files)
+                elapsed = time.perf_counter() - started
+
+            print(
+                f"{name:8}: {count} records, {modified} modified, "
+                f"{elapsed * 1000:.0f} ms"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
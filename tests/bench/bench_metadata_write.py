@@ -0,0 +1,50 @@
+"""Benchmark of storing the metadata of backed up files in the DB.
+
+The metadata are added one by one as BackupFacade does after each copy, and
+committed per file or per batch.
+
+Usage:
+    python -m tests.bench.bench_metadata_write [files] [dirpath]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+from autobackup import metarepo
+
+FILES = 20_000
+BATCH_SIZES = (1, 100, 1000)
+
+
+def _write(dbpath: str, count: int, batch_size: int) -> float:
+    with closing(sqlite3.connect(dbpath)) as dbconn:
+        m_repo = metarepo.MetadataRepository(dbconn)
+        started = time.perf_counter()
+        with metarepo.MetadataBatchWriter(m_repo, batch_size, 0.0) as m_writer:
+            for i in range(count):
+                m_writer.add(
+                    metarepo.Metadata(f"/bench/root/dir{i // 1000}/file{i}.txt", 1.0)
+                )
+        return time.perf_counter() - started
+
+
+def main(args: list[str]) -> int:
+    """Print the time of storing the metadata with each batch size."""
+    count = int(args[0]) if args else FILES
+    with tempfile.TemporaryDirectory(dir=args[1] if len(args) > 1 else None) as tmp:
+        for batch_size in BATCH_SIZES:
+            dbpath = os.path.join(tmp, f"batch{batch_size}.sqlite3")
+            elapsed = _write(dbpath, count, batch_size)
+            print(
+                f"batch {batch_size:5}: {count} records, {elapsed * 1000:.0f} ms"
+                f" ({elapsed / count * 1e6:.1f} us/file)"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
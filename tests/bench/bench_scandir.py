@@ -0,0 +1,91 @@
+"""Benchmark of RecursiveScanDir.recursive_scandir on synthetic trees.
+
+Usage:
+    python -m tests.bench.bench_scandir
+"""
+import os
+import sys
+import tempfile
+import timeit
+from collections.abc import Generator
+
+from autobackup import fsutil
+
+DEEP_DEPTH = 500
+DEEP_FILES_PER_DIR = 4
+WIDE_DIRS = 400
+WIDE_FILES_PER_DIR = 50
+REPEAT = 5
+
+
+def _legacy_recursive_scandir(
+    dirpath: str, scan_root: str, visited: set[tuple[int, int]]
+) -> Generator[fsutil.FoundFile]:
+    # Nested generator implementation that recursive_scandir() replaced.
+    for item in os.scandir(dirpath):
+        if item.is_dir():
+            if not item.is_symlink():
+                dir_id = fsutil._get_dir_identity(item)
+                if dir_id in visited:
+                    raise fsutil.ScanLoopError(str(item))
+                visited.add(dir_id)
+                yield from _legacy_recursive_scandir(item.path, scan_root, visited)
+        else:
+            yield fsutil.FoundFile(item.path, scan_root)
+
+
+def _build_deep_tree(root: str) -> None:
+    dirpath = root
+    for depth in range(DEEP_DEPTH):
+        for i in range(DEEP_FILES_PER_DIR):
+            open(os.path.join(dirpath, f"f{i}"), "wb").close()
+        dirpath = os.path.join(dirpath, "d")
+        os.mkdir(dirpath)
+
+
+def _build_wide_tree(root: str) -> None:
+    for dir_num in range(WIDE_DIRS):
+        dirpath = os.path.join(root, f"d{dir_num}")
+        os.mkdir(dirpath)
+        for i in range(WIDE_FILES_PER_DIR):
+            open(os.path.join(dirpath, f"f{i}"), "wb").close()
+
+
+def _bench(name: str, root: str) -> None:
+    r_scanner = fsutil.RecursiveScanDir()
+
+    def _legacy():
+        return sum(1 for _ in _legacy_recursive_scandir(root, root, set()))
+
+    def _iterative():
+        return sum(1 for _ in r_scanner.recursive_scandir(root, False))
+
+    assert _legacy() == _iterative()
+    legacy_sec = min(timeit.repeat(_legacy, number=1, repeat=REPEAT))
+    iterative_sec = min(timeit.repeat(_iterative, number=1, repeat=REPEAT))
+    print(
+        f"{name}: {_iterative()} files, "
+        f"nested generators {legacy_sec * 1000:.1f} ms, "
+        f"explicit stack {iterative_sec * 1000:.1f} ms"
+    )
+
+
+def main() -> int:
+    """Build the synthetic trees and print the timings."""
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), DEEP_DEPTH * 4))
+    with tempfile.TemporaryDirectory() as tmp_dirpath:
+        deep_root = os.path.join(tmp_dirpath, "deep")
+        wide_root = os.path.join(tmp_dirpath, "wide")
+        os.mkdir(deep_root)
+        os.mkdir(wide_root)
+        _build_deep_tree(deep_root)
+        _build_wide_tree(wide_root)
+
+        _bench(f"deep (depth {DEEP_DEPTH})", deep_root)
+        _bench(f"wide ({WIDE_DIRS} dirs)", wide_root)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
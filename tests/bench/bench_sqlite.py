@@ -0,0 +1,127 @@
+"""Benchmark of the schema and the connection settings of the metadata DB.
+
+Each profile runs the same work on a DB of the same records: a bulk diff of a
+scan in which 1% of the files are modified and 1% are removed, lookups of random
+keys, and writes committed per file and per batch.
+
+Usage:
+    python -m tests.bench.bench_sqlite [records] [dirpath]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+from autobackup import bkup, metarepo, repoinit
+
+RECORDS = 2_000_000
+LOOKUPS = 100_000
+WRITES = 2_000
+
+# Settings of [common] in the example of README.md
+TUNED = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "cache_size_kib": 65536,
+    "mmap_size_mib": 256,
+    "temp_store": "memory",
+}
+
+PROFILES = [
+    ("legacy", True, {}),
+    ("without rowid", False, {}),
+    ("tuned", False, TUNED),
+]
+
+
+def _key(i: int) -> str:
+    return f"/bench/root/dir{i // 1000}/file{i}.txt"
+
+
+def _build_db(dbpath: str, count: int, with_rowid: bool) -> None:
+    with closing(sqlite3.connect(dbpath)) as dbconn:
+        if with_rowid:
+            # The table of the first release with the columns added later,
+            # marked as the current version so that it is not migrated.
+            cur = dbconn.cursor()
+            metarepo._create_fileinfo_table(cur)
+            for migration in metarepo._MIGRATIONS[2:]:
+                migration(cur)
+            dbconn.execute(
+                f"CREATE TABLE {metarepo._SCHEMA_TABLE_NAME}(version INTEGER NOT NULL)"
+            )
+            dbconn.execute(
+                f"INSERT INTO {metarepo._SCHEMA_TABLE_NAME} VALUES(?)",
+                (metarepo.SCHEMA_VERSION,),
+            )
+        else:
+            metarepo.MetadataRepository(dbconn)
+        dbconn.executemany(
+            f"INSERT INTO {metarepo._TABLE_NAME} VALUES(?, ?, ?, ?, ?, ?, ?)",
+            ((_key(i), 1000.0, 4096, i + 1, 1, 1000.0, None) for i in range(count)),
+        )
+        dbconn.commit()
+
+
+def _run(dbpath: str, count: int, settings: dict) -> dict[str, float]:
+    result = {}
+    with closing(sqlite3.connect(dbpath)) as dbconn:
+        m_repo = repoinit.MetadataRepositoryFactory(
+            dbconn, **settings
+        ).get_metadata_repository()
+        fcd = bkup.BackupFacade(None, None, m_repo, None)
+
+        scanned = (
+            metarepo.Metadata(
+                _key(i), 2000.0 if i % 100 == 1 else 1000.0, 4096, i + 1, 1, 1000.0
+            )
+            for i in range(count)
+            if i % 100 != 0
+        )
+        started = time.perf_counter()
+        fcd._diff_in_bulk(scanned)
+        result["bulk diff"] = time.perf_counter() - started
+
+        keys = [_key(random.randrange(count)) for _ in range(LOOKUPS)]
+        started = time.perf_counter()
+        for key in keys:
+            m_repo.get_metadata(key)
+        result["lookups"] = time.perf_counter() - started
+
+        for batch_size in (1, 1000):
+            started = time.perf_counter()
+            with metarepo.MetadataBatchWriter(m_repo, batch_size, 0.0) as m_writer:
+                for i in range(WRITES):
+                    m_writer.add(metarepo.Metadata(_key(i), 3000.0 + batch_size))
+            result[f"writes/{batch_size}"] = time.perf_counter() - started
+
+    result["size"] = os.path.getsize(dbpath)
+    return result
+
+
+def main(args: list[str]) -> int:
+    """Build the DB of each profile and print the time of each work."""
+    count = int(args[0]) if args else RECORDS
+    random.seed(0)
+    with tempfile.TemporaryDirectory(dir=args[1] if len(args) > 1 else None) as tmp:
+        for name, with_rowid, settings in PROFILES:
+            dbpath = os.path.join(tmp, f"{name.replace(' ', '_')}.sqlite3")
+            _build_db(dbpath, count, with_rowid)
+            result = _run(dbpath, count, settings)
+            print(
+                f"{name:13}: {count} records,"
+                f" bulk diff {result['bulk diff'] * 1000:.0f} ms,"
+                f" {LOOKUPS} lookups {result['lookups'] * 1000:.0f} ms,"
+                f" {WRITES} writes per file {result['writes/1'] * 1000:.0f} ms"
+                f" / per 1000 {result['writes/1000'] * 1000:.0f} ms,"
+                f" {result['size'] / 1024 / 1024:.0f} MiB"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
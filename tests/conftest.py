@@ -156,6 +156,11 @@ def build_path():
     return testutil.build_path
 
 
+@pytest.fixture
+def build_facade():
+    return testutil.build_facade
+
+
 @pytest.fixture
 def testpath():
     return testutil.testpath
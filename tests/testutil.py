@@ -4,8 +4,12 @@ import pytest_raises
 import datetime
 import os
 import pathlib
+import sqlite3
 
+from autobackup.bkup import BackupFacade
 from autobackup.fsutil import FoundFile
+from autobackup.metarepo import MetadataRepository
+from autobackup.repoinit import BackupRepositoryFactory
 from autobackup.scanner import AllFileScanner
 
 TESTDATA_TIMESTAMP = datetime.datetime(2023, 1, 23, 4, 56, 12, 345678).timestamp()
@@ -25,6 +29,9 @@ class AllFileScannerMock(AllFileScanner):
     def get_all_files(self) -> dict[str, FoundFile]:
         return self._all_files
 
+    def iter_all_files(self):
+        yield from self._all_files.items()
+
 
 class FoundFileMock(FoundFile):
     def __init__(
@@ -34,8 +41,9 @@ class FoundFileMock(FoundFile):
         mtime: float = 0.0,
         is_hidden_flag: bool = False,
         size: int = 4096,
+        in_dst_dir: bool = None,
     ) -> None:
-        super().__init__(filepath, scan_root_dirpath)
+        super().__init__(filepath, scan_root_dirpath, in_dst_dir=in_dst_dir)
         self._mtime = mtime
         self._size = size
         self._is_hidden_flag = is_hidden_flag
@@ -48,6 +56,18 @@ class FoundFileMock(FoundFile):
     def size(self) -> int:
         return self._size
 
+    @property
+    def inode(self) -> int:
+        return 0
+
+    @property
+    def device(self) -> int:
+        return 0
+
+    @property
+    def ctime(self) -> float:
+        return self._mtime
+
     def is_hidden(self) -> bool:
         import platform
 
@@ -106,6 +126,38 @@ def build_path(
     return result
 
 
+def build_facade(
+    target_root: str,
+    m_repo: MetadataRepository = None,
+    catch_hidden: bool = True,
+    **kwargs,
+) -> BackupFacade:
+    b_factory = BackupRepositoryFactory(
+        [
+            {
+                "path": target_root,
+                "catch_regex": ".*",
+                "ignore_regex": "",
+                "catch_hidden": catch_hidden,
+                "catch_link": False,
+                "recursive": True,
+            }
+        ],
+        ".old",
+        "_%Y-%m-%d",
+        "_",
+    )
+    if m_repo is None:
+        m_repo = MetadataRepository(sqlite3.connect(":memory:"))
+    return BackupFacade(
+        b_factory.get_source_repository(),
+        b_factory.get_destination_repository(),
+        m_repo,
+        b_factory.get_all_file_scanner(),
+        **kwargs,
+    )
+
+
 class testpath:
     # SOURCES
 
@@ -6,7 +6,15 @@ import sqlite3
 import sys
 from os import sep
 
-from autobackup import bkup, dstrepo, fsutil, metarepo, scanner, srcrepo
+from autobackup import (
+    bkup,
+    dstrepo,
+    filetable,
+    fsutil,
+    metarepo,
+    scanner,
+    srcrepo,
+)
 
 
 class Test_BackupFacade_get_uncontained_keys:
@@ -36,6 +44,29 @@ class Test_BackupFacade_get_uncontained_keys:
         # Assert
         assert set(actual) == set(["/path/to/file2.ext"])
 
+    @staticmethod
+    def test_IfTargetIsSkippedThenKeepRecordsUnderIt(AllFileScannerMock, build_path):
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        m_repo = metarepo.MetadataRepository(dbconn)
+        key1 = build_path("path", "to", file="file1.ext")
+        key2 = build_path("path", "to", file="file2.ext")
+        key3 = build_path("hung", file="file3.ext")
+        for key in [key1, key2, key3]:
+            m_repo.update_metadata(metarepo.Metadata(key, 0.0))
+
+        scnr = AllFileScannerMock({})
+        scnr.skipped_targets = ["hung"]
+        new_info = {key1: None}
+
+        fcd = bkup.BackupFacade(None, None, m_repo, scnr)
+
+        # Act
+        actual = [(item) for item in fcd._get_uncontained_keys(new_info.keys())]
+
+        # Assert
+        assert set(actual) == set([key2])
+
 
 class Test_BackupFacade_get_files_to_be_discarded:
     @staticmethod
@@ -123,6 +154,31 @@ class Test_BackupFacade_get_files_to_be_discarded:
         assert set(actual) == set(expected)
 
 
+class Test_BackupFacade_get_rows_to_be_discarded:
+    @staticmethod
+    def test_ReturnSameFilesAsGetFilesToBeDiscarded(
+        test_prarams_for_get_discard_list,
+    ):
+        # Arrange
+        today, all_files, expected = test_prarams_for_get_discard_list
+        files = list(all_files.values())
+        table = filetable.FileTable.from_files(files)
+        for row, file in enumerate(files):
+            # The dummy files do not exist, so give the columns their values.
+            table.mtimes[row] = file.mtime
+            table.flags[row] = filetable.FLAG_IN_DST_DIR
+        d_repo = dstrepo.DestinationRepository(None, ".old", "_%Y-%m-%d", "_", False)
+        fcd = bkup.BackupFacade(None, d_repo, None, None)
+
+        # Act
+        actual = [
+            files[row] for row in fcd._get_rows_to_be_discarded(table, today, 2, 2)
+        ]
+
+        # Assert
+        assert set(actual) == set(expected)
+
+
 class Test_BackupFacade_get_modified_files:
     @staticmethod
     def test_ReturnRecordsToBeUpdated(
@@ -279,7 +335,7 @@ class Test_BackupFacade_execute:
         )
 
         # STEP 5
-        def _create_backups(x):
+        def _create_backups(x, is_changed_in_place=None):
             nonlocal actual_called
             nonlocal actual_called_skip
             nonlocal actual_args
@@ -403,6 +459,9 @@ class Test_BackupFacade_execute:
                 "4": fsutil.FoundFile("4"),
                 "5": fsutil.FoundFile("5"),
                 "6": fsutil.FoundFile("6"),
+                "7-a": fsutil.FoundFile("7-a", in_dst_dir=True),
+                "7-b": fsutil.FoundFile("7-b", in_dst_dir=True),
+                "7-c": fsutil.FoundFile("7-c", in_dst_dir=True),
             },
         )
         fcd = bkup.BackupFacade(
@@ -458,3 +517,389 @@ class Test_BackupFacade_execute:
             "_remove_backups": ("generator",),
             "_get_files_to_be_discarded": ("dict", "int", "int"),
         }
+
+
+class Test_BackupFacade_execute_streaming:
+    @staticmethod
+    def test_IfStreamingThenCreateSameBackupsAsDefault(testdata, rscan, build_facade):
+        # Arrange
+        target_root_streaming = testdata(__name__ + ".streaming")
+        target_root_default = testdata(__name__ + ".default")
+
+        def _execute(target_root: str, streaming: bool) -> None:
+            build_facade(target_root).execute(streaming=streaming)
+
+        # Act
+        _execute(target_root_streaming, True)
+        _execute(target_root_default, False)
+        actual = set(rscan(target_root_streaming))
+        expected = set(rscan(target_root_default))
+
+        # Assert
+        assert len(actual) == 10
+        assert actual == expected
+
+    @staticmethod
+    def test_IfStreamingThenDiscardOldBackups(testdata_stale, rscan, build_facade):
+        # Arrange
+        target_root = testdata_stale(__name__ + ".streaming_stale")
+        backups = set(rscan(target_root))
+
+        # Act
+        build_facade(target_root, catch_hidden=False).execute(streaming=True)
+        actual = backups - set(rscan(target_root))
+
+        # Assert
+        # The backups of this run are found by the walk, and supersede the old
+        # backups of the same day.
+        assert actual == set(
+            [
+                ".old" + sep + "TestFile_2023-01-23_0000",
+                "TestDir1" + sep + ".old" + sep + "TestFile11_2023-01-23_0000",
+                "TestDir1" + sep + ".old" + sep + "TestFile12_2023-01-23_0000.ext",
+                "TestDir2" + sep + ".old" + sep + "TestFile22_2023-01-23_0000",
+            ]
+        )
+
+class Test_BackupFacade_execute_bulk_diff:
+    @staticmethod
+    @pytest.mark.parametrize("columnar", [False, True])
+    def test_IfBulkDiffThenCreateSameBackupsAndMetadataAsDefault(
+        testdata, rscan, build_facade, columnar
+    ):
+        import os
+
+        # Arrange
+        target_root_bulk = testdata(__name__ + ".bulk")
+        target_root_default = testdata(__name__ + ".default")
+
+        def _execute(target_root: str, bulk_diff: bool) -> set[str]:
+            m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+            m_repo.update_metadata(metarepo.Metadata("/not/found", 0.0))
+            fcd = build_facade(target_root, m_repo)
+            # The second run finds no modified file.
+            for _ in range(2):
+                fcd.execute(columnar=columnar, bulk_diff=bulk_diff)
+            root_key = os.path.normcase(os.path.abspath(target_root))
+            return set(
+                (mdata.key.replace(root_key, ""), mdata.mtime)
+                for mdata in m_repo.get_all_metadatas()
+            )
+
+        # Act
+        actual_metadata = _execute(target_root_bulk, True)
+        expected_metadata = _execute(target_root_default, False)
+        actual = set(rscan(target_root_bulk))
+        expected = set(rscan(target_root_default))
+
+        # Assert
+        assert actual == expected
+        assert actual_metadata == expected_metadata
+        assert len(actual_metadata) > 0
+
+
+class Test_BackupFacade_execute_change_detection:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "mode",
+        [
+            {},
+            {"bulk_diff": True},
+            {"columnar": True},
+            {"columnar": True, "bulk_diff": True},
+            {"streaming": True},
+        ],
+    )
+    def test_IfMtimeIsPreservedThenDetectChange(testdata, rscan, build_facade, mode):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__ + "." + "_".join(mode) + ".preserved")
+        fcd = build_facade(target_root)
+        fcd.execute(False, **mode)
+        backups = len(list(rscan(target_root)))
+
+        src_path = os.path.join(target_root, "TestDir1", "TestFile11")
+        src_stat = os.stat(src_path)
+        with open(src_path, "w") as f:
+            f.write("modified")
+        os.utime(src_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+        # Act
+        fcd.execute(False, **mode)
+
+        # Assert
+        assert len(list(rscan(target_root))) == backups + 1
+        mdata = fcd._m_repo.get_metadata(
+            os.path.normcase(os.path.abspath(src_path))
+        )
+        assert (mdata.mtime, mdata.size) == (src_stat.st_mtime, len("modified"))
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "mode",
+        [{}, {"bulk_diff": True}, {"columnar": True}, {"streaming": True}],
+    )
+    def test_IfSizeAndMtimeArePreservedThenCreateNewBackup(
+        testdata, rscan, build_facade, mode
+    ):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__ + "." + "_".join(mode) + ".in_place")
+        fcd = build_facade(target_root)
+        src_path = os.path.join(target_root, "TestDir1", "TestFile11")
+        with open(src_path, "w") as f:
+            f.write("AAAA")
+        fcd.execute(False, **mode)
+        backups = set(rscan(target_root))
+
+        src_stat = os.stat(src_path)
+        with open(src_path, "w") as f:
+            f.write("BBBB")
+        os.utime(src_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+        # Act
+        fcd.execute(False, **mode)
+        created = set(rscan(target_root)) - backups
+        fcd.execute(False, **mode)
+
+        # Assert
+        assert len(created) == 1
+        with open(os.path.join(target_root, created.pop()), "r") as f:
+            assert f.read() == "BBBB"
+        assert len(set(rscan(target_root)) - backups) == 1
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "mode",
+        [{}, {"bulk_diff": True}, {"columnar": True}, {"streaming": True}],
+    )
+    def test_IfStatusIsUnknownThenFillWithoutBackup(
+        testdata, rscan, build_facade, mode
+    ):
+        # Arrange
+        target_root = testdata(__name__ + "." + "_".join(mode) + ".unknown")
+        fcd = build_facade(target_root)
+        fcd.execute(False, **mode)
+        backups = len(list(rscan(target_root)))
+        # Metadata recorded by an older version
+        fcd._m_repo._dbconn.execute(
+            f"UPDATE {metarepo._TABLE_NAME} SET size = NULL, ctime = NULL"
+        )
+        fcd._m_repo._dbconn.commit()
+
+        # Act
+        fcd.execute(False, **mode)
+
+        # Assert
+        assert len(list(rscan(target_root))) == backups
+        assert all(
+            not mdata.size is None and not mdata.ctime is None
+            for mdata in fcd._m_repo.get_all_metadatas()
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "mode",
+        [{}, {"bulk_diff": True}, {"columnar": True}, {"streaming": True}],
+    )
+    def test_IfContentIsSameThenSkipBackup(
+        testdata, rscan, mocker, build_facade, mode
+    ):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__ + "." + "_".join(mode) + ".hash")
+        fcd = build_facade(target_root, hash_targets=[target_root], hash_workers=2)
+        fcd.execute(False, **mode)
+        backups = len(list(rscan(target_root)))
+
+        touched_path = os.path.join(target_root, "TestDir1", "TestFile11")
+        with open(touched_path, "rb") as f:
+            content = f.read()
+        with open(touched_path, "wb") as f:
+            f.write(content)
+        os.utime(touched_path, (1.0, 1.0))
+        modified_path = os.path.join(target_root, "TestDir1", "TestFile12.ext")
+        with open(modified_path, "w") as f:
+            f.write("modified")
+        os.utime(modified_path, (1.0, 1.0))
+        spy = mocker.spy(fcd._d_repo, "create_backup")
+
+        # Act
+        fcd.execute(False, **mode)
+
+        # Assert
+        assert len(list(rscan(target_root))) == backups + 1
+        assert [str(call.args[0]) for call in spy.call_args_list] == [
+            os.path.abspath(modified_path)
+        ]
+        mdata = fcd._m_repo.get_metadata(
+            os.path.normcase(os.path.abspath(touched_path))
+        )
+        assert mdata.mtime == 1.0
+        assert not mdata.digest is None
+
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "mode",
+        [{}, {"bulk_diff": True}, {"columnar": True}, {"streaming": True}],
+    )
+    def test_IfContentIsChangedKeepingSizeAndMtimeThenBackup(
+        testdata, rscan, build_facade, mode
+    ):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__ + "." + "_".join(mode) + ".hash_in_place")
+        fcd = build_facade(target_root, hash_targets=[target_root], hash_workers=2)
+        src_path = os.path.join(target_root, "TestDir1", "TestFile11")
+        with open(src_path, "w") as f:
+            f.write("AAAA")
+        fcd.execute(False, **mode)
+        backups = set(rscan(target_root))
+
+        src_stat = os.stat(src_path)
+        with open(src_path, "w") as f:
+            f.write("BBBB")
+        os.utime(src_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+        # Act
+        fcd.execute(False, **mode)
+
+        # Assert
+        created = set(rscan(target_root)) - backups
+        assert len(created) == 1
+        with open(os.path.join(target_root, created.pop()), "r") as f:
+            assert f.read() == "BBBB"
+        mdata = fcd._m_repo.get_metadata(
+            os.path.normcase(os.path.abspath(src_path))
+        )
+        assert mdata.digest == fsutil.get_content_digest(src_path)
+
+class Test_order_files:
+    @staticmethod
+    def test_IfInodeThenSortByInode(testdata):
+        # Arrange
+        target_root = testdata(__name__)
+        files = list(fsutil.RecursiveScanDir().recursive_scandir(target_root, False))
+
+        # Act
+        actual = [file.inode for file in bkup._order_files(reversed(files), "inode")]
+
+        # Assert
+        assert actual == sorted(file.inode for file in files)
+
+    @staticmethod
+    def test_IfScanThenKeepOrder(testdata):
+        # Arrange
+        target_root = testdata(__name__)
+        files = list(fsutil.RecursiveScanDir().recursive_scandir(target_root, False))
+
+        # Act
+        actual = list(bkup._order_files(files, "scan"))
+
+        # Assert
+        assert actual == files
+
+    @staticmethod
+    def test_IfExtentThenSortByPhysicalOffset(mocker, testdata):
+        # Arrange
+        target_root = testdata(__name__)
+        files = list(fsutil.RecursiveScanDir().recursive_scandir(target_root, False))
+        offsets = {str(file): 1000 - i for i, file in enumerate(files)}
+        mocker.patch(
+            "autobackup.bkup.get_physical_offset", side_effect=lambda p: offsets[p]
+        )
+
+        # Act
+        actual = list(bkup._order_files(files, "extent"))
+
+        # Assert
+        assert actual == list(reversed(files))
+
+
+class Test_BackupFacade_execute_columnar:
+    @staticmethod
+    def test_IfColumnarThenCreateSameBackupsAsDefault(
+        testdata_stale, rscan, build_facade
+    ):
+        # Arrange
+        target_root_columnar = testdata_stale(__name__ + ".columnar")
+        target_root_default = testdata_stale(__name__ + ".default")
+
+        def _execute(target_root: str, columnar: bool) -> None:
+            m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+            m_repo.update_metadata(metarepo.Metadata("/not/found", 0.0))
+            fcd = build_facade(target_root, m_repo, catch_hidden=False)
+            fcd.execute(columnar=columnar)
+            return sorted(mdata.key for mdata in m_repo.get_all_metadatas())
+
+        # Act
+        actual_keys = _execute(target_root_columnar, True)
+        expected_keys = _execute(target_root_default, False)
+        actual = set(rscan(target_root_columnar))
+        expected = set(rscan(target_root_default))
+
+        # Assert
+        assert actual == expected
+        assert [key.replace(".columnar", "") for key in actual_keys] == [
+            key.replace(".default", "") for key in expected_keys
+        ]
+
+
+    @staticmethod
+    def test_IfRowsExceedChunkThenDetectChangesInEachChunk(
+        testdata, rscan, mocker, build_facade
+    ):
+        import os
+
+        # Arrange
+        mocker.patch("autobackup.bkup._DIFF_CHUNK_SIZE", 2)
+        target_root = testdata(__name__ + ".chunk")
+        fcd = build_facade(target_root)
+        fcd.execute(False, columnar=True)
+        backups = set(rscan(target_root))
+        modified_path = os.path.join(target_root, "TestDir2", "TestFile22")
+        with open(modified_path, "w") as f:
+            f.write("modified")
+        spy = mocker.spy(fcd._m_repo, "get_metadatas")
+
+        # Act
+        fcd.execute(False, columnar=True)
+
+        # Assert
+        created = set(rscan(target_root)) - backups
+        assert [os.path.dirname(path) for path in created] == [
+            os.path.join("TestDir2", ".old")
+        ]
+        assert spy.call_count > 1
+        assert all(len(call.args[0]) <= 2 for call in spy.call_args_list)
+
+class Test_BackupFacade_backup_files:
+    @staticmethod
+    def test_BackupOnlyGivenFiles(testdata, rscan, testpath, build_facade):
+        # Arrange
+        target_root = testdata(__name__)
+        fcd = build_facade(target_root)
+        changed_file = fsutil.FoundFile(
+            testpath.src_testfile11_path(target_root, norm_path=False), target_root
+        )
+
+        # Act
+        fcd.backup_files([changed_file])
+        actual = set(rscan(target_root))
+
+        # Assert
+        assert actual == set(
+            [
+                "TestFile",
+                "TestDir1" + sep + "TestFile11",
+                "TestDir1" + sep + ".old" + sep + "TestFile11_2023-01-23_0000",
+                "TestDir1" + sep + "TestFile12.ext",
+                "TestDir2" + sep + ".TestFile21",
+                "TestDir2" + sep + "TestFile22",
+            ]
+        )
@@ -72,6 +72,176 @@ class Test_validate_app_cnf:
         # Assert
         assert not cnf_error is None
 
+    @staticmethod
+    def test_IfScanWorkersIsLessThanOneThenRaiseException():
+        # Arrange
+        app_cnf = {
+            "common": {
+                "destination_dir": "a",
+                "tmp_dirpath": "a",
+                "var_dirpath": "a",
+                "scan_workers": 0,
+            }
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
+    @staticmethod
+    def test_IfStreamingAndColumnarAreBothEnabledThenRaiseException():
+        # Arrange
+        app_cnf = {
+            "common": {
+                "destination_dir": "a",
+                "tmp_dirpath": "a",
+                "var_dirpath": "a",
+                "streaming": True,
+                "columnar": True,
+            }
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
+    @staticmethod
+    def test_IfCopyOrderIsUnknownThenRaiseException():
+        # Arrange
+        app_cnf = {
+            "common": {
+                "destination_dir": "a",
+                "tmp_dirpath": "a",
+                "var_dirpath": "a",
+                "copy_order": "random",
+            }
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
+    @staticmethod
+    def test_IfHotspotTopIsNegativeThenRaiseException():
+        # Arrange
+        app_cnf = {
+            "common": {
+                "destination_dir": "a",
+                "tmp_dirpath": "a",
+                "var_dirpath": "a",
+                "hotspot_top": -1,
+            }
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "db_cnf",
+        [
+            {"db_journal_mode": "fast"},
+            {"db_synchronous": "1; DROP TABLE fileinfo"},
+            {"db_cache_size_kib": -1},
+        ],
+    )
+    def test_IfDbSettingIsInvalidThenRaiseException(db_cnf):
+        # Arrange
+        app_cnf = {
+            "common": {
+                "destination_dir": "a",
+                "tmp_dirpath": "a",
+                "var_dirpath": "a",
+                **db_cnf,
+            }
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "batch",
+        [
+            {"metadata_batch_size": 0},
+            {"metadata_batch_sec": -1.0},
+            {"hash_workers": 0},
+        ],
+    )
+    def test_IfMetadataBatchIsInvalidThenRaiseException(batch):
+        # Arrange
+        app_cnf = {
+            "common": {
+                "destination_dir": "a",
+                "tmp_dirpath": "a",
+                "var_dirpath": "a",
+                **batch,
+            }
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "limits",
+        [
+            {"min_size": -1},
+            {"max_age": -1},
+            {"min_size": 100, "max_size": 10},
+            {"min_age": 100, "max_age": 10},
+        ],
+    )
+    def test_IfSizeOrAgeLimitIsInvalidThenRaiseException(limits):
+        # Arrange
+        app_cnf = {
+            "common": {"destination_dir": "a", "tmp_dirpath": "a", "var_dirpath": "a"},
+            "targets": [{"path": "path1", **limits}],
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
+    @staticmethod
+    def test_IfChangeDetectionIsInvalidThenRaiseException():
+        # Arrange
+        app_cnf = {
+            "common": {"destination_dir": "a", "tmp_dirpath": "a", "var_dirpath": "a"},
+            "targets": [{"path": "path1", "change_detection": "ctime"}],
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
     @staticmethod
     def test_IfTargetDirPathIsDuplicateThenRaiseException():
         # Arrange
@@ -87,6 +257,36 @@ class Test_validate_app_cnf:
         # Assert
         assert not cnf_error is None
 
+    @staticmethod
+    def test_IfPruneRegexIsInvalidThenRaiseException():
+        # Arrange
+        app_cnf = {
+            "common": {"destination_dir": "a", "tmp_dirpath": "a", "var_dirpath": "a"},
+            "targets": [{"path": "path1", "prune_regex": "("}],
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
+    @staticmethod
+    def test_IfScanTimeoutIsNegativeThenRaiseException():
+        # Arrange
+        app_cnf = {
+            "common": {"destination_dir": "a", "tmp_dirpath": "a", "var_dirpath": "a"},
+            "targets": [{"path": "path1", "scan_timeout_sec": -1}],
+        }
+
+        # Act
+        with pytest.raises(cnf.CnfError) as cnf_error:
+            cnf.validate_app_cnf(app_cnf)
+
+        # Assert
+        assert not cnf_error is None
+
 
 class Test_merge_app_cnf:
     @staticmethod
@@ -171,6 +371,20 @@ class Test_get_cli_cnf:
             "path/to/dir4",
             "--db_filename",
             "fileinfo.sqlite3",
+            "--db_journal_mode",
+            "wal",
+            "--db_synchronous",
+            "normal",
+            "--db_cache_size_kib",
+            "1024",
+            "--db_mmap_size_mib",
+            "16",
+            "--db_temp_store",
+            "memory",
+            "--ignore_filename",
+            ".autobackupignore",
+            "--ignore_cache_filename",
+            "ignorecache.json",
             "--destination_dir",
             ".old",
             "--datetime_format",
@@ -181,6 +395,32 @@ class Test_get_cli_cnf:
             "_",
             "--scan_symlink_dir",
             "false",
+            "--scan_workers",
+            "4",
+            "--walk_workers",
+            "8",
+            "--streaming",
+            "true",
+            "--columnar",
+            "true",
+            "--copy_order",
+            "inode",
+            "--bulk_diff",
+            "true",
+            "--hotspot_top",
+            "10",
+            "--hotspot_runs",
+            "5",
+            "--metadata_batch_size",
+            "100",
+            "--metadata_batch_sec",
+            "2.5",
+            "--hash_workers",
+            "8",
+            "--watch_debounce_sec",
+            "5",
+            "--watch_reconcile_sec",
+            "600",
             "--discard_old_backup",
             "true",
             "--discard_phase1_weeks",
@@ -195,17 +435,39 @@ class Test_get_cli_cnf:
         expected = {
             "common": {
                 "dry_run": False,
+                "watch": False,
+                "report_hotspots": False,
                 "debug": False,
                 "cnf_dirpath": "path/to/dir1",
                 "tmp_dirpath": "path/to/dir2",
                 "var_dirpath": "path/to/dir3",
                 "log_dirpath": "path/to/dir4",
                 "db_filename": "fileinfo.sqlite3",
+                "db_journal_mode": "wal",
+                "db_synchronous": "normal",
+                "db_cache_size_kib": 1024,
+                "db_mmap_size_mib": 16,
+                "db_temp_store": "memory",
+                "ignore_filename": ".autobackupignore",
+                "ignore_cache_filename": "ignorecache.json",
                 "destination_dir": ".old",
                 "datetime_format": "_%Y-%m-%d",
                 "use_seq_num": True,
                 "seq_num_sep": "_",
                 "scan_symlink_dir": True,
+                "scan_workers": 4,
+                "walk_workers": 8,
+                "streaming": True,
+                "columnar": True,
+                "copy_order": "inode",
+                "bulk_diff": True,
+                "hotspot_top": 10,
+                "hotspot_runs": 5,
+                "metadata_batch_size": 100,
+                "metadata_batch_sec": 2.5,
+                "hash_workers": 8,
+                "watch_debounce_sec": 5.0,
+                "watch_reconcile_sec": 600.0,
                 "discard_old_backup": True,
                 "discard_phase1_weeks": 2,
                 "discard_phase2_months": 2,
@@ -241,17 +503,39 @@ class Test_get_cli_cnf:
         expected = {
             "common": {
                 "dry_run": False,
+                "watch": False,
+                "report_hotspots": False,
                 "debug": False,
                 "cnf_dirpath": None,
                 "tmp_dirpath": None,
                 "var_dirpath": None,
                 "log_dirpath": None,
                 "db_filename": None,
+                "db_journal_mode": None,
+                "db_synchronous": None,
+                "db_cache_size_kib": None,
+                "db_mmap_size_mib": None,
+                "db_temp_store": None,
+                "ignore_filename": None,
+                "ignore_cache_filename": None,
                 "destination_dir": None,
                 "datetime_format": None,
                 "use_seq_num": None,
                 "seq_num_sep": None,
                 "scan_symlink_dir": None,
+                "scan_workers": None,
+                "walk_workers": None,
+                "streaming": None,
+                "columnar": None,
+                "copy_order": None,
+                "bulk_diff": None,
+                "hotspot_top": None,
+                "hotspot_runs": None,
+                "metadata_batch_size": None,
+                "metadata_batch_sec": None,
+                "hash_workers": None,
+                "watch_debounce_sec": None,
+                "watch_reconcile_sec": None,
                 "discard_old_backup": None,
                 "discard_phase1_weeks": None,
                 "discard_phase2_months": None,
@@ -297,12 +581,32 @@ class Test_ConfigurationLoader_get_app_cnf:
                 "var_dirpath",
                 "log_dirpath",
                 "db_filename",
+                "db_journal_mode",
+                "db_synchronous",
+                "db_cache_size_kib",
+                "db_mmap_size_mib",
+                "db_temp_store",
+                "ignore_filename",
+                "ignore_cache_filename",
                 "destination_dir",
                 "datetime_format",
                 "use_seq_num",
                 "seq_num_sep",
                 "cli_cnf_test",
                 "scan_symlink_dir",
+                "scan_workers",
+                "walk_workers",
+                "streaming",
+                "columnar",
+                "copy_order",
+                "bulk_diff",
+                "hotspot_top",
+                "hotspot_runs",
+                "metadata_batch_size",
+                "metadata_batch_sec",
+                "hash_workers",
+                "watch_debounce_sec",
+                "watch_reconcile_sec",
                 "discard_old_backup",
                 "discard_phase1_weeks",
                 "discard_phase2_months",
@@ -332,12 +636,32 @@ class Test_ConfigurationLoader_get_app_cnf:
                 "var_dirpath",
                 "log_dirpath",
                 "db_filename",
+                "db_journal_mode",
+                "db_synchronous",
+                "db_cache_size_kib",
+                "db_mmap_size_mib",
+                "db_temp_store",
+                "ignore_filename",
+                "ignore_cache_filename",
                 "destination_dir",
                 "datetime_format",
                 "use_seq_num",
                 "seq_num_sep",
                 "cli_cnf_test",
                 "scan_symlink_dir",
+                "scan_workers",
+                "walk_workers",
+                "streaming",
+                "columnar",
+                "copy_order",
+                "bulk_diff",
+                "hotspot_top",
+                "hotspot_runs",
+                "metadata_batch_size",
+                "metadata_batch_sec",
+                "hash_workers",
+                "watch_debounce_sec",
+                "watch_reconcile_sec",
                 "discard_old_backup",
                 "discard_phase1_weeks",
                 "discard_phase2_months",
@@ -267,7 +267,7 @@ class Test_DestinationRepository_create_backup:
 
         src_testfile11_path = testpath.src_testfile11_path(target_root, norm_path=False)
         src_testfile11 = fsutil.FoundFile(
-            src_testfile11_path, target_root, testdata_timestamp
+            src_testfile11_path, target_root, testdata_timestamp, size=0
         )
 
         dst_testfile11_path = testpath.dst_testfile11_path(target_root, norm_path=False)
@@ -363,6 +363,39 @@ class Test_DestinationRepository_create_backups:
             assert actual_message.startswith(expected_message)
 
 
+    @staticmethod
+    def test_IfSourcesAreHardlinkedThenCopyOnceAndLinkOthers(mocker, caplog, testdata):
+        import os
+
+        # Arrange
+        caplog.set_level(DEBUG)
+        target_root = testdata(__name__)
+        src_path = testpath.src_testfile11_path(target_root, norm_path=False)
+        link_path = testpath.src_testfile22_path(target_root, norm_path=False)
+        os.remove(link_path)
+        os.link(src_path, link_path)
+        src_files = [
+            fsutil.FoundFile(src_path, target_root),
+            fsutil.FoundFile(link_path, target_root),
+        ]
+        copy_spy = mocker.spy(dstrepo.shutil, "copy2")
+
+        d_repo = dstrepo.DestinationRepository(None, ".old", "_%Y-%m-%d", "_", False)
+
+        # Act
+        actual = [dst_file for _, dst_file in d_repo.create_backups(src_files)]
+        actual_logs = [
+            message.split(":")[0]
+            for module, _, message in caplog.record_tuples
+            if module == "autobackup.dstrepo"
+        ]
+
+        # Assert
+        assert copy_spy.call_count == 1
+        assert os.stat(str(actual[0])).st_ino == os.stat(str(actual[1])).st_ino
+        assert actual_logs == ["COPY_FILE_TO_[.old]", "LINK_FILE_TO_[.old]"]
+
+
 class Test_DestinationRepository_get_all_backups:
     @staticmethod
     def test_GetCurrentDstFiles(
@@ -0,0 +1,130 @@
+import math
+import os
+from os import sep
+
+from autobackup import filetable, fsutil
+
+
+class Test_FileTable:
+    @staticmethod
+    def test_RowsHoldSameValuesAsFoundFile(testdata_fresh):
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        files = list(
+            fsutil.RecursiveScanDir().recursive_scandir(
+                target_root, False, dst_dir_name=".old"
+            )
+        )
+
+        # Act
+        table = filetable.FileTable.from_files(files)
+
+        # Assert
+        assert len(table) == len(files)
+        assert table.keys(range(len(table))) == [file.normpath_str for file in files]
+        for row, file in enumerate(files):
+            assert table.path(row) == str(file)
+            assert table.relpath(row) == file.relpath_str
+            assert table.root(row) == file.scan_root_str
+            assert table.sizes[row] == file.size
+            assert table.mtimes[row] == file.mtime
+            assert bool(table.flags[row] & filetable.FLAG_IN_DST_DIR) == bool(
+                file.in_dst_dir
+            )
+
+    @staticmethod
+    def test_DirectoriesAreInterned(testdata_fresh):
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        files = list(fsutil.RecursiveScanDir().recursive_scandir(target_root, False))
+
+        # Act
+        table = filetable.FileTable.from_files(files)
+
+        # Assert
+        assert len(table.dir_paths) == len(set(file.parent_str for file in files))
+        assert len(table.roots) == 1
+
+    @staticmethod
+    def test_rows_with_flag_ReturnRowsInDstDir(testdata_fresh):
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        table = filetable.FileTable.from_files(
+            fsutil.RecursiveScanDir().recursive_scandir(
+                target_root, False, dst_dir_name=".old"
+            )
+        )
+
+        # Act
+        actual = [
+            table.relpath(row)
+            for row in table.rows_with_flag(filetable.FLAG_IN_DST_DIR)
+        ]
+
+        # Assert
+        assert all(sep + ".old" + sep in sep + relpath for relpath in actual)
+        assert len(actual) == len(table) - len(
+            table.rows_with_flag(filetable.FLAG_IN_DST_DIR, False)
+        )
+
+    @staticmethod
+    def test_file_ReturnFoundFileWithCapturedStatus(testdata):
+        # Arrange
+        target_root = testdata(__name__)
+        file = next(
+            iter(fsutil.RecursiveScanDir().recursive_scandir(target_root, False))
+        )
+        table = filetable.FileTable.from_files([file])
+        os.utime(str(file), (0, 0))
+
+        # Act
+        actual = table.file(0)
+
+        # Assert
+        assert actual == file
+        assert actual.mtime == table.mtimes[0]
+        assert actual.size == table.sizes[0]
+        assert (actual.inode, actual.device, actual.ctime) == (
+            file.inode,
+            file.device,
+            file.ctime,
+        )
+
+    @staticmethod
+    def test_file_ReturnModeAndLinkCount(testdir):
+        import stat
+
+        # Arrange
+        target_root = testdir(__name__)
+        filepath = os.path.join(target_root, "file")
+        with open(filepath, "w") as fp:
+            fp.write("linked")
+        os.link(filepath, os.path.join(target_root, "link"))
+        file = next(
+            iter(fsutil.RecursiveScanDir().recursive_scandir(target_root, False))
+        )
+        table = filetable.FileTable.from_files([file])
+
+        # Act
+        actual = table.file(0).stat()
+
+        # Assert
+        assert stat.S_ISREG(actual.st_mode)
+        assert actual.st_mode == os.stat(filepath).st_mode
+        assert actual.st_nlink == 2
+
+    @staticmethod
+    def test_IfStatFailsThenRowHasStatErrorFlag(testdir):
+        # Arrange
+        target_root = testdir(__name__)
+        link_path = os.path.join(target_root, "broken_link")
+        os.symlink(os.path.join(target_root, "missing"), link_path)
+        file = fsutil.FoundFile(link_path, target_root)
+
+        # Act
+        table = filetable.FileTable.from_files([file])
+
+        # Assert
+        assert table.flags[0] & filetable.FLAG_STAT_ERROR
+        assert table.flags[0] & filetable.FLAG_SYMLINK
+        assert math.isnan(table.mtimes[0])
@@ -181,3 +181,490 @@ class Test_FoundFile:
         actual = os.path.abspath(found_file)
 
         assert actual == os.path.abspath(build_path("/Path/To/", file="File.ext"))
+
+
+    @staticmethod
+    def test_HasNoInstanceDict():
+        found_file = fsutil.FoundFile("/Path/To/File.ext", "/Path")
+
+        actual = hasattr(found_file, "__dict__")
+
+        assert actual == False
+
+    @staticmethod
+    def test_IfFoundByScanThenEqualToFoundFileCreatedFromPath(testdata):
+        import os
+
+        target_root = testdata(__name__)
+        r_scanner = fsutil.RecursiveScanDir()
+
+        actual = [file for file in r_scanner.recursive_scandir(target_root)]
+
+        for file in actual:
+            expected = fsutil.FoundFile(
+                os.path.join(target_root, file.relpath_str), target_root
+            )
+            assert file == expected
+            assert str(file) == str(expected)
+            assert file.normpath_str == expected.normpath_str
+            assert file.parent == expected.parent
+
+
+class Test_RecursiveScanDir_recursive_scandir:
+    @staticmethod
+    def test_GetAllFilesUnderTargetDir(testdata):
+        # Arrange
+        target_root = testdata(__name__)
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act
+        actual = [str(file.relpath) for file in r_scanner.recursive_scandir(target_root)]
+
+        # Assert
+        assert set(actual) == set(
+            [
+                "TestFile",
+                "TestDir1" + sep + "TestFile11",
+                "TestDir1" + sep + "TestFile12.ext",
+                "TestDir2" + sep + ".TestFile21",
+                "TestDir2" + sep + "TestFile22",
+            ]
+        )
+
+    @staticmethod
+    def test_IfSymlinkFileThenNotRaiseScanLoopError(testdata):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__)
+        try:
+            os.symlink(
+                os.path.join(target_root, "TestFile"),
+                os.path.join(target_root, "TestDir1", "LinkFile"),
+            )
+        except OSError:
+            pytest.skip("symbolic link is not available")
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act
+        actual = [str(file.relpath) for file in r_scanner.recursive_scandir(target_root)]
+
+        # Assert
+        assert "TestDir1" + sep + "LinkFile" in actual
+
+    @staticmethod
+    def test_IfSymlinkLoopThenRaiseScanLoopError(testdata):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__)
+        try:
+            os.symlink(
+                os.path.abspath(target_root),
+                os.path.join(target_root, "TestDir1", "LinkDir"),
+                target_is_directory=True,
+            )
+        except OSError:
+            pytest.skip("symbolic link is not available")
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act & Assert
+        with pytest.raises(fsutil.ScanLoopError):
+            for _ in r_scanner.recursive_scandir(target_root, True):
+                pass
+
+    @staticmethod
+    def test_IfSymlinkLoopAndNotScanSymlinkDirThenNotRaiseScanLoopError(testdata):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__)
+        try:
+            os.symlink(
+                os.path.abspath(target_root),
+                os.path.join(target_root, "TestDir1", "LinkDir"),
+                target_is_directory=True,
+            )
+        except OSError:
+            pytest.skip("symbolic link is not available")
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act
+        actual = [
+            str(file.relpath) for file in r_scanner.recursive_scandir(target_root, False)
+        ]
+
+        # Assert
+        assert len(actual) == 5
+
+
+    @staticmethod
+    def test_IfTreeIsDeeperThanRecursionLimitThenGetAllFiles(testdir):
+        import os
+        import sys
+
+        # Arrange
+        target_root = testdir(__name__)
+        dirpath = target_root
+        for _ in range(150):
+            dirpath = os.path.join(dirpath, "d")
+            os.mkdir(dirpath)
+        open(os.path.join(dirpath, "DeepFile"), "wb").close()
+        r_scanner = fsutil.RecursiveScanDir()
+        recursion_limit = sys.getrecursionlimit()
+
+        # Act
+        sys.setrecursionlimit(100)
+        try:
+            actual = [file.name for file in r_scanner.recursive_scandir(target_root)]
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+        # Assert
+        assert actual == ["DeepFile"]
+
+    @staticmethod
+    def test_IfExcludeDirsThenNotListExcludedDirs(mocker, testdir):
+        import os
+
+        # Arrange
+        target_root = testdir(__name__)
+        for dirname in ["keep", os.path.join("keep", "node_modules"), "node_modules"]:
+            os.mkdir(os.path.join(target_root, dirname))
+            open(os.path.join(target_root, dirname, "File"), "wb").close()
+        r_scanner = fsutil.RecursiveScanDir()
+        scandir_spy = mocker.spy(fsutil.os, "scandir")
+
+        # Act
+        actual = [
+            str(file.relpath)
+            for file in r_scanner.recursive_scandir(
+                target_root, exclude_dirs=["node_modules"]
+            )
+        ]
+
+        # Assert
+        assert actual == [os.path.join("keep", "File")]
+        assert [str(call.args[0]) for call in scandir_spy.call_args_list] == [
+            target_root,
+            os.path.join(target_root, "keep"),
+        ]
+
+    @staticmethod
+    def test_IfPruneRegexThenNotListMatchedDirs(testdir):
+        import os
+
+        # Arrange
+        target_root = testdir(__name__)
+        for dirname in ["a", os.path.join("a", "cache"), "cache"]:
+            os.mkdir(os.path.join(target_root, dirname))
+            open(os.path.join(target_root, dirname, "File"), "wb").close()
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act
+        actual = [
+            str(file.relpath)
+            for file in r_scanner.recursive_scandir(
+                target_root, prune_regex=r"a[\\/]cache"
+            )
+        ]
+
+        # Assert
+        assert set(actual) == set(
+            [os.path.join("a", "File"), os.path.join("cache", "File")]
+        )
+
+    @staticmethod
+    def test_IfOneFileSystemThenNotDescendIntoMountPoints(mocker, testdir):
+        import os
+
+        # Arrange
+        target_root = testdir(__name__)
+        for dirname in ["a", "mnt", os.path.join("mnt", "b")]:
+            os.mkdir(os.path.join(target_root, dirname))
+            open(os.path.join(target_root, dirname, "File"), "wb").close()
+        get_dir_identity = fsutil._get_dir_identity
+
+        def _fake_identity(directory):
+            # "mnt" and below are on another file system.
+            dev, ino = get_dir_identity(directory)
+            path = directory.path if isinstance(directory, os.DirEntry) else directory
+            return (dev + 1, ino) if os.sep + "mnt" in path else (dev, ino)
+
+        mocker.patch("autobackup.fsutil._get_dir_identity", new=_fake_identity)
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act
+        actual = [
+            str(file.relpath)
+            for file in r_scanner.recursive_scandir(target_root, one_file_system=True)
+        ]
+
+        # Assert
+        assert set(actual) == set([os.path.join("a", "File")])
+        assert r_scanner.skipped_mounts == [os.path.join(target_root, "mnt")]
+
+    @staticmethod
+    def test_IfInodeOrderThenListFilesInOrderOfInode(testdir):
+        import os
+
+        # Arrange
+        target_root = testdir(__name__)
+        for i in range(20):
+            open(os.path.join(target_root, f"File{i}"), "wb").close()
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act
+        actual = [
+            file.inode
+            for file in r_scanner.recursive_scandir(target_root, inode_order=True)
+        ]
+
+        # Assert
+        assert actual == sorted(actual)
+
+    @staticmethod
+    def test_IfIgnoreFilesThenPruneIgnoredDirsAndFilterFiles(mocker, testdir):
+        import os
+        from autobackup import ignorefile
+
+        # Arrange
+        target_root = testdir(__name__)
+        for dirname in ["build", "sub", os.path.join("sub", ".old")]:
+            os.mkdir(os.path.join(target_root, dirname))
+        for filepath in [
+            "a.txt",
+            "a.log",
+            os.path.join("build", "b.txt"),
+            os.path.join("sub", "c.log"),
+            os.path.join("sub", "d.log"),
+            os.path.join("sub", ".old", "d_2023-01-23.log"),
+        ]:
+            open(os.path.join(target_root, filepath), "wb").close()
+        with open(os.path.join(target_root, ".autobackupignore"), "w") as fp:
+            fp.write("build/\n*.log\n")
+        with open(os.path.join(target_root, "sub", ".autobackupignore"), "w") as fp:
+            fp.write("!d.log\n")
+        r_scanner = fsutil.RecursiveScanDir()
+        scandir_spy = mocker.spy(fsutil.os, "scandir")
+
+        # Act
+        actual = [
+            str(file.relpath)
+            for file in r_scanner.recursive_scandir(
+                target_root,
+                ignore_files=ignorefile.IgnoreFiles(".autobackupignore"),
+                dst_dir_name=".old",
+            )
+        ]
+
+        # Assert
+        assert set(actual) == set(
+            [
+                "a.txt",
+                ".autobackupignore",
+                os.path.join("sub", ".autobackupignore"),
+                os.path.join("sub", "d.log"),
+                os.path.join("sub", ".old", "d_2023-01-23.log"),
+            ]
+        )
+        assert not os.path.join(target_root, "build") in [
+            str(call.args[0]) for call in scandir_spy.call_args_list
+        ]
+
+
+class Test_RecursiveScanDir_parallel_scandir:
+    @staticmethod
+    def test_GetSameFilesAsRecursiveScandir(testdata_fresh):
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        r_scanner = fsutil.RecursiveScanDir()
+        expected = [file for file in r_scanner.recursive_scandir(target_root)]
+
+        # Act
+        actual = [file for file in r_scanner.parallel_scandir(target_root, False, 4)]
+
+        # Assert
+        assert len(actual) == len(expected)
+        assert set(actual) == set(expected)
+
+    @staticmethod
+    def test_IfSymlinkLoopThenRaiseScanLoopError(testdata):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__)
+        try:
+            os.symlink(
+                os.path.abspath(target_root),
+                os.path.join(target_root, "TestDir1", "LinkDir"),
+                target_is_directory=True,
+            )
+        except OSError:
+            pytest.skip("symbolic link is not available")
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act & Assert
+        with pytest.raises(fsutil.ScanLoopError):
+            for _ in r_scanner.parallel_scandir(target_root, True, 4):
+                pass
+
+    @staticmethod
+    def test_IfExcludeDirsThenNotListExcludedDirs(testdir):
+        import os
+
+        # Arrange
+        target_root = testdir(__name__)
+        for dirname in ["keep", os.path.join("keep", ".git"), ".git"]:
+            os.mkdir(os.path.join(target_root, dirname))
+            open(os.path.join(target_root, dirname, "File"), "wb").close()
+        r_scanner = fsutil.RecursiveScanDir()
+
+        # Act
+        actual = [
+            str(file.relpath)
+            for file in r_scanner.parallel_scandir(
+                target_root, False, 4, exclude_dirs=[".git"]
+            )
+        ]
+
+        # Assert
+        assert actual == [os.path.join("keep", "File")]
+
+    @staticmethod
+    def test_IfHotspotsThenRecordEachListedDir(testdir):
+        import os
+        from autobackup import hotspot
+
+        # Arrange
+        target_root = testdir(__name__)
+        for dirname in ["small", "large"]:
+            os.mkdir(os.path.join(target_root, dirname))
+        for i in range(5):
+            open(os.path.join(target_root, "large", f"File{i}"), "wb").close()
+        r_scanner = fsutil.RecursiveScanDir()
+        recorder = hotspot.HotspotRecorder(10)
+
+        # Act
+        for _ in r_scanner.parallel_scandir(target_root, False, 4, hotspots=recorder):
+            pass
+
+        # Assert
+        assert recorder.dirs == 3
+        assert [
+            (dir_stat.path, dir_stat.entries) for dir_stat in recorder.largest()
+        ] == [
+            (os.path.join(target_root, "large"), 5),
+            (target_root, 2),
+            (os.path.join(target_root, "small"), 0),
+        ]
+
+
+class Test_FoundFile_stat:
+    @staticmethod
+    def test_IfDirEntryIsPassedThenCaptureStat(testdata, testdata_timestamp):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__)
+        (entry,) = [
+            item for item in os.scandir(target_root) if item.name == "TestFile"
+        ]
+        found_file = fsutil.FoundFile(entry.path, target_root, entry)
+        os.utime(entry.path, (0.0, 0.0))
+
+        # Act
+        actual1 = found_file.mtime
+        actual2 = found_file.size
+        actual3 = found_file.is_symlink()
+
+        # Assert
+        assert actual1 == testdata_timestamp
+        assert actual2 == 0
+        assert actual3 == False
+
+    @staticmethod
+    def test_IfRefreshThenReadCurrentStat(testdata):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__)
+        (entry,) = [
+            item for item in os.scandir(target_root) if item.name == "TestFile"
+        ]
+        found_file = fsutil.FoundFile(entry.path, target_root, entry)
+        os.utime(entry.path, (0.0, 0.0))
+
+        # Act
+        found_file.refresh()
+        actual = found_file.mtime
+
+        # Assert
+        assert actual == 0.0
+
+    @staticmethod
+    def test_IfDirEntryIsNotPassedThenReadStatOnAccess(testdata, testdata_timestamp):
+        import os
+
+        # Arrange
+        target_root = testdata(__name__)
+        found_file = fsutil.FoundFile(os.path.join(target_root, "TestFile"))
+
+        # Act
+        actual1 = found_file.mtime
+        actual2 = found_file.inode
+
+        # Assert
+        assert actual1 == testdata_timestamp
+        assert actual2 == os.stat(os.path.join(target_root, "TestFile")).st_ino
+
+
+class Test_get_physical_offset:
+    @staticmethod
+    def test_IfFileIsEmptyThenReturnNone(testdir):
+        import os
+
+        # Arrange
+        target_root = testdir(__name__)
+        filepath = os.path.join(target_root, "Empty")
+        open(filepath, "wb").close()
+
+        # Act
+        actual = fsutil.get_physical_offset(filepath)
+
+        # Assert
+        assert actual is None
+
+    @staticmethod
+    def test_IfFileDoesNotExistThenReturnNone(testdir):
+        import os
+
+        # Arrange
+        target_root = testdir(__name__)
+
+        # Act
+        actual = fsutil.get_physical_offset(os.path.join(target_root, "NotFound"))
+
+        # Assert
+        assert actual is None
+
+
+class Test_get_content_digest:
+    @staticmethod
+    def test_IfContentIsSameThenReturnSameDigest(testdir):
+        import os
+
+        # Arrange
+        target_root = testdir(__name__)
+        filepaths = [os.path.join(target_root, name) for name in ("A", "B", "C")]
+        for filepath, content in zip(filepaths, (b"same", b"same", b"other")):
+            with open(filepath, "wb") as fp:
+                fp.write(content)
+
+        # Act
+        actual = [fsutil.get_content_digest(filepath) for filepath in filepaths]
+
+        # Assert
+        assert len(actual[0]) == 32
+        assert actual[0] == actual[1]
+        assert actual[0] != actual[2]
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+
+from autobackup import hotspot
+
+
+def _recorder(*dir_stats: tuple) -> hotspot.HotspotRecorder:
+    recorder = hotspot.HotspotRecorder(2)
+    for dir_stat in dir_stats:
+        recorder.add(*dir_stat)
+    return recorder
+
+
+class Test_HotspotRecorder:
+    @staticmethod
+    def test_KeepOnlyTopNOfEachKind():
+        # Arrange
+        recorder = _recorder(
+            ("/a", 0.1, 0.0, 10),
+            ("/b", 0.5, 0.5, 1),
+            ("/c", 0.2, 0.1, 30),
+            ("/d", 0.0, 0.0, 20),
+        )
+
+        # Act
+        actual = (
+            [dir_stat.path for dir_stat in recorder.slowest()],
+            [dir_stat.path for dir_stat in recorder.largest()],
+        )
+
+        # Assert
+        assert actual == (["/b", "/c"], ["/c", "/d"])
+        assert recorder.dirs == 4
+
+
+class Test_HotspotRepository:
+    @staticmethod
+    def test_save_run_IfRunsExceedMaxRunsThenRemoveOldestRun():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        h_repo = hotspot.HotspotRepository(dbconn, 2)
+        run_ids = [
+            h_repo.save_run(_recorder(("/a", float(i), 0.0, i)), float(i))
+            for i in range(3)
+        ]
+
+        # Act
+        actual = h_repo.get_run_ids(10)
+
+        # Assert
+        assert actual == run_ids[1:]
+        assert h_repo.get_trend("/a", run_ids) == [
+            None,
+            hotspot.DirStat("/a", 1.0, 0.0, 1),
+            hotspot.DirStat("/a", 2.0, 0.0, 2),
+        ]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "by_entries, expected",
+        [(False, ["/b", "/a"]), (True, ["/a", "/b"])],
+    )
+    def test_get_hotspots_ReturnDirsOfRunInOrder(by_entries, expected):
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        h_repo = hotspot.HotspotRepository(dbconn)
+        run_id = h_repo.save_run(_recorder(("/a", 0.1, 0.0, 10), ("/b", 0.2, 0.3, 1)))
+
+        # Act
+        actual = [
+            dir_stat.path for dir_stat in h_repo.get_hotspots(run_id, 10, by_entries)
+        ]
+
+        # Assert
+        assert actual == expected
+
+    @staticmethod
+    def test_format_report_ShowTrendOfEachHotspot():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        h_repo = hotspot.HotspotRepository(dbconn)
+        h_repo.save_run(_recorder(("/b", 0.5, 0.0, 1)))
+        h_repo.save_run(_recorder(("/a", 0.25, 0.0, 3), ("/b", 1.0, 0.0, 2)))
+
+        # Act
+        actual = h_repo.format_report(1)
+
+        # Assert
+        assert actual[1].endswith("/b")
+        assert actual[2] == "      trend: 0.500 1.000"
+        assert actual[4].endswith("/a")
+        assert actual[5] == "      trend: - 3"
+
+    @staticmethod
+    def test_format_report_IfNoRunThenReturnMessage():
+        # Arrange
+        h_repo = hotspot.HotspotRepository(sqlite3.connect(":memory:"))
+
+        # Act
+        actual = h_repo.format_report()
+
+        # Assert
+        assert actual == ["No scan has been recorded yet."]
@@ -0,0 +1,147 @@
+import os
+
+import pytest
+
+from autobackup import ignorefile
+
+
+def _matcher(*lines: str) -> ignorefile.IgnoreMatcher:
+    return ignorefile.IgnoreMatcher(ignorefile.parse_ignore_lines(lines))
+
+
+class Test_IgnoreMatcher_match:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "line, relpath, is_dir, expected",
+        [
+            ("*.log", "a.log", False, True),
+            ("*.log", "sub/dir/a.log", False, True),
+            ("*.log", "a.txt", False, None),
+            ("/a.log", "a.log", False, True),
+            ("/a.log", "sub/a.log", False, None),
+            ("sub/*.log", "sub/a.log", False, True),
+            ("sub/*.log", "x/sub/a.log", False, None),
+            ("build/", "build", True, True),
+            ("build/", "build", False, None),
+            ("**/cache", "a/b/cache", True, True),
+            ("a/**/b", "a/b", False, True),
+            ("a/**/b", "a/x/y/b", False, True),
+            ("a/**", "a/x/y", False, True),
+            ("a/**", "a", True, None),
+            ("file?.txt", "file1.txt", False, True),
+            ("file?.txt", "file/.txt", False, None),
+            ("file[0-9].txt", "file5.txt", False, True),
+            ("file[!0-9].txt", "file5.txt", False, None),
+            ("\\#notcomment", "#notcomment", False, True),
+            ("# comment", "# comment", False, None),
+        ],
+    )
+    def test_MatchWithGitignoreSemantics(line, relpath, is_dir, expected):
+        # Arrange
+        matcher = _matcher(line)
+
+        # Act
+        actual = matcher.match(relpath, is_dir)
+
+        # Assert
+        assert actual == expected
+
+    @staticmethod
+    def test_LastMatchingPatternDecides():
+        # Arrange
+        matcher = _matcher("*.log", "!keep.log")
+
+        # Act
+        actual = [matcher.match("a.log", False), matcher.match("keep.log", False)]
+
+        # Assert
+        assert actual == [True, False]
+
+    @staticmethod
+    def test_IfPatternIsMalformedThenSkipIt(caplog):
+        # Arrange
+        matcher = _matcher("*.log", "[z-a]", "[\\]x")
+
+        # Act
+        actual = [matcher.match("a.log", False), matcher.match("z", False)]
+
+        # Assert
+        assert actual == [True, None]
+        assert (
+            len([r for r in caplog.records if r.message.startswith("IGNORE_RULE")])
+            == 2
+        )
+
+
+class Test_is_ignored:
+    @staticmethod
+    def test_DeeperIgnoreFileTakesPrecedence():
+        # Arrange
+        chain = (("", _matcher("*.log")), ("sub", _matcher("!*.log")))
+
+        # Act
+        actual = [
+            ignorefile.is_ignored(chain, "a.log", False),
+            ignorefile.is_ignored(chain, os.path.join("sub", "a.log"), False),
+        ]
+
+        # Assert
+        assert actual == [True, False]
+
+
+class Test_IgnoreFiles:
+    @staticmethod
+    def test_IfIgnoreFileIsUnchangedThenUseCacheOfPreviousRun(mocker, testdir):
+        # Arrange
+        target_root = testdir(__name__)
+        with open(os.path.join(target_root, ".autobackupignore"), "w") as fp:
+            fp.write("*.log\n")
+        cache_filepath = os.path.join(target_root, "ignorecache.json")
+        ignore_files = ignorefile.IgnoreFiles(".autobackupignore", cache_filepath)
+        ignore_files.get_matcher(target_root)
+        ignore_files.save()
+        parse_spy = mocker.spy(ignorefile, "parse_ignore_lines")
+
+        # Act
+        actual = ignorefile.IgnoreFiles(".autobackupignore", cache_filepath)
+
+        # Assert
+        assert actual.get_matcher(target_root).match("a.log", False) is True
+        assert parse_spy.call_count == 0
+
+    @staticmethod
+    def test_IfIgnoreFileIsChangedThenParseAgain(testdir):
+        # Arrange
+        target_root = testdir(__name__)
+        ignore_filepath = os.path.join(target_root, ".autobackupignore")
+        with open(ignore_filepath, "w") as fp:
+            fp.write("*.log\n")
+        ignore_files = ignorefile.IgnoreFiles(".autobackupignore")
+        ignore_files.get_matcher(target_root)
+        with open(ignore_filepath, "w") as fp:
+            fp.write("*.tmp\n")
+        os.utime(ignore_filepath, ns=(0, 0))
+
+        # Act
+        actual = ignore_files.get_matcher(target_root)
+
+        # Assert
+        assert actual.match("a.log", False) is None
+        assert actual.match("a.tmp", False) is True
+
+    @staticmethod
+    def test_is_ignored_IfParentDirIsIgnoredThenReturnTrue(testdir):
+        # Arrange
+        target_root = testdir(__name__)
+        with open(os.path.join(target_root, ".autobackupignore"), "w") as fp:
+            fp.write("build/\n")
+        ignore_files = ignorefile.IgnoreFiles(".autobackupignore")
+
+        # Act
+        actual = [
+            ignore_files.is_ignored(target_root, os.path.join("build", "a.txt")),
+            ignore_files.is_ignored(target_root, os.path.join("src", "a.txt")),
+        ]
+
+        # Assert
+        assert actual == [True, False]
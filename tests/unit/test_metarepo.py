@@ -7,6 +7,150 @@ from logging import DEBUG, ERROR, INFO, WARNING
 from autobackup import metarepo
 
 
+class Test_MetadataRepository_migrate:
+    @staticmethod
+    def test_IfLegacyDbThenMigrateKeepingData(caplog):
+        # Arrange
+        caplog.set_level(INFO)
+        dbconn = sqlite3.connect(":memory:")
+        dbconn.execute(
+            f"CREATE TABLE {metarepo._TABLE_NAME}"
+            f"({metarepo._PATH_COL_NAME} TEXT PRIMARY KEY, {metarepo._MTIME_COL_NAME} REAL)"
+        )
+        dbconn.execute(f"INSERT INTO {metarepo._TABLE_NAME} VALUES('/a', 1.0)")
+        dbconn.commit()
+
+        # Act
+        m_repo = metarepo.MetadataRepository(dbconn)
+
+        # Assert
+        assert list(m_repo.get_all_metadatas()) == [metarepo.Metadata("/a", 1.0)]
+        assert dbconn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = ?", (metarepo._TABLE_NAME,)
+        ).fetchone()[0].endswith("WITHOUT ROWID")
+        assert dbconn.execute(
+            f"SELECT version FROM {metarepo._SCHEMA_TABLE_NAME}"
+        ).fetchall() == [(metarepo.SCHEMA_VERSION,)]
+        assert dbconn.execute("PRAGMA auto_vacuum").fetchone() == (2,)
+        assert caplog.record_tuples == [
+            (
+                "autobackup.metarepo",
+                INFO,
+                f"MIGRATE_DB: schema version 0 to {metarepo.SCHEMA_VERSION}",
+            )
+        ]
+
+    @staticmethod
+    def test_IfHotspotTablesWereCreatedAdHocThenMigrateKeepingData():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        cur = dbconn.cursor()
+        for migration in metarepo._MIGRATIONS[:4]:
+            migration(cur)
+        # Tables created by HotspotRepository itself before the version 5
+        cur.execute(
+            "CREATE TABLE scanrun"
+            "(run_id INTEGER PRIMARY KEY AUTOINCREMENT, started REAL, dirs INTEGER)"
+        )
+        cur.execute("INSERT INTO scanrun(started, dirs) VALUES(1.0, 2)")
+        cur.execute(f"CREATE TABLE {metarepo._SCHEMA_TABLE_NAME}(version INTEGER)")
+        cur.execute(f"INSERT INTO {metarepo._SCHEMA_TABLE_NAME} VALUES(4)")
+        dbconn.commit()
+
+        # Act
+        metarepo.migrate_db(dbconn)
+
+        # Assert
+        assert dbconn.execute("SELECT started, dirs FROM scanrun").fetchall() == [
+            (1.0, 2)
+        ]
+        assert dbconn.execute("SELECT COUNT(*) FROM hotspot").fetchone() == (0,)
+        assert dbconn.execute(
+            f"SELECT version FROM {metarepo._SCHEMA_TABLE_NAME}"
+        ).fetchall() == [(metarepo.SCHEMA_VERSION,)]
+
+    @staticmethod
+    def test_IfDigestWasCachedWithoutCtimeThenDoNotUseIt():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        cur = dbconn.cursor()
+        for migration in metarepo._MIGRATIONS[:5]:
+            migration(cur)
+        # Digest cached by the version 5, keyed without ctime
+        cur.execute(
+            f"INSERT INTO {metarepo._HASH_CACHE_TABLE_NAME} VALUES(2, 1, 100, 10.0, ?)",
+            (b"digest",),
+        )
+        cur.execute(f"CREATE TABLE {metarepo._SCHEMA_TABLE_NAME}(version INTEGER)")
+        cur.execute(f"INSERT INTO {metarepo._SCHEMA_TABLE_NAME} VALUES(5)")
+        dbconn.commit()
+
+        # Act
+        m_repo = metarepo.MetadataRepository(dbconn)
+
+        # Assert
+        mdata = metarepo.Metadata("/file", 10.0, 100, 1, 2, 20.0)
+        assert m_repo.get_cached_digest(mdata) is None
+        m_repo.cache_digest(mdata, b"new")
+        assert m_repo.get_cached_digest(mdata) == b"new"
+
+    @staticmethod
+    def test_IfNewerSchemaThenRaiseException():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        metarepo.MetadataRepository(dbconn)
+        dbconn.execute(
+            f"UPDATE {metarepo._SCHEMA_TABLE_NAME} SET version = ?",
+            (metarepo.SCHEMA_VERSION + 1,),
+        )
+        dbconn.commit()
+
+        # Act
+        with pytest.raises(sqlite3.DatabaseError) as db_error:
+            metarepo.MetadataRepository(dbconn)
+
+        # Assert
+        assert not db_error is None
+
+
+class Test_MetadataRepository_incremental_vacuum:
+    @staticmethod
+    def test_IfManyPagesAreFreeThenShrinkDb():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        m_repo = metarepo.MetadataRepository(dbconn)
+        m_repo.update_metadatas(
+            [metarepo.Metadata(f"/path/to/file{i}", 0.0) for i in range(10000)]
+        )
+        m_repo.load_scanned([])
+        m_repo.remove_unscanned()
+        pages = dbconn.execute("PRAGMA page_count").fetchone()[0]
+
+        # Act
+        actual = m_repo.incremental_vacuum()
+
+        # Assert
+        assert actual > 0
+        assert dbconn.execute("PRAGMA freelist_count").fetchone() == (0,)
+        assert dbconn.execute("PRAGMA page_count").fetchone()[0] == pages - actual
+
+    @staticmethod
+    def test_IfFewPagesAreFreeThenDoNothing():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        m_repo = metarepo.MetadataRepository(dbconn)
+        m_repo.update_metadatas(
+            [metarepo.Metadata(f"/path/to/file{i}", 0.0) for i in range(10000)]
+        )
+        m_repo.remove_metadata("/path/to/file0")
+
+        # Act
+        actual = m_repo.incremental_vacuum()
+
+        # Assert
+        assert actual == 0
+
+
 class Test_MetadataRepository_get_all_metadatas:
     @staticmethod
     def test_ReturnCurrentRecordsInDB():
@@ -74,6 +218,33 @@ class Test_MetadataRepository_get_metadata:
         assert actual == None
 
 
+class Test_MetadataRepository_get_metadatas:
+    @staticmethod
+    def test_ReturnContainedMetadataOfKeys():
+        # Arrange
+        m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+        m_repo.update_metadatas(
+            [
+                metarepo.Metadata("/path/to/file1.ext", 1.0, 10),
+                metarepo.Metadata("/path/to/file2.ext", 2.0, 20),
+                metarepo.Metadata("/path/to/file3.ext", 3.0, 30),
+            ]
+        )
+
+        # Act
+        actual = m_repo.get_metadatas(
+            ["/path/to/file1.ext", "/path/to/file3.ext", "/path/to/file4.ext"]
+        )
+
+        # Assert
+        assert set(actual) == set(
+            [
+                metarepo.Metadata("/path/to/file1.ext", 1.0, 10),
+                metarepo.Metadata("/path/to/file3.ext", 3.0, 30),
+            ]
+        )
+        assert m_repo.get_metadatas([]) == []
+
 class Test_MetadataRepository_remove_metadatas:
     @staticmethod
     def test_RemoveRecords(caplog):
@@ -190,3 +361,235 @@ class Test_MetadataRepository_update_metadata:
             assert actual_module == expected_module
             assert actual_level == expected_level
             assert actual_message.startswith(expected_message)
+
+
+class Test_MetadataBatchWriter:
+    @staticmethod
+    def test_add_CommitPerBatchSize():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        m_repo = metarepo.MetadataRepository(dbconn)
+        m_writer = metarepo.MetadataBatchWriter(m_repo, 2, 0.0)
+
+        # Act
+        m_writer.add(metarepo.Metadata("/a", 1.0))
+        actual1 = (dbconn.in_transaction, m_repo.get_metadata("/a"))
+        m_writer.add(metarepo.Metadata("/b", 2.0))
+        actual2 = (dbconn.in_transaction, m_repo.get_metadata("/a"))
+
+        # Assert
+        assert actual1 == (False, None)
+        assert actual2 == (False, metarepo.Metadata("/a", 1.0))
+        assert m_repo.get_metadata("/b") == metarepo.Metadata("/b", 2.0)
+
+    @staticmethod
+    def test_add_IfBatchSecElapsedThenCommit(mocker):
+        # Arrange
+        mocker.patch("time.monotonic", side_effect=[0.0, 1.0, 5.0])
+        m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+        m_writer = metarepo.MetadataBatchWriter(m_repo, 100, 5.0)
+
+        # Act
+        m_writer.add(metarepo.Metadata("/a", 1.0))
+        actual = m_repo.get_metadata("/a")
+        m_writer.add(metarepo.Metadata("/b", 2.0))
+
+        # Assert
+        assert actual is None
+        assert len(list(m_repo.get_all_metadatas())) == 2
+
+    @staticmethod
+    def test_exit_IfInterruptedThenCommitPendingRecords():
+        # Arrange
+        dbconn = sqlite3.connect(":memory:")
+        m_repo = metarepo.MetadataRepository(dbconn)
+
+        # Act
+        with pytest.raises(KeyboardInterrupt):
+            with metarepo.MetadataBatchWriter(m_repo, 100, 0.0) as m_writer:
+                m_writer.add(metarepo.Metadata("/a", 1.0))
+                m_writer.add(metarepo.Metadata("/b", 2.0))
+                raise KeyboardInterrupt()
+
+        # Assert
+        assert not dbconn.in_transaction
+        assert set(m_repo.get_all_metadatas()) == {
+            metarepo.Metadata("/a", 1.0),
+            metarepo.Metadata("/b", 2.0),
+        }
+
+
+class Test_Metadata:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "current, expected",
+        [
+            (metarepo.Metadata("/a", 10.0, 100, 1, 2, 20.0), False),
+            (metarepo.Metadata("/a", 10.0005, 100, 1, 2, 20.0005), False),
+            (metarepo.Metadata("/a", 11.0, 100, 1, 2, 20.0), True),
+            (metarepo.Metadata("/a", 10.0, 101, 1, 2, 20.0), True),
+            (metarepo.Metadata("/a", 10.0, 100, 3, 2, 20.0), True),
+            (metarepo.Metadata("/a", 10.0, 100, 1, 4, 20.0), True),
+            (metarepo.Metadata("/a", 10.0, 100, 1, 2, 21.0), True),
+            (metarepo.Metadata("/a", 10.0, None, None, None, None), False),
+        ],
+    )
+    def test_is_modified_CompareKnownFields(current, expected):
+        # Arrange
+        stored = metarepo.Metadata("/a", 10.0, 100, 1, 2, 20.0)
+
+        # Act
+        actual = stored.is_modified(current, 0.001)
+
+        # Assert
+        assert actual == expected
+
+    @staticmethod
+    def test_is_modified_IfStoredFieldsAreUnknownThenCompareOnlyMtime():
+        # Arrange
+        stored = metarepo.Metadata("/a", 10.0)
+
+        # Act
+        actual = stored.is_modified(
+            metarepo.Metadata("/a", 10.0, 100, 1, 2, 20.0), 0.001
+        )
+
+        # Assert
+        assert actual is False
+        assert stored.has_unknown(metarepo.Metadata("/a", 10.0, 100, 1, 2, 20.0))
+
+
+class Test_MetadataRepository_bulk_diff:
+    @staticmethod
+    def test_get_modified_keys_ReturnNewAndModifiedKeys():
+        # Arrange
+        m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+        m_repo.update_metadata(metarepo.Metadata("/same", 10.0))
+        m_repo.update_metadata(metarepo.Metadata("/modified", 10.0))
+        m_repo.load_scanned(
+            [
+                metarepo.Metadata("/same", 10.0),
+                metarepo.Metadata("/modified", 20.0),
+                metarepo.Metadata("/new", 10.0),
+            ]
+        )
+
+        # Act
+        actual = m_repo.get_modified_keys(0.001)
+
+        # Assert
+        assert set(actual) == set(["/modified", "/new"])
+
+    @staticmethod
+    def test_remove_unscanned_IfKeyIsNotScannedThenRemoveExceptKeptPrefixes():
+        # Arrange
+        m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+        for key in ["/a/scanned", "/a/removed", "/skipped/kept"]:
+            m_repo.update_metadata(metarepo.Metadata(key, 0.0))
+        m_repo.load_scanned([metarepo.Metadata("/a/scanned", 0.0)])
+
+        # Act
+        actual = m_repo.remove_unscanned(("/skipped/",))
+
+        # Assert
+        assert actual == 1
+        assert set(mdata.key for mdata in m_repo.get_all_metadatas()) == set(
+            ["/a/scanned", "/skipped/kept"]
+        )
+
+    @staticmethod
+    def test_get_modified_keys_IfKnownFieldDiffersThenReturnKey():
+        # Arrange
+        m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+        m_repo.update_metadatas(
+            [
+                metarepo.Metadata("/same", 10.0, 100, 1, 2, 20.0),
+                metarepo.Metadata("/size", 10.0, 100, 1, 2, 20.0),
+                metarepo.Metadata("/inode", 10.0, 100, 1, 2, 20.0),
+                metarepo.Metadata("/ctime", 10.0, 100, 1, 2, 20.0),
+                metarepo.Metadata("/unknown", 10.0),
+            ]
+        )
+        m_repo.load_scanned(
+            [
+                metarepo.Metadata("/same", 10.0, 100, 1, 2, 20.0),
+                metarepo.Metadata("/size", 10.0, 101, 1, 2, 20.0),
+                metarepo.Metadata("/inode", 10.0, 100, 3, 2, 20.0),
+                metarepo.Metadata("/ctime", 10.0, 100, 1, 2, 21.0),
+                metarepo.Metadata("/unknown", 10.0, 100, 1, 2, 20.0),
+            ]
+        )
+
+        # Act
+        actual = m_repo.get_modified_keys(0.001)
+
+        # Assert
+        assert set(actual) == set(["/size", "/inode", "/ctime"])
+
+    @staticmethod
+    def test_fill_unknown_FillOnlyUnknownFields():
+        # Arrange
+        m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+        m_repo.update_metadatas(
+            [
+                metarepo.Metadata("/unknown", 10.0),
+                metarepo.Metadata("/known", 10.0, 100, 1, 2, 20.0),
+            ]
+        )
+        m_repo.load_scanned(
+            [
+                metarepo.Metadata("/unknown", 10.0, 100, None, 2, 20.0),
+                metarepo.Metadata("/known", 10.0, 200, 3, 4, 30.0),
+            ]
+        )
+
+        # Act
+        actual = m_repo.fill_unknown()
+
+        # Assert
+        assert actual == 3
+        assert m_repo.get_metadata("/unknown") == metarepo.Metadata(
+            "/unknown", 10.0, 100, None, 2, 20.0
+        )
+        assert m_repo.get_metadata("/known") == metarepo.Metadata(
+            "/known", 10.0, 100, 1, 2, 20.0
+        )
+
+
+class Test_MetadataRepository_hash_cache:
+    @staticmethod
+    def test_get_cached_digest_IfStatusIsSameThenReturnDigest():
+        # Arrange
+        m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+        mdata = metarepo.Metadata("/file", 10.0, 100, 1, 2, 20.0)
+        m_repo.cache_digest(mdata, b"digest")
+
+        # Act
+        actual = [
+            m_repo.get_cached_digest(mdata),
+            m_repo.get_cached_digest(mdata._replace(ctime=30.0)),
+            m_repo.get_cached_digest(mdata._replace(mtime=11.0)),
+            m_repo.get_cached_digest(mdata._replace(size=101)),
+            m_repo.get_cached_digest(mdata._replace(inode=None)),
+        ]
+
+        # Assert
+        assert actual == [b"digest", None, None, None, None]
+
+    @staticmethod
+    def test_prune_hash_cache_IfFileIsNotRecordedThenRemove():
+        # Arrange
+        m_repo = metarepo.MetadataRepository(sqlite3.connect(":memory:"))
+        recorded = metarepo.Metadata("/recorded", 10.0, 100, 1, 2, 20.0)
+        removed = metarepo.Metadata("/removed", 10.0, 100, 3, 2, 20.0)
+        m_repo.update_metadata(recorded)
+        m_repo.cache_digest(recorded, b"recorded")
+        m_repo.cache_digest(removed, b"removed")
+
+        # Act
+        actual = m_repo.prune_hash_cache()
+
+        # Assert
+        assert actual == 1
+        assert m_repo.get_cached_digest(recorded) == b"recorded"
+        assert m_repo.get_cached_digest(removed) is None
@@ -0,0 +1,22 @@
+import sqlite3
+
+from autobackup import repoinit
+
+
+class Test_MetadataRepositoryFactory:
+    @staticmethod
+    def test_ApplySettingsToConnection(testdir):
+        # Arrange
+        testdata_root = testdir(__name__)
+        dbconn = sqlite3.connect(f"{testdata_root}/fileinfo.sqlite3")
+
+        # Act
+        repoinit.MetadataRepositoryFactory(dbconn, "wal", "normal", 1024, 16, "memory")
+
+        # Assert
+        assert dbconn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert dbconn.execute("PRAGMA synchronous").fetchone() == (1,)
+        assert dbconn.execute("PRAGMA cache_size").fetchone() == (-1024,)
+        assert dbconn.execute("PRAGMA mmap_size").fetchone() == (16 * 1024 * 1024,)
+        assert dbconn.execute("PRAGMA temp_store").fetchone() == (2,)
+        dbconn.close()
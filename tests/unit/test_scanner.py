@@ -1,6 +1,7 @@
 import pytest
 import pytest_mock
 import pytest_raises
+from logging import DEBUG
 from os import sep
 
 from autobackup import scanner
@@ -58,3 +59,317 @@ class Test_AllFileScanner_get_all_files:
                 ".old" + sep + "TestFile_2023-01-23_0000",
             ]
         )
+
+    @staticmethod
+    def test_IfScanWorkersIsGreaterThanOneThenGetAllFilesUnderTargetDir(
+        caplog, testdata_fresh
+    ):
+        # Arrange
+        caplog.set_level(DEBUG)
+        target_root = testdata_fresh(__name__)
+        testdir1_path = testpath.src_testdir1_path(target_root, norm_path=False)
+        testdir2_path = testpath.src_testdir2_path(target_root, norm_path=False)
+
+        targets = {testdir1_path: True, testdir2_path: True}
+
+        scnr = scanner.AllFileScanner(targets, False, None, 2)
+
+        # Act
+        actual1 = [str(file.relpath) for key, file in scnr.get_all_files().items()]
+        actual2 = [
+            message
+            for module, _, message in caplog.record_tuples
+            if module == "autobackup.scanner"
+        ]
+
+        # Assert
+        assert set(actual1) == set(
+            [
+                "TestFile11",
+                ".old" + sep + "TestFile11_2023-01-23_0000",
+                "TestFile12.ext",
+                ".old" + sep + "TestFile12_2023-01-23_0000.ext",
+                ".TestFile21",
+                ".old" + sep + ".TestFile21_2023-01-23_0000",
+                "TestFile22",
+                ".old" + sep + "TestFile22_2023-01-23_0000",
+            ]
+        )
+        assert actual2 == [
+            f"SCAN_DIR: (4 files, 2 dirs) {testdir1_path}",
+            f"SCAN_DIR: (4 files, 2 dirs) {testdir2_path}",
+            "SCAN_DIR: total 8 files, 4 dirs",
+        ]
+
+    @staticmethod
+    def test_IfTargetOptionsHasExcludeDirsThenNotGetFilesUnderExcludedDirs(
+        testdata_fresh,
+    ):
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        testdir1_path = testpath.src_testdir1_path(target_root, norm_path=False)
+
+        scnr = scanner.AllFileScanner(
+            {testdir1_path: True},
+            False,
+            None,
+            target_options={testdir1_path: {"exclude_dirs": [".old"]}},
+        )
+
+        # Act
+        actual = [str(file.relpath) for key, file in scnr.get_all_files().items()]
+
+        # Assert
+        assert set(actual) == set(["TestFile11", "TestFile12.ext"])
+
+
+    @staticmethod
+    def test_IfTargetIsNestedThenWalkOuterTargetOnly(mocker, testdata_fresh):
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        outer_path = testpath.src_testdir_path(target_root, norm_path=False)
+        inner_path = testpath.src_testdir1_path(target_root, norm_path=False)
+
+        scnr = scanner.AllFileScanner(
+            {outer_path: True, inner_path: True},
+            False,
+            ".old",
+            nested_targets={inner_path: outer_path},
+        )
+        scan_spy = mocker.spy(scnr, "_scan_target")
+
+        # Act
+        actual = scnr.get_all_files()
+
+        # Assert
+        assert scan_spy.call_count == 1
+        assert len(actual) == 10
+        assert set(file.scan_root_str for file in actual.values()) == set(
+            [testpath.src_testdir_path(target_root)]
+        )
+
+
+    @staticmethod
+    def test_IfOneFileSystemThenReportSkippedMountPoints(
+        mocker, caplog, testdata_fresh
+    ):
+        import os
+
+        # Arrange
+        caplog.set_level(DEBUG)
+        target_root = testdata_fresh(__name__)
+        testdir1_path = os.path.join(target_root, "TestDir1")
+        get_dir_identity = scanner.fsutil._get_dir_identity
+
+        def _fake_identity(directory):
+            dev, ino = get_dir_identity(directory)
+            path = directory.path if isinstance(directory, os.DirEntry) else directory
+            return (dev + 1, ino) if path == testdir1_path else (dev, ino)
+
+        mocker.patch("autobackup.fsutil._get_dir_identity", new=_fake_identity)
+        scnr = scanner.AllFileScanner(
+            {target_root: True},
+            False,
+            ".old",
+            target_options={target_root: {"one_file_system": True}},
+        )
+
+        # Act
+        actual1 = [str(file.relpath) for file in scnr.get_all_files().values()]
+        actual2 = [
+            message
+            for module, _, message in caplog.record_tuples
+            if module == "autobackup.scanner" and "Mount" in message
+        ]
+
+        # Assert
+        assert not any(relpath.startswith("TestDir1") for relpath in actual1)
+        assert actual2 == [
+            f"SKIP_DIR(Mount): {testdir1_path}",
+            "SKIP_DIR(Mount): total 1 mount points",
+        ]
+
+
+    @staticmethod
+    def test_IfScanTimesOutThenSkipOnlyThatTarget(mocker, testdata_fresh):
+        import threading
+        import time
+
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        testdir1_path = testpath.src_testdir1_path(target_root, norm_path=False)
+        testdir2_path = testpath.src_testdir2_path(target_root, norm_path=False)
+        scnr = scanner.AllFileScanner(
+            {testdir1_path: True, testdir2_path: True},
+            False,
+            ".old",
+            scan_timeouts={testdir1_path: 0.1, testdir2_path: 10.0},
+        )
+        hung = threading.Event()
+        walk_target = scnr._walk_target
+
+        def _walk_target(target_path, *args):
+            if target_path == testdir1_path:
+                # Blocked like a walk on a hung mount.
+                hung.wait(10.0)
+            return walk_target(target_path, *args)
+
+        mocker.patch.object(scnr, "_walk_target", side_effect=_walk_target)
+
+        # Act
+        started = time.monotonic()
+        try:
+            actual = [str(file.relpath) for file in scnr.get_all_files().values()]
+        finally:
+            hung.set()
+        elapsed = time.monotonic() - started
+
+        # Assert
+        assert elapsed < 5.0
+        assert scnr.skipped_targets == [testdir1_path]
+        assert set(actual) == set(
+            [
+                ".TestFile21",
+                ".old" + sep + ".TestFile21_2023-01-23_0000",
+                "TestFile22",
+                ".old" + sep + "TestFile22_2023-01-23_0000",
+            ]
+        )
+
+    @staticmethod
+    def test_IfScanTimesOutThenCancelAbandonedWalk(mocker, testdata_fresh):
+        import threading
+
+        from autobackup.hotspot import HotspotRecorder
+
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        testdir1_path = testpath.src_testdir1_path(target_root, norm_path=False)
+        hotspots = HotspotRecorder()
+        scnr = scanner.AllFileScanner(
+            {testdir1_path: True},
+            False,
+            ".old",
+            scan_timeouts={testdir1_path: 0.1},
+            hotspots=hotspots,
+        )
+        hung = threading.Event()
+        walk_target = scnr._walk_target
+
+        def _walk_target(target_path, *args):
+            hung.wait(10.0)
+            return walk_target(target_path, *args)
+
+        mocker.patch.object(scnr, "_walk_target", side_effect=_walk_target)
+
+        # Act
+        actual = scnr.get_all_files()
+        hung.set()
+        for thread in threading.enumerate():
+            if thread.name == f"scan:{testdir1_path}":
+                thread.join(5.0)
+
+        # Assert
+        assert actual == {}
+        assert hotspots.dirs == 0
+
+
+    @staticmethod
+    def test_IfParallelWalkTimesOutThenProcessCanExit(testdata_fresh):
+        import os
+        import subprocess
+        import sys
+
+        # Arrange
+        target_root = testdata_fresh(__name__)
+        hung_path = testpath.src_testdir1_path(target_root)
+        script = """
+import os, sys, threading
+from autobackup import scanner
+
+target_root, hung_path = sys.argv[1:3]
+scandir = os.scandir
+
+def _scandir(path="."):
+    if os.path.normcase(os.path.abspath(path)) == hung_path:
+        # Blocked like a listing on a hung mount, until the process exits.
+        threading.Event().wait()
+    return scandir(path)
+
+os.scandir = _scandir
+scnr = scanner.AllFileScanner(
+    {target_root: True}, False, ".old", walk_workers=2,
+    scan_timeouts={target_root: 0.5},
+)
+scnr.get_all_files()
+print(len(scnr.skipped_targets))
+"""
+
+        # Act
+        actual = subprocess.run(
+            [sys.executable, "-c", script, target_root, hung_path],
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+
+        # Assert
+        assert actual.returncode == 0
+        assert actual.stdout.strip() == "1"
+
+class Test_get_nested_targets:
+    @staticmethod
+    def test_ReturnOutermostTargetWalkingNestedTarget():
+        # Arrange
+        targets = [
+            {"path": "data", "recursive": True},
+            {"path": "data" + sep + "projects", "recursive": True},
+            {"path": "data" + sep + "projects" + sep + "a", "recursive": False},
+            {"path": "flat", "recursive": False},
+            {"path": "flat" + sep + "sub", "recursive": True},
+            {"path": "pruned", "recursive": True, "exclude_dirs": ["x"]},
+            {"path": "pruned" + sep + "sub", "recursive": True},
+            {"path": "data2", "recursive": True, "one_file_system": True},
+            {"path": "data2" + sep + "sub", "recursive": True},
+            {"path": "data" + sep + "excluding", "exclude_dirs": ["x"]},
+            {"path": "data" + sep + "limited", "scan_timeout_sec": 10},
+        ]
+
+        # Act
+        actual = scanner.get_nested_targets(targets)
+
+        # Assert
+        assert actual == {
+            "data" + sep + "projects": "data",
+            "data" + sep + "projects" + sep + "a": "data",
+        }
+
+
+class Test_AllFileScanner_get_src_and_backup_files:
+    @staticmethod
+    def test_SeparateFilesInDestinationDir(testdata_fresh):
+        # Arrange
+        target_root = testdata_fresh(__name__)
+
+        targets = {
+            testpath.src_testdir1_path(target_root, norm_path=False): True,
+            testpath.src_testdir_path(target_root, norm_path=False): False,
+        }
+
+        scnr = scanner.AllFileScanner(targets, False, ".old")
+
+        # Act
+        src_files, backup_files = scnr.get_src_and_backup_files()
+        actual_src = [str(file.relpath) for file in src_files.values()]
+        actual_backup = [str(file.relpath) for file in backup_files.values()]
+
+        # Assert
+        assert set(actual_src) == set(["TestFile11", "TestFile12.ext", "TestFile"])
+        assert set(actual_backup) == set(
+            [
+                ".old" + sep + "TestFile11_2023-01-23_0000",
+                ".old" + sep + "TestFile12_2023-01-23_0000.ext",
+                ".old" + sep + "TestFile_2023-01-23_0000",
+            ]
+        )
@@ -168,3 +168,196 @@ class Test_SourceRepository_get_files_matching_criteria:
             assert actual_module == expected_module
             assert actual_level == expected_level
             assert actual_message.startswith(expected_message)
+
+
+class Test_SourceRepository_nested_targets:
+    @staticmethod
+    def test_IfTargetIsNestedThenMatchFilesWithCriteriaOfBothTargets(
+        testdata, testpath
+    ):
+        from autobackup import repoinit
+
+        # Arrange
+        target_root = testdata(__name__)
+        targets = [
+            {
+                "path": testpath.src_testdir_path(target_root, norm_path=False),
+                "catch_regex": ".*TestFile2.*",
+                "ignore_regex": "",
+                "catch_hidden": False,
+                "catch_link": False,
+                "recursive": True,
+            },
+            {
+                "path": testpath.src_testdir1_path(target_root, norm_path=False),
+                "catch_regex": "TestFile11",
+                "ignore_regex": "",
+                "catch_hidden": False,
+                "catch_link": False,
+                "recursive": True,
+            },
+        ]
+        b_factory = repoinit.BackupRepositoryFactory(targets, ".old", "_%Y-%m-%d")
+        s_repo = b_factory.get_source_repository()
+
+        # Act
+        actual = [
+            str(file.relpath) for _, file in s_repo.get_files_matching_criteria()
+        ]
+
+        # Assert
+        assert sorted(actual) == [
+            "TestDir1" + sep + "TestFile11",
+            "TestDir2" + sep + "TestFile22",
+        ]
+
+
+    @staticmethod
+    def test_IfNestedTargetHasWalkOptionsThenApplyThem(testdir):
+        import os
+
+        from autobackup import repoinit
+
+        # Arrange
+        target_root = testdir(__name__)
+        inner_root = os.path.join(target_root, "proj")
+        for relpath in [
+            "outer.txt",
+            os.path.join("proj", "node_modules", "a.js"),
+            os.path.join("proj", "src", "b.js"),
+        ]:
+            filepath = os.path.join(target_root, relpath)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            open(filepath, "wb").close()
+        plain_target = {
+            "ignore_regex": "",
+            "catch_hidden": False,
+            "catch_link": False,
+            "recursive": True,
+        }
+        targets = [
+            {**plain_target, "path": target_root, "catch_regex": r".*\.txt"},
+            {
+                **plain_target,
+                "path": inner_root,
+                "catch_regex": r".*\.js",
+                "exclude_dirs": ["node_modules"],
+            },
+        ]
+        b_factory = repoinit.BackupRepositoryFactory(targets, ".old", "_%Y-%m-%d")
+        s_repo = b_factory.get_source_repository()
+
+        # Act
+        actual = [
+            os.path.basename(str(file))
+            for _, file in s_repo.get_files_matching_criteria()
+        ]
+
+        # Assert
+        assert sorted(actual) == ["b.js", "outer.txt"]
+
+
+class Test_SourceRepository_size_and_age_limits:
+    @staticmethod
+    def test_IfLimitsAreSetThenSkipFilesOutOfLimits(testdir):
+        import os
+        import time
+
+        from autobackup import repoinit
+
+        # Arrange
+        target_root = testdir(__name__)
+        now = time.time()
+        for name, size, age in [
+            ("ok.txt", 10, 3600),
+            ("large.txt", 1000, 3600),
+            ("empty.txt", 0, 3600),
+            ("new.txt", 10, 0),
+            ("old.txt", 10, 86400 * 10),
+        ]:
+            filepath = os.path.join(target_root, name)
+            with open(filepath, "wb") as fp:
+                fp.write(b"x" * size)
+            os.utime(filepath, (now - age, now - age))
+        targets = [
+            {
+                "path": target_root,
+                "catch_regex": ".*",
+                "ignore_regex": "",
+                "catch_hidden": False,
+                "catch_link": False,
+                "recursive": True,
+                "min_size": 1,
+                "max_size": 100,
+                "min_age": 60,
+                "max_age": 86400,
+            }
+        ]
+        b_factory = repoinit.BackupRepositoryFactory(targets, ".old", "_%Y-%m-%d")
+        s_repo = b_factory.get_source_repository()
+        table = b_factory.get_all_file_scanner().get_file_table()
+
+        # Act
+        actual = [
+            str(file.relpath) for _, file in s_repo.get_files_matching_criteria()
+        ]
+        actual_rows = [
+            table.relpath(row) for row in s_repo.get_rows_matching_criteria(table)
+        ]
+
+        # Assert
+        assert actual == ["ok.txt"]
+        assert actual_rows == ["ok.txt"]
+
+
+class Test_compile_fullmatch:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "regex",
+        [
+            ".*",
+            "",
+            ".*\\.txt",
+            ".*\\.(txt|md)",
+            ".*(?:\\.txt|\\.md)",
+            "build/.*",
+            ".*cache.*",
+            "TestFile11",
+            "(a|b)",
+            ".*\\d+\\.log",
+            "a|b",
+            "[ab]\\.txt",
+            ".*\\.*",
+            ".*?\\.txt",
+        ],
+    )
+    def test_ReturnSameResultAsFullmatch(regex):
+        import re
+
+        # Arrange
+        strings = [
+            "",
+            "a",
+            "b",
+            "a.txt",
+            "dir/a.txt",
+            "a.txt.bak",
+            "a\n.txt",
+            "a.md",
+            "build/a.o",
+            "src/build/a.o",
+            "build\n/a.o",
+            "my.cache.db",
+            "TestFile11",
+            "x/TestFile11",
+            "app12.log",
+            "....",
+        ]
+        expected = [not re.fullmatch(regex, string) is None for string in strings]
+
+        # Act
+        fullmatch = srcrepo._compile_fullmatch(regex)
+        actual = [fullmatch(string) for string in strings]
+
+        # Assert
+        assert actual == expected
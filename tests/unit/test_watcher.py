@@ -0,0 +1,172 @@
+import pytest
+import pytest_mock
+import pytest_raises
+import os
+import platform
+
+from autobackup import watcher
+
+
+class Test_ChangeCoalescer_pop_ready:
+    @staticmethod
+    def test_IfDebounceWindowHasNotPassedThenReturnNothing():
+        # Arrange
+        coalescer = watcher.ChangeCoalescer(2.0)
+        coalescer.add("/path/to/file1.ext", "/path", 10.0)
+
+        # Act
+        actual = coalescer.pop_ready(11.0)
+
+        # Assert
+        assert actual == []
+        assert len(coalescer) == 1
+
+    @staticmethod
+    def test_CoalesceEventsPerPath():
+        # Arrange
+        coalescer = watcher.ChangeCoalescer(2.0)
+        coalescer.add("/path/to/file1.ext", "/path", 10.0)
+        coalescer.add("/path/to/file2.ext", "/path", 10.0)
+        coalescer.add("/path/to/file1.ext", "/path", 11.0)
+
+        # Act
+        actual1 = coalescer.pop_ready(12.0)
+        actual2 = coalescer.pop_ready(13.0)
+
+        # Assert
+        assert actual1 == [("/path/to/file2.ext", "/path")]
+        assert actual2 == [("/path/to/file1.ext", "/path")]
+        assert len(coalescer) == 0
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="inotify is Linux only")
+class Test_TargetWatcher_poll:
+    @staticmethod
+    def test_ReturnChangedFilesAfterDebounce(testdata):
+        # Arrange
+        target_root = testdata(__name__)
+        t_watcher = watcher.TargetWatcher(
+            [{"path": target_root, "recursive": True}], ".old", False, 0.0
+        )
+        t_watcher.start()
+
+        # Act
+        try:
+            with open(os.path.join(target_root, "TestDir1", "TestFile11"), "w") as fp:
+                fp.write("changed")
+            os.mkdir(os.path.join(target_root, "TestDir3"))
+            with open(os.path.join(target_root, "TestDir3", "TestFile31"), "w") as fp:
+                fp.write("created")
+            os.mkdir(os.path.join(target_root, ".old"))
+            with open(os.path.join(target_root, ".old", "TestFile_0000"), "w") as fp:
+                fp.write("backup")
+
+            actual = []
+            for _ in range(10):
+                actual.extend(str(file.relpath) for file in t_watcher.poll(0.1))
+        finally:
+            t_watcher.close()
+
+        # Assert
+        assert set(actual) == set(
+            [
+                os.path.join("TestDir1", "TestFile11"),
+                os.path.join("TestDir3", "TestFile31"),
+            ]
+        )
+
+    @staticmethod
+    def test_IfExcludeDirsThenNotWatchExcludedDirs(testdata):
+        # Arrange
+        target_root = testdata(__name__)
+        t_watcher = watcher.TargetWatcher(
+            [{"path": target_root, "recursive": True, "exclude_dirs": ["TestDir1"]}],
+            ".old",
+            False,
+            0.0,
+        )
+        t_watcher.start()
+
+        # Act
+        try:
+            with open(os.path.join(target_root, "TestDir1", "TestFile11"), "w") as fp:
+                fp.write("changed")
+            os.mkdir(os.path.join(target_root, "TestDir3"))
+            os.mkdir(os.path.join(target_root, "TestDir3", "TestDir1"))
+            with open(os.path.join(target_root, "TestDir3", "TestFile31"), "w") as fp:
+                fp.write("created")
+
+            actual = []
+            for _ in range(10):
+                actual.extend(str(file.relpath) for file in t_watcher.poll(0.1))
+        finally:
+            t_watcher.close()
+
+        # Assert
+        assert actual == [os.path.join("TestDir3", "TestFile31")]
+
+    @staticmethod
+    def test_IfTargetIsNestedThenReportFilesWithOuterTarget(testdata):
+        # Arrange
+        target_root = testdata(__name__)
+        t_watcher = watcher.TargetWatcher(
+            [
+                {"path": target_root, "recursive": True},
+                {"path": os.path.join(target_root, "TestDir1"), "recursive": True},
+            ],
+            ".old",
+            False,
+            0.0,
+        )
+        t_watcher.start()
+
+        # Act
+        try:
+            with open(os.path.join(target_root, "TestDir1", "TestFile11"), "w") as fp:
+                fp.write("changed")
+
+            actual = []
+            for _ in range(10):
+                actual.extend(str(file.relpath) for file in t_watcher.poll(0.1))
+        finally:
+            t_watcher.close()
+
+        # Assert
+        assert actual == [os.path.join("TestDir1", "TestFile11")]
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="inotify is Linux only")
+class Test_BackupWatcher_run:
+    @staticmethod
+    def test_IfWatchLimitIsReachedThenReconcileOnlyPeriodically(
+        testdata, mocker, caplog
+    ):
+        import errno
+        import itertools
+
+        # Arrange
+        target_root = testdata(__name__)
+        t_watcher = watcher.TargetWatcher(
+            [{"path": target_root, "recursive": True}], ".old", False, 0.0
+        )
+        mocker.patch.object(
+            watcher.Inotify,
+            "add_watch",
+            side_effect=OSError(errno.ENOSPC, "No space left on device"),
+        )
+        mocker.patch.object(t_watcher, "poll", return_value=[])
+        reconcile = mocker.Mock()
+        b_watcher = watcher.BackupWatcher(t_watcher, mocker.Mock(), reconcile, 3600.0)
+        iterations = itertools.count()
+
+        # Act
+        b_watcher.run(lambda: next(iterations) >= 5)
+
+        # Assert
+        assert reconcile.call_count == 1
+        assert t_watcher.limited
+        assert not t_watcher.overflowed
+        assert (
+            len([r for r in caplog.records if r.message.startswith("WATCH_LIMIT")])
+            == 1
+        )